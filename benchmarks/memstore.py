@@ -0,0 +1,155 @@
+"""In-memory stand-in for the Supabase client used by ``yulu_intel.db``.
+
+Implements the subset of the PostgREST query builder that ``db.py`` calls
+(select/insert/update/upsert/delete with eq, lt, gte, lte, in_, order,
+limit, range), so persistence paths can be benchmarked without a network.
+Rows are plain dicts; ``id`` is assigned on insert.
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Result:
+    data: List[Dict]
+    count: Optional[int] = None
+
+
+class Query:
+    def __init__(self, store: "MemoryStore", table: str):
+        self.store = store
+        self.table = table
+        self.action = "select"
+        self.columns: Optional[List[str]] = None
+        self.want_count = False
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.filters: List[Callable[[Dict], bool]] = []
+        self.orders: List = []
+        self.window: Optional[slice] = None
+
+    # --- actions ---
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "Query":
+        self.action = "select"
+        cols = [c.strip() for c in columns.split(",")]
+        self.columns = None if cols == ["*"] else cols
+        self.want_count = count is not None
+        return self
+
+    def insert(self, rows) -> "Query":
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id") -> "Query":
+        self.action, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, fields: Dict) -> "Query":
+        self.action, self.payload = "update", fields
+        return self
+
+    def delete(self) -> "Query":
+        self.action = "delete"
+        return self
+
+    # --- filters and modifiers ---
+    def eq(self, col, value) -> "Query":
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def lt(self, col, value) -> "Query":
+        self.filters.append(lambda r: r.get(col) is not None and r[col] < value)
+        return self
+
+    def gte(self, col, value) -> "Query":
+        self.filters.append(lambda r: r.get(col) is not None and r[col] >= value)
+        return self
+
+    def lte(self, col, value) -> "Query":
+        self.filters.append(lambda r: r.get(col) is not None and r[col] <= value)
+        return self
+
+    def in_(self, col, values) -> "Query":
+        allowed = set(values)
+        self.filters.append(lambda r: r.get(col) in allowed)
+        return self
+
+    def order(self, col, desc: bool = False) -> "Query":
+        self.orders.append((col, desc))
+        return self
+
+    def limit(self, n: int) -> "Query":
+        self.window = slice(0, n)
+        return self
+
+    def range(self, start: int, end: int) -> "Query":
+        self.window = slice(start, end + 1)
+        return self
+
+    # --- execution ---
+    def _matching(self) -> List[Dict]:
+        return [r for r in self.store.rows(self.table) if all(f(r) for f in self.filters)]
+
+    def execute(self) -> Result:
+        if self.action == "insert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return Result([self.store.insert(self.table, row) for row in rows])
+        if self.action == "upsert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return Result([self.store.upsert(self.table, row, self.on_conflict) for row in rows])
+        if self.action == "update":
+            matched = self._matching()
+            for row in matched:
+                row.update(self.payload)
+            return Result([dict(r) for r in matched])
+        if self.action == "delete":
+            matched = self._matching()
+            self.store.delete(self.table, matched)
+            return Result([dict(r) for r in matched])
+
+        rows = self._matching()
+        for col, desc in reversed(self.orders):
+            rows.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+        count = len(rows) if self.want_count else None
+        if self.window is not None:
+            rows = rows[self.window]
+        if self.columns is not None:
+            rows = [{c: r.get(c) for c in self.columns} for r in rows]
+        else:
+            rows = [dict(r) for r in rows]
+        return Result(rows, count)
+
+
+class MemoryStore:
+    """Drop-in for ``supabase.Client`` as far as ``yulu_intel.db`` is concerned."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.ids = itertools.count(1)
+        self.requests = 0
+
+    def rows(self, table: str) -> List[Dict]:
+        return self.tables.setdefault(table, [])
+
+    def table(self, name: str) -> Query:
+        self.requests += 1
+        return Query(self, name)
+
+    def insert(self, table: str, row: Dict) -> Dict:
+        row = dict(row)
+        row.setdefault("id", next(self.ids))
+        self.rows(table).append(row)
+        return dict(row)
+
+    def upsert(self, table: str, row: Dict, key: str) -> Dict:
+        for existing in self.rows(table):
+            if existing.get(key) == row.get(key):
+                existing.update(row)
+                return dict(existing)
+        return self.insert(table, row)
+
+    def delete(self, table: str, rows: List[Dict]) -> None:
+        doomed = {id(r) for r in rows}
+        self.tables[table] = [r for r in self.rows(table) if id(r) not in doomed]
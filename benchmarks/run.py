@@ -0,0 +1,211 @@
+"""Synthetic-scale benchmarks for rendering, Slack packing and persistence.
+
+Each scale point generates a deterministic ``CompetitiveAnalysis`` (and a run
+history for the db paths), then times every case and measures its peak
+traced memory. Supabase is replaced by ``MemoryStore`` so the db paths run
+offline; the number of store requests is reported alongside.
+
+Results are compared with ``benchmarks/baseline.json``; ``--save`` rewrites it.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scales small,medium --repeat 5
+    python -m benchmarks.run --save
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.memstore import MemoryStore
+from benchmarks.synthetic import make_analysis, make_runs
+from yulu_intel import db
+from yulu_intel.config import settings
+from yulu_intel.formatter import format_messages
+from yulu_intel.history import build_history
+from yulu_intel.html_report import generate_html_report
+from yulu_intel.json_report import render_json
+from yulu_intel.markdown_report import render_markdown
+from yulu_intel.report_assets import build_bundle
+from yulu_intel.templates import clear_fragment_cache
+from yulu_intel.trends import empty_trends, merge_history
+from yulu_intel.view import build_view
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# competitors / news items in the day's analysis, days of stored history
+SCALES = {
+    "small": {"competitors": 10, "news": 50, "days": 30},
+    "medium": {"competitors": 25, "news": 300, "days": 180},
+    "large": {"competitors": 50, "news": 1000, "days": 730},
+}
+HISTORY_COMPETITORS = 12
+HISTORY_NEWS = 30
+# Sub-millisecond cases are noisy: a time regression must also exceed this
+MIN_TIME_DELTA = 0.001
+
+Case = Tuple[Callable[[], None], Callable[[], object]]  # (untimed setup, timed body)
+
+
+def build_cases(scale: Dict) -> Dict[str, Case]:
+    analysis = make_analysis(scale["competitors"], scale["news"], seed=42)
+    names = [c.name for c in analysis.competitors]
+    new, returning = names[: len(names) // 5], names[len(names) // 5:]
+    bundle = build_bundle()
+    runs = make_runs(scale["days"], HISTORY_COMPETITORS, HISTORY_NEWS)
+    store = MemoryStore()
+
+    def fresh_store() -> None:
+        store.tables.clear()
+        store.requests = 0
+        db._client = store
+        for name in returning:
+            store.insert("competitors", {
+                "name": name,
+                "normalized_name": db._normalize(name),
+                "first_seen_date": "2025-01-01",
+                "last_seen_date": "2025-12-31",
+                "times_seen": 10,
+            })
+
+    def seeded_history() -> None:
+        fresh_store()
+        for row in runs:
+            store.insert("analysis_runs", row)
+        store.requests = 0
+
+    history = build_history(runs)
+
+    return {
+        "html_render_cold": (
+            clear_fragment_cache,
+            lambda: generate_html_report(analysis, new, returning, False, assets=bundle),
+        ),
+        "html_render_warm": (
+            lambda: generate_html_report(analysis, new, returning, False, assets=bundle),
+            lambda: generate_html_report(analysis, new, returning, False, assets=bundle),
+        ),
+        "slack_messages": (
+            lambda: None,
+            lambda: format_messages(analysis, new, returning, False),
+        ),
+        "markdown_json": (
+            lambda: None,
+            lambda: (lambda v: (render_markdown(v), render_json(v)))(build_view(analysis, new, returning, False)),
+        ),
+        "detect_and_store": (
+            fresh_store,
+            lambda: db.detect_and_store(analysis, report_html=None),
+        ),
+        "history_load": (
+            seeded_history,
+            lambda: build_history(db.iter_analysis_runs()),
+        ),
+        "trends_rebuild": (
+            lambda: None,
+            lambda: merge_history(empty_trends(), history),
+        ),
+    }
+
+
+def measure(setup: Callable, body: Callable, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        body()
+        times.append(time.perf_counter() - started)
+
+    # Separate traced pass: tracemalloc slows allocation-heavy code
+    setup()
+    tracemalloc.start()
+    body()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {"seconds": round(min(times), 5), "peak_kb": round(peak / 1024, 1)}
+    if isinstance(db._client, MemoryStore):
+        result["requests"] = db._client.requests
+    return result
+
+
+def run(scales: List[str], repeat: int, cases: List[str]) -> Dict[str, Dict[str, Dict]]:
+    results: Dict[str, Dict[str, Dict]] = {}
+    for scale_name in scales:
+        built = build_cases(SCALES[scale_name])
+        results[scale_name] = {}
+        for case_name, (setup, body) in built.items():
+            if cases and case_name not in cases:
+                continue
+            db._client = None
+            results[scale_name][case_name] = measure(setup, body, repeat)
+            print(f"  {scale_name:<7}{case_name:<18}{results[scale_name][case_name]}", file=sys.stderr)
+    db._client = None
+    return results
+
+
+def _delta(now: float, then: float) -> str:
+    if not then:
+        return "     n/a"
+    return f"{(now - then) / then:+8.0%}"
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> Tuple[str, List[str]]:
+    lines = [
+        f"{'Scale':<8}{'Case':<18}{'Time (ms)':>11}{'Δ':>9}{'Peak (KB)':>12}{'Δ':>9}{'Req':>6}",
+    ]
+    regressions = []
+    for scale, cases in results.items():
+        for case, m in cases.items():
+            base = baseline.get(scale, {}).get(case, {})
+            dt = _delta(m["seconds"], base.get("seconds", 0))
+            dm = _delta(m["peak_kb"], base.get("peak_kb", 0))
+            flag = ""
+            if base and (
+                m["seconds"] > base["seconds"] * (1 + threshold)
+                and m["seconds"] - base["seconds"] > MIN_TIME_DELTA
+                or m["peak_kb"] > base["peak_kb"] * (1 + threshold)
+            ):
+                flag = "  << regression"
+                regressions.append(f"{scale}/{case}")
+            lines.append(
+                f"{scale:<8}{case:<18}{m['seconds'] * 1000:>11.1f}{dt}{m['peak_kb']:>12.1f}{dm}"
+                f"{m.get('requests', ''):>6}{flag}"
+            )
+    return "\n".join(lines), regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run synthetic-scale benchmarks.")
+    parser.add_argument("--scales", default=",".join(SCALES), help="comma-separated scale points")
+    parser.add_argument("--cases", default="", help="comma-separated case names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change flagged as a regression")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    settings.replay_mode = ""
+    scales = [s for s in args.scales.split(",") if s]
+    cases = [c for c in args.cases.split(",") if c]
+    results = run(scales, args.repeat, cases)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    table, regressions = compare(results, baseline, args.threshold)
+    print(table)
+
+    if args.save:
+        merged = {**baseline, **{s: {**baseline.get(s, {}), **c} for s, c in results.items()}}
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Import-time benchmark for the offline entry points.
+
+Each module is imported in a fresh interpreter (without ``OPENAI_API_KEY``) and
+the import is timed; the best of ``--repeat`` runs is compared with the
+``startup`` section of ``benchmarks/baseline.json``. Offline commands must not
+pull in the OpenAI, Supabase or Exa SDKs at import: that is checked on every
+run, independent of timing noise.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --save
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.run import BASELINE_PATH
+
+HEAVY_SDKS = ("openai", "supabase", "exa_py")
+# Entry points that render, backfill or query history without calling out
+OFFLINE_MODULES = [
+    "yulu_intel.html_report",
+    "yulu_intel.backfill",
+    "yulu_intel.history",
+    "yulu_intel.trends",
+    "yulu_intel.manifest",
+    "yulu_intel.search_index",
+    "yulu_intel.archive",
+]
+# Online modules still import without their SDKs; clients are built on first call
+LAZY_MODULES = ["yulu_intel.analyzer", "yulu_intel.search", "yulu_intel.db", "yulu_intel.outbox"]
+# Interpreter start-up jitter: an import regression must also exceed this
+MIN_IMPORT_DELTA = 0.02
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module: str) -> Dict:
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parent.parent)
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, sdks=HEAVY_SDKS)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(modules: List[str], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for module in modules:
+        probes = [probe(module) for _ in range(repeat)]
+        results[module] = {
+            "seconds": round(min(p["seconds"] for p in probes), 4),
+            "sdks": probes[0]["loaded"],
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure import time of offline entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change flagged as a regression")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    results = run(OFFLINE_MODULES + LAZY_MODULES, args.repeat)
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = stored.get("startup", {})
+
+    failures = []
+    print(f"{'Module':<26}{'Import (ms)':>12}{'Δ':>9}  SDKs loaded")
+    for module, r in results.items():
+        base = baseline.get(module, {}).get("seconds")
+        delta = f"{(r['seconds'] - base) / base:+8.0%}" if base else "     n/a"
+        flag = ""
+        if r["sdks"]:
+            flag = "  << eager SDK import"
+            failures.append(module)
+        elif (
+            base and not args.save
+            and r["seconds"] > base * (1 + args.threshold)
+            and r["seconds"] - base > MIN_IMPORT_DELTA
+        ):
+            flag = "  << regression"
+            failures.append(module)
+        print(f"{module:<26}{r['seconds'] * 1000:>12.1f}{delta}  {', '.join(r['sdks']) or '-'}{flag}")
+
+    if args.save:
+        stored["startup"] = {m: {"seconds": r["seconds"]} for m, r in results.items()}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    if failures:
+        print(f"{len(failures)} failure(s): {', '.join(failures)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
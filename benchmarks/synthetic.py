@@ -0,0 +1,156 @@
+"""Deterministic synthetic ``CompetitiveAnalysis`` objects and run histories."""
+
+import json
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+from yulu_intel.models import (
+    CompetitiveAnalysis,
+    Competitor,
+    CompetitorInsights,
+    CustomerSentiment,
+    GigWorkerPulseItem,
+    MonthlyAction,
+    NewsDigestItem,
+    RecentDevelopment,
+    StrategyRecommendation,
+    SWOTAnalysis,
+)
+
+_WORDS = (
+    "battery swap subscription rental fleet rider delivery gig earnings km pricing "
+    "expansion funding launch partnership city hub scooter bike electric charging "
+    "reliability availability app support downtime insurance maintenance deposit "
+    "quick commerce hyperlocal logistics dark store payout incentive shift"
+).split()
+NEWS_TYPES = ["launch", "funding", "partnership", "controversy", "growth"]
+SENTIMENTS = ["positive", "mixed", "neutral", "negative"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    words = [rng.choice(_WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def _sentences(rng: random.Random, count: int, n_words: int = 12) -> List[str]:
+    return [_sentence(rng, rng.randint(n_words // 2, n_words)) for _ in range(count)]
+
+
+def competitor_names(n: int) -> List[str]:
+    return [f"Rival{i:03d} Mobility" for i in range(n)]
+
+
+def make_competitor(rng: random.Random, name: str) -> Competitor:
+    return Competitor(
+        name=name,
+        description=" ".join(_sentences(rng, 4, 20)),
+        strengths=_sentences(rng, rng.randint(2, 5)),
+        weaknesses=_sentences(rng, rng.randint(2, 5)),
+        market_position=_sentence(rng, 8),
+        pricing_model=f"₹{rng.randint(2, 15)}/km, ₹{rng.randint(49, 199)}/day plans",
+        key_differentiator=_sentence(rng, 10),
+        insights=CompetitorInsights(
+            top_features=_sentences(rng, 4, 6),
+            growth_signals=_sentences(rng, 3, 8),
+            winning_segments=_sentences(rng, 2, 5),
+            marketing_angles=_sentences(rng, 2, 6),
+        ),
+        recent_developments=[
+            RecentDevelopment(
+                headline=_sentence(rng, 8),
+                summary=_sentence(rng, 20),
+                type=rng.choice(NEWS_TYPES),
+                recency=f"{rng.randint(1, 30)} days ago",
+            )
+            for _ in range(2)
+        ],
+        sentiment=CustomerSentiment(
+            what_users_love=_sentences(rng, 3, 8),
+            common_complaints=_sentences(rng, 3, 8),
+            net_sentiment=rng.choice(SENTIMENTS),
+        ),
+    )
+
+
+def make_analysis(
+    n_competitors: int = 10,
+    n_news: int = 40,
+    seed: int = 0,
+    product: str = "Yulu",
+    run_date: date = date(2026, 1, 1),
+) -> CompetitiveAnalysis:
+    rng = random.Random(seed)
+    names = competitor_names(n_competitors)
+    return CompetitiveAnalysis(
+        product_name=product,
+        market_overview=" ".join(_sentences(rng, 12, 25)),
+        competitors=[make_competitor(rng, name) for name in names],
+        swot=SWOTAnalysis(
+            strengths=_sentences(rng, 5),
+            weaknesses=_sentences(rng, 5),
+            opportunities=_sentences(rng, 5),
+            threats=_sentences(rng, 5),
+        ),
+        strategies=[
+            StrategyRecommendation(
+                title=_sentence(rng, 5),
+                description=_sentence(rng, 30),
+                priority=rng.choice(PRIORITIES),
+                category=rng.choice(["pricing", "product", "marketing", "operations"]),
+            )
+            for _ in range(6)
+        ],
+        key_insights=_sentences(rng, 6, 25),
+        news_digest=[
+            NewsDigestItem(
+                headline=_sentence(rng, 10),
+                competitor_name=rng.choice(names),
+                summary=_sentence(rng, 30),
+                url=f"https://news.example.com/{seed}/{i}" if rng.random() < 0.9 else None,
+                date=(run_date - timedelta(days=rng.randint(0, 30))).isoformat(),
+                type=rng.choice(NEWS_TYPES),
+            )
+            for i in range(n_news)
+        ],
+        biggest_threats=_sentences(rng, 4, 20),
+        market_gaps=_sentences(rng, 4, 20),
+        urgent_opportunities=_sentences(rng, 4, 20),
+        action_plan_90day=[
+            MonthlyAction(
+                month=f"Month {m}",
+                title=_sentence(rng, 5),
+                description=_sentence(rng, 20),
+                actions=_sentences(rng, 4, 12),
+            )
+            for m in (1, 2, 3)
+        ],
+        gig_worker_pulse=[
+            GigWorkerPulseItem(quote=_sentence(rng, 15), source_platform=rng.choice(["reddit", "x", "play store"]))
+            for _ in range(5)
+        ],
+    )
+
+
+def make_runs(
+    n_days: int,
+    n_competitors: int = 10,
+    n_news: int = 40,
+    end: date = date(2026, 1, 1),
+) -> List[Dict]:
+    """``analysis_runs`` rows, one per day, drawing competitors from a rotating pool."""
+    rows = []
+    start = end - timedelta(days=n_days - 1)
+    for day in range(n_days):
+        run_date = start + timedelta(days=day)
+        analysis = make_analysis(n_competitors, n_news, seed=day, run_date=run_date)
+        names = [c.name for c in analysis.competitors]
+        rows.append({
+            "run_date": run_date.isoformat(),
+            "product_name": analysis.product_name,
+            "analysis_json": analysis.model_dump_json(),
+            "competitor_names": json.dumps(names),
+            "new_competitors": json.dumps(names if day == 0 else []),
+        })
+    return rows
@@ -2,11 +2,20 @@ require("dotenv").config({ path: require("path").resolve(__dirname, "../.env") }
 const express = require("express");
 const path = require("path");
 const fs = require("fs");
+const zlib = require("zlib");
+const crypto = require("crypto");
+const { promisify } = require("util");
 const { createClient } = require("@supabase/supabase-js");
 
 const app = express();
 const PORT = process.env.PORT || 3000;
 const REPORTS_DIR = path.resolve(__dirname, "../reports");
+const ARCHIVE_DIR = path.resolve(__dirname, "../archive");
+const ASSETS_DIR = path.join(REPORTS_DIR, "assets");
+
+const gzip = promisify(zlib.gzip);
+const gunzip = promisify(zlib.gunzip);
+const brotliCompress = promisify(zlib.brotliCompress);
 
 // Supabase client (optional — graceful if not configured)
 let supabase = null;
@@ -14,46 +23,441 @@ if (process.env.SUPABASE_URL && process.env.SUPABASE_KEY) {
   supabase = createClient(process.env.SUPABASE_URL, process.env.SUPABASE_KEY);
 }
 
+// --- In-memory report cache (bounded LRU, precompressed, content-hash ETags) ---
+const REPORT_CACHE_MAX_BYTES =
+  parseInt(process.env.REPORT_CACHE_MAX_BYTES, 10) || 64 * 1024 * 1024;
+const REPORT_CACHE_TTL_MS = 10 * 60 * 1000;
+
+class LruCache {
+  constructor(maxBytes) {
+    this.maxBytes = maxBytes;
+    this.bytes = 0;
+    this.entries = new Map();
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return null;
+    if (Date.now() - entry.loadedAt > REPORT_CACHE_TTL_MS) {
+      this.delete(key);
+      return null;
+    }
+    // Map keeps insertion order: re-insert to mark as most recently used
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  set(key, entry) {
+    this.delete(key);
+    this.entries.set(key, entry);
+    this.bytes += entry.size;
+    while (this.bytes > this.maxBytes && this.entries.size > 1) {
+      this.delete(this.entries.keys().next().value);
+    }
+  }
+
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return;
+    this.bytes -= entry.size;
+    this.entries.delete(key);
+  }
+}
+
+const cache = new LruCache(REPORT_CACHE_MAX_BYTES);
+
+async function buildEntry(content, type = "html") {
+  const body = Buffer.from(content, "utf-8");
+  const [gz, br] = await Promise.all([
+    gzip(body, { level: 9 }),
+    brotliCompress(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: 11,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+      },
+    }),
+  ]);
+  const hash = crypto.createHash("sha256").update(body).digest("hex").slice(0, 16);
+  return {
+    etag: `"${hash}"`,
+    type,
+    body,
+    gz,
+    br,
+    size: body.length + gz.length + br.length,
+    loadedAt: Date.now(),
+  };
+}
+
+function sendEntry(req, res, entry, cacheControl = "public, no-cache") {
+  res.set({ ETag: entry.etag, "Cache-Control": cacheControl, Vary: "Accept-Encoding" });
+  res.type(entry.type);
+  if (req.fresh) return res.status(304).end();
+
+  const encoding = req.acceptsEncodings("br", "gzip", "identity");
+  if (encoding === "br") {
+    res.set("Content-Encoding", "br");
+    return res.send(entry.br);
+  }
+  if (encoding === "gzip") {
+    res.set("Content-Encoding", "gzip");
+    return res.send(entry.gz);
+  }
+  return res.send(entry.body);
+}
+
+async function readLocal(filePath) {
+  try {
+    return await fs.promises.readFile(filePath, "utf-8");
+  } catch {
+    return null;
+  }
+}
+
+function writeLocal(filePath, content) {
+  // Write-through copy for the next cold start; never blocks the response
+  fs.promises
+    .mkdir(path.dirname(filePath), { recursive: true })
+    .then(() => fs.promises.writeFile(filePath, content, "utf-8"))
+    .catch((err) => console.error(`Could not cache ${filePath}: ${err.message}`));
+}
+
+// --- Request coalescing + stale-while-revalidate ---
+// A burst of clicks on the same Slack link shares one lookup per key.
+const INDEX_TTL_MS = parseInt(process.env.INDEX_TTL_MS, 10) || 60 * 1000;
+const inFlight = new Map();
+const swrEntries = new Map();
+
+function singleFlight(key, fn) {
+  if (inFlight.has(key)) return inFlight.get(key);
+  const promise = Promise.resolve()
+    .then(fn)
+    .finally(() => inFlight.delete(key));
+  inFlight.set(key, promise);
+  return promise;
+}
+
+async function staleWhileRevalidate(key, ttlMs, fn) {
+  const refresh = () =>
+    singleFlight(`swr:${key}`, async () => {
+      const value = await fn();
+      swrEntries.set(key, { value, fetchedAt: Date.now() });
+      return value;
+    });
+
+  const hit = swrEntries.get(key);
+  if (!hit) return refresh();
+  if (Date.now() - hit.fetchedAt > ttlMs) {
+    // Serve the stale value now; the refresh lands for the next request
+    refresh().catch((err) => console.error(`Refresh of ${key} failed: ${err.message}`));
+  }
+  return hit.value;
+}
+
+// --- Report manifest + pre-rendered index (written by yulu_intel/manifest.py) ---
+const MANIFEST_PATH = path.join(REPORTS_DIR, "manifest.json");
+const MANIFEST_REFRESH_MS = 5 * 60 * 1000;
+const indexPages = new Map();
+
+async function fetchStoredAsset(name) {
+  if (!supabase) return null;
+  const { data } = await supabase
+    .from("report_assets")
+    .select("content")
+    .eq("name", name)
+    .limit(1);
+  return data && data.length > 0 ? data[0].content : null;
+}
+
+async function loadManifest() {
+  const stored = (await readLocal(MANIFEST_PATH)) || (await fetchStoredAsset("manifest.json"));
+  indexPages.clear();
+  return stored ? JSON.parse(stored) : null;
+}
+
+async function getManifest() {
+  try {
+    return await staleWhileRevalidate("manifest", MANIFEST_REFRESH_MS, loadManifest);
+  } catch {
+    return null;
+  }
+}
+
+async function getIndexPage(page) {
+  const name = page === 1 ? "index.html" : `index-${page}.html`;
+  if (indexPages.has(name)) return indexPages.get(name);
+  return singleFlight(`index:${name}`, async () => {
+    let html = null;
+    try {
+      html = (await readLocal(path.join(REPORTS_DIR, name))) || (await fetchStoredAsset(name));
+    } catch {
+      // fall through to the dynamic listing
+    }
+    if (!html) return null;
+    const entry = await buildEntry(html);
+    indexPages.set(name, entry);
+    return entry;
+  });
+}
+
+// Local runs rewrite the manifest on disk: drop the cached copy, index pages and trends.
+// On Render nothing writes the disk; the TTLs below pick up new runs instead.
+fs.watchFile(MANIFEST_PATH, { interval: 10000 }, () => {
+  swrEntries.delete("manifest");
+  indexPages.clear();
+  swrEntries.delete("file:trends.html");
+  swrEntries.delete("file:trends.json");
+});
+
+// Generated pages mirrored to report_assets (trends page + aggregate). They change
+// every run, so they are never written through to disk: the stored copy wins, and
+// a local file is only a fallback for running without Supabase.
+async function loadGeneratedFile(name, type) {
+  try {
+    return await staleWhileRevalidate(`file:${name}`, MANIFEST_REFRESH_MS, async () => {
+      let content = null;
+      try {
+        content = await fetchStoredAsset(name);
+      } catch {
+        // fall back to a local copy
+      }
+      content = content || (await readLocal(path.join(REPORTS_DIR, name)));
+      return content ? buildEntry(content, type) : null;
+    });
+  } catch {
+    return null;
+  }
+}
+
+// --- Archive tier (runs moved out of analysis_runs by `python -m yulu_intel.archive`) ---
+// Partitions and the manifest are stored in Supabase; ../archive is only a local cache.
+const EMPTY_ARCHIVE = { partitions: {}, runs: {} };
+
+async function loadArchiveManifest() {
+  let text = null;
+  try {
+    text = await fetchStoredAsset("archive-manifest.json");
+  } catch {
+    // fall back to a local copy
+  }
+  text = text || (await readLocal(path.join(ARCHIVE_DIR, "manifest.json")));
+  try {
+    return text ? JSON.parse(text) : EMPTY_ARCHIVE;
+  } catch {
+    return EMPTY_ARCHIVE;
+  }
+}
+
+async function getArchiveManifest() {
+  try {
+    return await staleWhileRevalidate("archive-manifest", MANIFEST_REFRESH_MS, loadArchiveManifest);
+  } catch {
+    return EMPTY_ARCHIVE;
+  }
+}
+
+async function archivedReportDates() {
+  const { runs } = await getArchiveManifest();
+  return Object.keys(runs).filter((d) => runs[d].has_report);
+}
+
+function sha256(buf) {
+  return crypto.createHash("sha256").update(buf).digest("hex");
+}
+
+async function readPartition(key, part) {
+  // A local copy is used only while it matches the manifest checksum
+  try {
+    const raw = await fs.promises.readFile(path.join(ARCHIVE_DIR, part.file));
+    if (!part.sha256 || sha256(raw) === part.sha256) return raw;
+  } catch {
+    // not cached locally
+  }
+  if (!supabase) return null;
+  const { data } = await supabase
+    .from("archive_partitions")
+    .select("content")
+    .eq("key", key)
+    .limit(1);
+  if (!data || data.length === 0) return null;
+  return Buffer.from(data[0].content, "base64");
+}
+
+async function readArchivedReport(dateStr) {
+  const manifest = await getArchiveManifest();
+  const entry = manifest.runs[dateStr];
+  if (!entry || !entry.has_report) return null;
+  const part = manifest.partitions[entry.partition];
+  try {
+    const raw = await readPartition(entry.partition, part);
+    if (!raw) return null;
+    const body = (await gunzip(raw)).toString("utf-8");
+    for (const line of body.split("\n")) {
+      if (!line) continue;
+      const row = JSON.parse(line);
+      if (row.id === entry.id) return row.report_html || null;
+    }
+  } catch {
+    // partition missing or unreadable
+  }
+  return null;
+}
+
+// --- Report lookup: memory, local file, Supabase, archive ---
+async function fetchStoredReport(dateStr) {
+  if (!supabase) return null;
+  const { data } = await supabase
+    .from("analysis_runs")
+    .select("report_html")
+    .eq("run_date", dateStr)
+    .not("report_html", "is", null)
+    .order("id", { ascending: false })
+    .limit(1);
+  return data && data.length > 0 ? data[0].report_html : null;
+}
+
+async function storedReportDates() {
+  if (!supabase) return [];
+  return staleWhileRevalidate("stored-report-dates", INDEX_TTL_MS, async () => {
+    const { data, error } = await supabase
+      .from("analysis_runs")
+      .select("run_date")
+      .not("report_html", "is", null)
+      .order("run_date", { ascending: false });
+    if (error) throw new Error(error.message);
+    return [...new Set(data.map((row) => row.run_date))];
+  });
+}
+
+async function loadReport(dateStr) {
+  const key = `report:${dateStr}`;
+  const cached = cache.get(key);
+  if (cached) return cached;
+  return singleFlight(key, () => readReport(dateStr, key));
+}
+
+async function readReport(dateStr, key) {
+  const localPath = path.join(REPORTS_DIR, `${dateStr}.html`);
+  let html = await readLocal(localPath);
+
+  if (!html) {
+    try {
+      html = await fetchStoredReport(dateStr);
+      if (html) writeLocal(localPath, html);
+    } catch {
+      // ignore
+    }
+  }
+
+  if (!html) {
+    html = await readArchivedReport(dateStr);
+  }
+
+  if (!html) return null;
+  const entry = await buildEntry(html);
+  cache.set(key, entry);
+  return entry;
+}
+
+async function listLocalReportDates() {
+  try {
+    const files = await fs.promises.readdir(REPORTS_DIR);
+    return files
+      .filter((f) => /^\d{4}-\d{2}-\d{2}\.html$/.test(f))
+      .map((f) => f.replace(".html", ""))
+      .sort()
+      .reverse();
+  } catch {
+    // directory may not exist
+    return [];
+  }
+}
+
 // --- Root redirect ---
 app.get("/", (_req, res) => res.redirect("/reports"));
 
 // --- Health check ---
 app.get("/health", (_req, res) => {
-  res.json({ status: "ok", supabase: !!supabase, reportsDir: REPORTS_DIR });
+  res.json({
+    status: "ok",
+    supabase: !!supabase,
+    reportsDir: REPORTS_DIR,
+    cache: { entries: cache.entries.size, bytes: cache.bytes, maxBytes: cache.maxBytes },
+  });
+});
+
+// --- Shared report assets (content-hashed, so cacheable forever) ---
+app.get("/assets/:name", async (req, res) => {
+  const name = req.params.name;
+  if (!/^[\w-]+\.[0-9a-f]{12}\.(css|js)$/.test(name)) {
+    return res.status(400).send("Invalid asset name.");
+  }
+  const key = `asset:${name}`;
+  const entry =
+    cache.get(key) ||
+    (await singleFlight(key, async () => {
+      const localPath = path.join(ASSETS_DIR, name);
+      let content = await readLocal(localPath);
+      if (!content) {
+        try {
+          content = await fetchStoredAsset(name);
+          if (content) writeLocal(localPath, content);
+        } catch {
+          // ignore
+        }
+      }
+      if (!content) return null;
+      const built = await buildEntry(content, path.extname(name));
+      cache.set(key, built);
+      return built;
+    }));
+
+  if (!entry) return res.status(404).send("Asset not found.");
+  sendEntry(req, res, entry, "public, max-age=31536000, immutable");
+});
+
+// --- Trends dashboard (built by yulu_intel/trends.py) ---
+app.get("/trends", async (req, res) => {
+  const entry = await loadGeneratedFile("trends.html", "html");
+  if (!entry) return res.status(404).send("No trends yet. Run the agent to generate them.");
+  sendEntry(req, res, entry);
+});
+
+app.get("/trends.json", async (req, res) => {
+  const entry = await loadGeneratedFile("trends.json", "json");
+  if (!entry) return res.status(404).json({ error: "No trends yet." });
+  sendEntry(req, res, entry);
 });
 
 // --- Redirect to latest report ---
 app.get("/report/latest", async (_req, res) => {
-  // Try local files first
+  // Manifest answers without touching the disk or Supabase
+  const current = await getManifest();
+  if (current && current.latest) {
+    return res.redirect(`/report/${current.latest}`);
+  }
+
+  // Try local files
+  const local = await listLocalReportDates();
+  if (local.length > 0) {
+    return res.redirect(`/report/${local[0]}`);
+  }
+
+  // Fallback: Supabase
   try {
-    const files = fs
-      .readdirSync(REPORTS_DIR)
-      .filter((f) => f.endsWith(".html"))
-      .sort()
-      .reverse();
-    if (files.length > 0) {
-      const dateStr = files[0].replace(".html", "");
-      return res.redirect(`/report/${dateStr}`);
+    const stored = await storedReportDates();
+    if (stored.length > 0) {
+      return res.redirect(`/report/${stored[0]}`);
     }
   } catch {
-    // directory may not exist
+    // ignore
   }
 
-  // Fallback: Supabase
-  if (supabase) {
-    try {
-      const { data } = await supabase
-        .from("analysis_runs")
-        .select("run_date")
-        .not("report_html", "is", null)
-        .order("run_date", { ascending: false })
-        .limit(1);
-      if (data && data.length > 0) {
-        return res.redirect(`/report/${data[0].run_date}`);
-      }
-    } catch {
-      // ignore
-    }
+  // Fallback: archive
+  const archived = (await archivedReportDates()).sort().reverse();
+  if (archived.length > 0) {
+    return res.redirect(`/report/${archived[0]}`);
   }
 
   res.status(404).send("No reports found.");
@@ -68,74 +472,50 @@ app.get("/report/:date", async (req, res) => {
     return res.status(400).send("Invalid date format. Use YYYY-MM-DD.");
   }
 
-  const localPath = path.join(REPORTS_DIR, `${dateStr}.html`);
-
-  // Try local file
-  if (fs.existsSync(localPath)) {
-    return res.sendFile(localPath);
-  }
-
-  // Supabase fallback — fetch and cache locally
-  if (supabase) {
-    try {
-      const { data } = await supabase
-        .from("analysis_runs")
-        .select("report_html")
-        .eq("run_date", dateStr)
-        .not("report_html", "is", null)
-        .order("run_date", { ascending: false })
-        .limit(1);
-
-      if (data && data.length > 0 && data[0].report_html) {
-        // Cache locally
-        fs.mkdirSync(REPORTS_DIR, { recursive: true });
-        fs.writeFileSync(localPath, data[0].report_html, "utf-8");
-        return res.type("html").send(data[0].report_html);
-      }
-    } catch {
-      // ignore
-    }
+  const entry = await loadReport(dateStr);
+  if (entry) {
+    return sendEntry(req, res, entry);
   }
 
   res.status(404).send(`No report found for ${dateStr}.`);
 });
 
 // --- Index page: list all reports ---
-app.get("/reports", async (_req, res) => {
+app.get("/reports", async (req, res) => {
+  // Pre-rendered, paginated index from the manifest
+  const page = Math.max(1, parseInt(req.query.page, 10) || 1);
+  const current = await getManifest();
+  if (current) {
+    const entry = await getIndexPage(page);
+    if (entry) return sendEntry(req, res, entry);
+    if (page > 1) return res.status(404).send("No such page.");
+  }
+
+  // Fallback: list local files and Supabase rows
   const reports = [];
 
   // Collect from local files
+  for (const date of await listLocalReportDates()) {
+    reports.push({ date, source: "local" });
+  }
+
+  // Collect from Supabase (merge, avoiding duplicates)
   try {
-    const files = fs
-      .readdirSync(REPORTS_DIR)
-      .filter((f) => f.endsWith(".html"))
-      .sort()
-      .reverse();
-    for (const f of files) {
-      reports.push({ date: f.replace(".html", ""), source: "local" });
+    const existing = new Set(reports.map((r) => r.date));
+    for (const date of await storedReportDates()) {
+      if (!existing.has(date)) {
+        reports.push({ date, source: "supabase" });
+      }
     }
   } catch {
-    // directory may not exist
+    // ignore
   }
 
-  // Collect from Supabase (merge, avoiding duplicates)
-  if (supabase) {
-    try {
-      const { data } = await supabase
-        .from("analysis_runs")
-        .select("run_date")
-        .not("report_html", "is", null)
-        .order("run_date", { ascending: false });
-      if (data) {
-        const existing = new Set(reports.map((r) => r.date));
-        for (const row of data) {
-          if (!existing.has(row.run_date)) {
-            reports.push({ date: row.run_date, source: "supabase" });
-          }
-        }
-      }
-    } catch {
-      // ignore
+  // Collect from archive
+  const known = new Set(reports.map((r) => r.date));
+  for (const d of await archivedReportDates()) {
+    if (!known.has(d)) {
+      reports.push({ date: d, source: "archive" });
     }
   }
 
@@ -184,9 +564,12 @@ ${reports.length === 0 ? '<p class="empty">No reports yet. Run the agent to gene
 </html>`);
 });
 
+getManifest();
+
 app.listen(PORT, () => {
   console.log(`CompeteIQ reports server running on http://localhost:${PORT}`);
   console.log(`  Reports index:  http://localhost:${PORT}/reports`);
   console.log(`  Latest report:  http://localhost:${PORT}/report/latest`);
+  console.log(`  Trends:         http://localhost:${PORT}/trends`);
   console.log(`  Health check:   http://localhost:${PORT}/health`);
 });
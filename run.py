@@ -3,14 +3,36 @@ import logging
 import os
 import sys
 from datetime import date
+from pathlib import Path
 
 from yulu_intel.config import settings
-from yulu_intel.db import detect_and_store, init_db, is_first_run, store_report_html
-from yulu_intel.search import search_product_initial, search_product_deep, search_competitor_news
-from yulu_intel.analyzer import analyze_product, extract_news
-from yulu_intel.formatter import format_summary
-from yulu_intel.html_report import generate_html_report
-from yulu_intel.slack import send_messages
+from yulu_intel.documents import PromptBuilder
+from yulu_intel.db import (
+    detect_and_store,
+    init_db,
+    is_first_run,
+    store_report_assets,
+    store_report_html,
+)
+from yulu_intel.search import search_product_initial, search_product_deep, stream_competitor_news
+from yulu_intel.batch import uses_local_backend as batches_run_locally
+from yulu_intel.analyzer import analysis_data_chars, analyze_product, extract_news, extract_news_batch, news_call_tokens
+from yulu_intel.formatter import render_slack_summary
+from yulu_intel.html_report import render_html
+from yulu_intel.json_report import render_json
+from yulu_intel.manifest import record_report
+from yulu_intel.markdown_report import render_markdown
+from yulu_intel.news_dedup import dedup_news
+from yulu_intel.outbox import enqueue as enqueue_slack, flush as flush_outbox
+from yulu_intel.prefilter import finish_run as finish_prefilter, log_stats as log_prefilter_stats
+from yulu_intel.query_planner import finish_run as finish_query_planner, recent_competitors, start_run as start_query_planner
+from yulu_intel.report_assets import build_bundle
+from yulu_intel.search_index import update_local_index
+from yulu_intel.slack import SlackDeliveryError
+from yulu_intel.tracing import critical_path_table, export as export_trace, finish_trace, span, start_trace
+from yulu_intel.trends import append_run as append_trends
+from yulu_intel.usage import start_run as start_llm_usage
+from yulu_intel.view import build_view, threat_score
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,84 +42,180 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main() -> None:
-    product = settings.PRODUCT_NAME
-    logger.info("=== Yulu Competitive Intel Run: %s ===", product)
+async def run_pipeline(product: str) -> None:
+    # A real batch can take 24h; the daily job would time out and publish without news
+    if settings.news_extraction_mode == "batch" and not batches_run_locally():
+        raise RuntimeError(
+            "NEWS_EXTRACTION_MODE=batch needs OPENAI_BATCH_BACKEND=local in run.py: "
+            "a Batch API job can take up to 24h, longer than the daily run"
+        )
+    ledger = start_llm_usage()
+    start_query_planner()
 
     # 1. Init DB
-    init_db()
-    first_run = is_first_run()
+    with span("init"):
+        init_db()
+        first_run = is_first_run()
     if first_run:
         logger.info("First run detected — all competitors will be marked as new")
 
-    # 2. Search
+    # 2. Search: documents stream into one bounded prompt; once it is full no more queries are sent
+    builder = PromptBuilder(analysis_data_chars())
     logger.info("Phase 1: Initial search...")
-    initial_text, seen_urls = await search_product_initial(product)
-    logger.info("  Initial search returned %d chars", len(initial_text))
+    with span("search_initial"):
+        seen_urls = await search_product_initial(product, builder)
+    logger.info("  Initial search added %d chars", builder.chars)
 
     logger.info("Phase 2: Deep search...")
-    deep_text = await search_product_deep(product, seen_urls)
-    logger.info("  Deep search returned %d chars", len(deep_text))
-
-    search_data = initial_text
-    if deep_text:
-        search_data = search_data + "\n---\n" + deep_text
+    with span("search_deep"):
+        before = builder.chars
+        await search_product_deep(product, seen_urls, builder, recent_competitors())
+    logger.info("  Deep search added %d chars (%d documents over budget)", builder.chars - before, builder.dropped)
 
     # 3. Analyze
     logger.info("Phase 3: AI analysis...")
-    analysis = await asyncio.to_thread(analyze_product, product, search_data)
+    with span("analyze"):
+        analysis = await asyncio.to_thread(analyze_product, product, builder.text())
     logger.info("  Found %d competitors", len(analysis.competitors))
 
-    # 4. News search + extraction per competitor
-    competitor_names = [c.name for c in analysis.competitors]
-    logger.info("Phase 4: News search for %d competitors...", len(competitor_names))
-    news_data = await search_competitor_news(competitor_names)
-    logger.info("  Got news search results for: %s", list(news_data.keys()) or "(none)")
-
-    all_news = []
-    for name, search_text in news_data.items():
-        items = await asyncio.to_thread(extract_news, name, search_text)
-        linked = [item for item in items if item.url]
-        all_news.extend(linked)
-        logger.info("  %s: %d news items (%d with URLs)", name, len(items), len(linked))
-
+    # 4. News search + extraction per competitor, pipelined: one competitor's extraction runs
+    # while the next is searched. Extraction is optional work, so the biggest threats go first
+    # and a tight LLM budget skips the rest.
+    competitor_names = [c.name for c in sorted(analysis.competitors, key=lambda c: -threat_score(c))]
+    logger.info("Phase 4: News search and extraction for %d competitors...", len(competitor_names))
+    # In batch mode the texts are collected and extracted in one Batch API job instead.
+    use_batch = settings.news_extraction_mode == "batch"
+    extractions = []
+    batch_texts = {}
+    with span("news"):
+        async for name, search_text in stream_competitor_news(competitor_names):
+            estimate = news_call_tokens(search_text)
+            # Calls still in flight have not reported usage yet
+            in_flight = sum(est for _, task, est in extractions if not task.done())
+            in_flight += sum(news_call_tokens(text) for text in batch_texts.values())
+            if not ledger.allows(in_flight + estimate):
+                ledger.skip(f"news:{name}")
+                logger.warning("  %s: news extraction skipped (LLM budget)", name)
+                continue
+            if use_batch:
+                batch_texts[name] = search_text
+                continue
+            task = asyncio.create_task(asyncio.to_thread(extract_news, name, search_text))
+            extractions.append((name, task, estimate))
+        log_prefilter_stats()
+
+        if use_batch and batch_texts:
+            batch_items = await asyncio.to_thread(extract_news_batch, batch_texts, f"news-{date.today().isoformat()}")
+            extractions = [(name, batch_items.get(name, []), 0) for name in batch_texts]
+
+        all_news = []
+        for name, pending, _ in extractions:
+            items = pending if use_batch else await pending
+            linked = [item for item in items if item.url]
+            all_news.extend(linked)
+            logger.info("  %s: %d news items (%d with URLs)", name, len(items), len(linked))
+
+        all_news = dedup_news(all_news)
     analysis.news_digest = all_news
     logger.info("  Total news items: %d", len(all_news))
+    ledger.log_summary()
 
     # 5. Detect new competitors & store analysis in Supabase
     logger.info("Phase 5: Competitor tracking...")
-    new_competitors, returning_competitors = detect_and_store(analysis)
+    with span("store"):
+        new_competitors, returning_competitors = detect_and_store(analysis, llm_usage=ledger.totals())
     logger.info("  New: %s", new_competitors or "(none)")
     logger.info("  Returning: %s", returning_competitors or "(none)")
 
     # 6. Generate HTML report
     logger.info("Phase 6: Generating HTML report...")
-    report_html = generate_html_report(analysis, new_competitors, returning_competitors, first_run)
-
-    # Write to local file
-    reports_dir = os.path.join(os.path.dirname(__file__), "reports")
-    os.makedirs(reports_dir, exist_ok=True)
-    today_str = date.today().isoformat()
-    report_path = os.path.join(reports_dir, f"{today_str}.html")
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(report_html)
-    logger.info("  Report saved to %s", report_path)
-
-    # Store report HTML in Supabase
-    store_report_html(today_str, report_html)
-    logger.info("  Report HTML stored in Supabase")
+    with span("report"):
+        reports_dir = os.path.join(os.path.dirname(__file__), "reports")
+        os.makedirs(reports_dir, exist_ok=True)
+
+        # Shared CSS/JS are written once under content-hashed names
+        assets = None
+        if settings.report_asset_mode == "linked":
+            assets = build_bundle()
+            assets.write(Path(reports_dir) / "assets")
+            uploaded = store_report_assets(assets.files)
+            logger.info("  Shared assets: %s (%d uploaded)", ", ".join(assets.files), uploaded)
+
+        # One view-model feeds every output channel
+        today_str = date.today().isoformat()
+        report_url = None
+        if settings.REPORT_BASE_URL:
+            report_url = f"{settings.REPORT_BASE_URL.rstrip('/')}/report/{today_str}"
+        view = build_view(analysis, new_competitors, returning_competitors, first_run, report_url=report_url)
+
+        report_html = render_html(view, assets)
+        logger.info("  Report HTML is %d bytes", len(report_html.encode("utf-8")))
+
+        # Write to local files (HTML plus Markdown and JSON exports)
+        report_path = os.path.join(reports_dir, f"{today_str}.html")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report_html)
+        for ext, content in (("md", render_markdown(view)), ("json", render_json(view))):
+            with open(os.path.join(reports_dir, f"{today_str}.{ext}"), "w", encoding="utf-8") as f:
+                f.write(content)
+        logger.info("  Report saved to %s (+ .md, .json)", report_path)
+
+    with span("publish"):
+        # Store report HTML in Supabase
+        store_report_html(today_str, report_html)
+        logger.info("  Report HTML stored in Supabase")
+
+        manifest = record_report(today_str, report_html, analysis)
+        logger.info("  Manifest and index updated (%d reports)", len(manifest["reports"]))
+
+        trends = append_trends(today_str, analysis)
+        logger.info("  Trends aggregate updated (%d runs)", len(trends["days"]))
+
+        n_docs = update_local_index(today_str, analysis)
+        if n_docs is None:
+            logger.info("  No local search index; `python -m yulu_intel.search_index --sync` builds one")
+        else:
+            logger.info("  Indexed %d documents for full-text search", n_docs)
+
+        finish_query_planner(analysis)
+        finish_prefilter()
 
     # 7. Build short Slack summary
     logger.info("Phase 7: Formatting Slack summary...")
-    report_url = None
-    if settings.REPORT_BASE_URL:
-        report_url = f"{settings.REPORT_BASE_URL.rstrip('/')}/report/{today_str}"
-    payloads = format_summary(analysis, report_url)
+    payloads = render_slack_summary(view)
     logger.info("  Built %d message(s)", len(payloads))
 
-    # 8. Send to Slack
+    # 8. Queue for Slack and deliver (undelivered messages stay queued for the next flush)
     logger.info("Phase 8: Sending to Slack...")
-    send_messages(payloads)
+    with span("slack"):
+        queued = enqueue_slack(today_str, payloads)
+        logger.info("  Queued %d message(s)", queued)
+        results = flush_outbox()
+    undelivered = sum(left for _, left in results.values())
+    if undelivered:
+        raise SlackDeliveryError(
+            f"{undelivered} Slack message(s) left in the outbox; retry with `python -m yulu_intel.outbox flush`"
+        )
+
+
+async def main() -> None:
+    product = settings.PRODUCT_NAME
+    logger.info("=== Yulu Competitive Intel Run: %s ===", product)
+
+    # Every phase and outbound call is timed; the trace is exported even when the run fails
+    start_trace("daily_run", product=product)
+    outcome = "error"
+    try:
+        await run_pipeline(product)
+        outcome = "ok"
+    finally:
+        trace = finish_trace(outcome)
+        try:
+            trace_path, metrics_path = export_trace(trace)
+            logger.info("Trace written to %s, metrics to %s", trace_path, metrics_path)
+        except OSError as e:
+            logger.warning("Could not export trace: %s", e)
+        logger.info("Critical path (%.1fs):\n%s", trace.root.duration, critical_path_table(trace.spans, trace.root))
     logger.info("=== Done ===")
 
 
@@ -0,0 +1,68 @@
+-- Supabase schema for yulu_intel and the reports server.
+-- Run in the Supabase SQL editor (or psql) before the first deploy; every
+-- statement is idempotent, so re-running it after an upgrade adds what is new.
+
+create table if not exists competitors (
+  id bigint generated by default as identity primary key,
+  name text not null,
+  normalized_name text not null unique,
+  first_seen_date date not null,
+  last_seen_date date not null,
+  times_seen integer not null default 1
+);
+
+create table if not exists analysis_runs (
+  id bigint generated by default as identity primary key,
+  run_date date not null,
+  product_name text not null,
+  analysis_json text not null,
+  competitor_names text,
+  new_competitors text,
+  report_html text
+);
+create index if not exists analysis_runs_run_date_idx on analysis_runs (run_date, id);
+-- LLM token, latency and cost totals per run (yulu_intel/usage.py), as JSON
+alter table analysis_runs add column if not exists llm_usage text;
+
+-- Month partitions of archived analysis_runs (yulu_intel/archive.py):
+-- gzip JSONL, base64-encoded, with its SHA-256 for verification.
+create table if not exists archive_partitions (
+  key text primary key,  -- YYYY-MM
+  file text not null,
+  runs integer not null,
+  bytes integer not null,
+  sha256 text not null,
+  content text not null,
+  updated_at timestamptz not null default now()
+);
+
+-- Content-hashed report assets (CSS/JS/images, yulu_intel/report_assets.py)
+-- and mutable generated files (manifest, index pages, trends, planner stats)
+-- served by the reports server.
+create table if not exists report_assets (
+  name text primary key,
+  content text not null,
+  updated_at timestamptz not null default now()
+);
+
+-- Slack outbox (yulu_intel/outbox.py): one row per (destination, message),
+-- delivered in id order; run_id groups a run's messages into one thread.
+create table if not exists slack_outbox (
+  id bigint generated by default as identity primary key,
+  run_id text,
+  run_date date not null,
+  destination text not null,
+  seq integer not null,
+  payload text not null,
+  status text not null default 'pending',  -- pending | sent | failed
+  attempts integer not null default 0,
+  last_error text,
+  slack_ts text,
+  sent_at timestamptz,
+  created_at timestamptz not null default now()
+);
+-- Outboxes created before run_id existed: thread old rows by date, as before
+alter table slack_outbox add column if not exists run_id text;
+update slack_outbox set run_id = run_date::text where run_id is null;
+create index if not exists slack_outbox_pending_idx on slack_outbox (status, id);
+create index if not exists slack_outbox_thread_idx on slack_outbox (destination, run_id, seq);
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.memstore import MemoryStore
+from yulu_intel import db
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Supabase replaced by the in-memory store used by the benchmarks."""
+    memory = MemoryStore()
+    monkeypatch.setattr(db, "_client", memory)
+    return memory
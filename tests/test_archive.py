@@ -0,0 +1,81 @@
+import base64
+import json
+import shutil
+from datetime import date, timedelta
+
+import pytest
+
+from yulu_intel import archive
+
+
+def _runs(store, days_ago):
+    for d in days_ago:
+        run_date = (date.today() - timedelta(days=d)).isoformat()
+        store.insert("analysis_runs", {"run_date": run_date, "analysis_json": "{}", "report_html": f"<p>{run_date}</p>"})
+
+
+def test_archive_uploads_verified_partitions_before_deleting(store, tmp_path):
+    _runs(store, [400, 399, 370, 5])
+    assert archive.archive_runs(90, archive_dir=tmp_path) == 3
+
+    assert [r["run_date"] for r in store.rows("analysis_runs")] == [(date.today() - timedelta(days=5)).isoformat()]
+    manifest = json.loads(archive.get_report_asset(archive.MANIFEST_ASSET))
+    stored = {row["key"]: row for row in store.rows("archive_partitions")}
+    assert set(stored) == set(manifest["partitions"])
+    for key, part in manifest["partitions"].items():
+        assert archive._sha256(base64.b64decode(stored[key]["content"])) == part["sha256"]
+
+
+def test_readers_fall_back_to_supabase_without_local_files(store, tmp_path):
+    _runs(store, [400, 399])
+    archive.archive_runs(90, archive_dir=tmp_path)
+    shutil.rmtree(tmp_path)
+
+    rows = list(archive.iter_archived_runs("run_date, report_html", archive_dir=tmp_path))
+    assert len(rows) == 2
+    run_date = rows[0]["run_date"]
+    assert archive.get_archived_run(run_date, archive_dir=tmp_path)["report_html"] == f"<p>{run_date}</p>"
+
+
+def test_stale_local_partition_is_replaced_from_supabase(store, tmp_path):
+    _runs(store, [400])
+    archive.archive_runs(90, archive_dir=tmp_path)
+    manifest = archive.load_manifest(tmp_path)
+    (key, part), = manifest["partitions"].items()
+    (tmp_path / part["file"]).write_bytes(b"stale")
+
+    assert len(list(archive.iter_archived_runs(archive_dir=tmp_path))) == 1
+    assert archive._sha256((tmp_path / part["file"]).read_bytes()) == part["sha256"]
+
+
+def test_failed_verification_keeps_rows(store, tmp_path, monkeypatch):
+    _runs(store, [400, 399])
+    monkeypatch.setattr(archive, "get_archive_partition", lambda key: {"sha256": "x", "content": ""})
+    with pytest.raises(RuntimeError):
+        archive.archive_runs(90, archive_dir=tmp_path)
+    assert len(store.rows("analysis_runs")) == 2
+
+
+def test_rearchiving_merges_into_stored_partition(store, tmp_path):
+    _runs(store, [400])
+    archive.archive_runs(90, archive_dir=tmp_path)
+    shutil.rmtree(tmp_path)
+    first = store.rows("archive_partitions")[0]["key"]
+    # A later run (on another machine) archives more rows of the same month
+    store.insert("analysis_runs", {"run_date": f"{first}-01", "analysis_json": "{}"})
+    store.insert("analysis_runs", {"run_date": f"{first}-28", "analysis_json": "{}"})
+    archive.archive_runs(90, archive_dir=tmp_path)
+
+    manifest = archive.load_manifest(tmp_path)
+    assert sum(p["runs"] for p in manifest["partitions"].values()) == 3
+
+
+def test_local_only_partitions_are_uploaded(store, tmp_path):
+    rows = [{"id": 1, "run_date": "2024-05-02", "analysis_json": "{}"}]
+    manifest = archive._empty_manifest()
+    archive._write_partition(manifest, tmp_path, "2024-05", rows)
+    archive._save_manifest(manifest, tmp_path)
+
+    archive.archive_runs(90, archive_dir=tmp_path)
+    assert [r["key"] for r in store.rows("archive_partitions")] == ["2024-05"]
+    assert "2024-05" in json.loads(archive.get_report_asset(archive.MANIFEST_ASSET))["partitions"]
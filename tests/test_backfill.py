@@ -0,0 +1,27 @@
+import json
+
+from benchmarks.synthetic import make_analysis
+from yulu_intel import backfill
+from yulu_intel.report_assets import build_bundle
+
+
+def test_store_uploads_assets_and_rebuilds_manifest(store, tmp_path):
+    analysis = make_analysis(n_competitors=3, n_news=4)
+    store.insert("analysis_runs", {
+        "run_date": "2026-01-01",
+        "product_name": analysis.product_name,
+        "analysis_json": analysis.model_dump_json(),
+        "new_competitors": "[]",
+        "report_html": "<p>old</p>",
+    })
+
+    assert backfill.backfill(workers=1, store=True, out_dir=tmp_path) == 1
+
+    assets = {row["name"]: row["content"] for row in store.rows("report_assets")}
+    assert set(build_bundle().files) <= set(assets)
+    [row] = store.rows("analysis_runs")
+    assert row["report_html"] != "<p>old</p>"
+    assert build_bundle().css_href in row["report_html"]
+    manifest = json.loads(assets["manifest.json"])
+    assert manifest["latest"] == "2026-01-01"
+    assert (tmp_path / "index.html").exists()
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+import run
+from yulu_intel import batch, models, usage
+from yulu_intel.config import settings
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "BATCH_DIR", tmp_path)
+    monkeypatch.setattr(settings, "openai_batch_poll_seconds", 0)
+    monkeypatch.setattr(usage, "ledger", usage.UsageLedger())
+    return batch.LocalBackend(tmp_path / "local")
+
+
+def test_placeholder_satisfies_the_strict_schema():
+    for model in (models.NewsExtractionResponse, models.CompetitiveAnalysis):
+        schema = batch._response_format(model)["json_schema"]["schema"]
+        model.model_validate(batch.placeholder(schema))
+
+
+def test_strict_schema_closes_objects_and_requires_every_property():
+    schema = batch._response_format(models.NewsExtractionResponse)["json_schema"]["schema"]
+    item = schema["$defs"]["NewsDigestItem"]
+    assert item["additionalProperties"] is False
+    assert set(item["required"]) == set(item["properties"]) and "url" in item["required"]
+    assert "default" not in item["properties"]["url"]
+    assert "also_competitors" not in item["properties"]
+
+
+def test_local_batch_submits_polls_and_collects(local):
+    requests = [
+        batch.BatchRequest(name, "news_extract", [{"role": "user", "content": name}], models.NewsExtractionResponse)
+        for name in ("Bounce", "Vogo")
+    ]
+    result = batch.run(requests, "news-test", backend=local)
+    assert result.status == "completed"
+    assert result.errors == {}
+    assert {cid: parsed.items for cid, parsed in result.parsed.items()} == {"Bounce": [], "Vogo": []}
+    assert usage.ledger.totals()["calls"] == 2
+
+
+def test_collect_reports_requests_missing_from_an_unfinished_batch(local):
+    requests = [batch.BatchRequest("a", "news_extract", [], models.NewsExtractionResponse)]
+    batch_id = batch.submit(requests, "pending", backend=local)
+    result = batch.collect(batch_id, local.retrieve(batch_id), backend=local)
+    assert result.parsed == {}
+    assert result.errors == {"a": "no result (batch in_progress)"}
+
+
+def test_run_refuses_real_batches(monkeypatch):
+    monkeypatch.setattr(settings, "news_extraction_mode", "batch")
+    monkeypatch.setattr(settings, "openai_batch_backend", "openai")
+    monkeypatch.setattr(settings, "replay_mode", "")
+    with pytest.raises(RuntimeError, match="OPENAI_BATCH_BACKEND=local"):
+        asyncio.run(run.run_pipeline("Yulu"))
@@ -0,0 +1,36 @@
+from yulu_intel.documents import MIN_PARTIAL_CHARS, SEPARATOR, PromptBuilder, format_document
+
+
+def _doc(i, body_chars=200):
+    return {"title": f"Doc {i}", "href": f"https://example.com/{i}", "body": "b" * body_chars}
+
+
+def test_add_counts_separators_and_joins_once():
+    builder = PromptBuilder(10_000)
+    assert builder.add(_doc(1)) and builder.add(_doc(2))
+    expected = format_document(_doc(1)) + SEPARATOR + format_document(_doc(2))
+    assert builder.text() == expected
+    assert builder.chars == len(expected)
+    assert builder.remaining == 10_000 - len(expected)
+
+
+def test_add_truncates_the_last_document_to_fit_exactly():
+    first = format_document(_doc(1))
+    budget = len(first) + len(SEPARATOR) + len(format_document(_doc(2, 0))) + MIN_PARTIAL_CHARS + 100
+    builder = PromptBuilder(budget)
+    builder.add(_doc(1))
+    assert builder.add(_doc(2, 5_000))
+    assert builder.full
+    assert builder.chars == len(builder.text()) == budget
+    assert builder.parts[1] == format_document(_doc(2, 5_000), MIN_PARTIAL_CHARS + 100)
+
+
+def test_add_drops_documents_once_full_or_when_too_little_fits():
+    first = format_document(_doc(1))
+    builder = PromptBuilder(len(first) + len(SEPARATOR) + 100)
+    builder.add(_doc(1))
+    assert not builder.add(_doc(2, 5_000))
+    assert builder.full
+    assert not builder.add(_doc(3, 10))
+    assert builder.dropped == 2
+    assert builder.text() == first
@@ -0,0 +1,57 @@
+import json
+
+from yulu_intel import formatter
+from yulu_intel.formatter import _divider, _header, _section, _split_text, pack_blocks
+
+
+def test_split_text_keeps_lines_whole_when_they_fit():
+    text = "\n".join(["a" * 40] * 5)
+    chunks = _split_text(text, limit=100)
+    assert chunks == ["\n".join(["a" * 40] * 2)] * 2 + ["a" * 40]
+    assert "\n".join(chunks) == text
+
+
+def test_split_text_cuts_long_lines_at_spaces():
+    line = " ".join(["word"] * 50)
+    chunks = _split_text(f"intro\n{line}", limit=60)
+    assert chunks[0] == "intro"
+    assert all(len(c) <= 60 for c in chunks)
+    assert all(not c.startswith(" ") and not c.endswith(" ") for c in chunks[1:-1])
+    assert " ".join(chunks[1:]) == line
+
+
+def test_split_text_hard_cuts_unbroken_text():
+    assert _split_text("x" * 25, limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_pack_blocks_splits_oversized_sections_without_losing_text():
+    text = "\n".join(f"line {i} " + "y" * 90 for i in range(100))
+    [message] = pack_blocks([_section(text)])
+    sections = [b["text"]["text"] for b in message["blocks"]]
+    assert len(sections) > 1
+    assert all(len(s) <= formatter.MAX_SECTION_CHARS for s in sections)
+    assert "\n".join(sections) == text
+
+
+def test_pack_blocks_respects_block_and_byte_limits(monkeypatch):
+    monkeypatch.setattr(formatter, "MAX_PAYLOAD_BYTES", 2000)
+    blocks = [_section(f"item {i} " + "z" * 100) for i in range(120)]
+    messages = pack_blocks(blocks)
+    assert all(len(m["blocks"]) <= formatter.MAX_BLOCKS for m in messages)
+    assert all(len(json.dumps(m)) <= 2000 for m in messages)
+    assert [b for m in messages for b in m["blocks"]] == blocks
+
+
+def test_pack_blocks_moves_headers_with_their_content_and_drops_edge_dividers(monkeypatch):
+    monkeypatch.setattr(formatter, "MAX_BLOCKS", 3)
+    blocks = [_section("a"), _section("b"), _header("Next"), _divider(), _section("c"), _section("d"), _divider(), _section("e")]
+    messages = [m["blocks"] for m in pack_blocks(blocks)]
+    assert messages == [
+        [_section("a"), _section("b")],
+        [_header("Next"), _divider(), _section("c")],
+        [_section("d"), _divider(), _section("e")],
+    ]
+    assert pack_blocks([_section("a"), _section("b"), _section("c"), _divider(), _section("d")]) == [
+        {"blocks": [_section("a"), _section("b"), _section("c")]},
+        {"blocks": [_section("d")]},
+    ]
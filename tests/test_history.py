@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+
+from yulu_intel.history import SENTIMENTS, UNKNOWN, build_history
+
+
+def _row(run_date, competitors=(), news=()):
+    return {
+        "run_date": run_date,
+        "analysis_json": json.dumps({"competitors": list(competitors), "news_digest": list(news)}),
+    }
+
+
+def _comp(name, strengths=1, sentiment="neutral"):
+    return {"name": name, "strengths": ["s"] * strengths, "weaknesses": [], "sentiment": {"net_sentiment": sentiment}}
+
+
+def test_rows_are_sorted_and_names_normalized():
+    history = build_history([
+        _row("2026-02-01", [_comp("Bounce")]),
+        _row("2026-01-01", [_comp("bounce "), _comp("Rapido")]),
+    ])
+    assert [str(d) for d in history.run_dates] == ["2026-01-01", "2026-02-01"]
+    assert history.competitors == ["bounce ", "Rapido"]
+    assert history.app_run.tolist() == [0, 0, 1]
+    assert history.app_comp.tolist() == [0, 1, 0]
+
+
+def test_competitor_appearances_counts_distinct_runs():
+    history = build_history([
+        _row("2026-01-01", [_comp("Bounce", strengths=1), _comp("Bounce", strengths=3)]),
+        _row("2026-01-02", [_comp("Bounce", strengths=2), _comp("Ola")]),
+    ])
+    assert history.competitor_appearances().tolist() == [2, 1]
+    # The mean is over appearance rows: (2 + 6 + 4) / 3
+    assert history.mean_threat_by_competitor()[0] == 4.0
+    assert history.top_competitors(1) == [("Bounce", 2, 4.0)]
+
+
+def test_threat_score_adds_positive_sentiment_and_caps():
+    history = build_history([_row("2026-01-01", [_comp("A", 2, "positive"), _comp("B", 9, "negative")])])
+    assert history.threat_scores().tolist() == [5, 10]
+    assert history.app_sentiment.tolist() == [SENTIMENTS.index("positive"), SENTIMENTS.index("negative")]
+
+
+def test_news_type_codes_do_not_overflow():
+    news = [{"competitor_name": "A", "type": f"type-{i}"} for i in range(300)] + [{"competitor_name": "A"}]
+    history = build_history([_row("2026-01-01", news=news)])
+    assert history.news_type.dtype == np.int16
+    assert history.news_type[299] == 299
+    assert history.news_type[-1] == UNKNOWN
+
+
+def test_last_reindexes_runs():
+    history = build_history([_row(f"2026-01-0{d}", [_comp("A")], [{"competitor_name": "A", "type": "funding"}]) for d in (1, 2, 3)])
+    recent = history.last(2)
+    assert recent.n_runs == 2
+    assert recent.app_run.tolist() == [0, 1]
+    assert recent.news_run.tolist() == [0, 1]
+
+
+def test_news_type_mix_by_month():
+    history = build_history([
+        _row("2026-01-05", news=[{"competitor_name": "A", "type": "Funding"}, {"competitor_name": "A", "type": "launch"}]),
+        _row("2026-02-05", news=[{"competitor_name": "B", "type": "funding"}]),
+    ])
+    months, types, counts = history.news_type_mix_by_month()
+    assert months == ["2026-01", "2026-02"]
+    assert types == ["funding", "launch"]
+    assert counts.tolist() == [[1, 1], [1, 0]]
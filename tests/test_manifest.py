@@ -0,0 +1,26 @@
+import json
+
+from benchmarks.synthetic import make_analysis
+from yulu_intel import manifest
+
+
+def _entry(run_date):
+    return manifest.make_entry(run_date, f"<p>{run_date}</p>", make_analysis(n_competitors=1, n_news=1))
+
+
+def test_record_report_starts_from_the_stored_manifest_not_a_stale_local_one(store, tmp_path):
+    manifest.save_manifest({"reports": [_entry("2026-10-16"), _entry("2026-10-17")]}, tmp_path / "ci")
+    manifest.save_manifest({"reports": [_entry("2026-10-01")]}, tmp_path, upload=False)
+
+    analysis = make_analysis(n_competitors=1, n_news=1)
+    manifest.record_report("2026-10-18", "<p>today</p>", analysis, tmp_path)
+
+    stored = json.loads(manifest.get_report_asset(manifest.MANIFEST_NAME))
+    assert [r["date"] for r in stored["reports"]] == ["2026-10-18", "2026-10-17", "2026-10-16"]
+    assert stored["generated_at"].endswith("Z") and len(stored["generated_at"]) == 20
+    assert "2026-10-17" in manifest.get_report_asset("index.html")
+
+
+def test_local_manifest_is_the_offline_fallback(store, tmp_path):
+    manifest.save_manifest({"reports": [_entry("2026-10-01")]}, tmp_path, upload=False)
+    assert manifest.load_manifest(tmp_path)["latest"] == "2026-10-01"
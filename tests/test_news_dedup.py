@@ -0,0 +1,51 @@
+from datetime import date
+
+from yulu_intel import news_dedup
+from yulu_intel.models import NewsDigestItem, NewsExtractionResponse
+
+
+def _item(competitor, headline, url=None, summary="Raised a Series B round to expand across Indian cities."):
+    return NewsDigestItem(
+        headline=headline, competitor_name=competitor, summary=summary,
+        url=url, date="2026-01-02", type="funding",
+    )
+
+
+def test_merge_same_run_keeps_competitor_name():
+    items = [
+        _item("Bounce", "Bounce raises Series B", "https://www.example.com/a?utm_source=x"),
+        _item("Rapido", "Different headline entirely", "https://example.com/a/"),
+        _item("Ola", "Bounce raises Series B"),
+        _item("Rapido", "Rapido launches bike taxis in Pune", summary="New city launch for the bike taxi service."),
+    ]
+    merged = news_dedup.merge_same_run(items, threshold=0.6)
+    assert [i.competitor_name for i in merged] == ["Bounce", "Rapido"]
+    assert merged[0].also_competitors == ["Rapido", "Ola"]
+    assert merged[1].also_competitors is None
+    # Inputs are not modified
+    assert items[0].also_competitors is None
+
+
+def test_mark_mode_sets_first_reported_without_touching_summary(monkeypatch):
+    monkeypatch.setattr(news_dedup, "_load_reported", lambda since, before: [
+        ("2026-01-01", news_dedup._url_key("https://example.com/a"), "old", "old story"),
+    ])
+    items = [_item("Bounce", "Bounce raises Series B", "https://example.com/a"), _item("Ola", "Ola news", summary="Other")]
+    result = news_dedup.dedup_news(items, today=date(2026, 1, 3), days=7, threshold=0.6, mode="mark")
+    assert [i.first_reported for i in result] == ["2026-01-01", None]
+    assert result[0].summary == items[0].summary
+
+
+def test_suppress_mode_drops_repeats(monkeypatch):
+    monkeypatch.setattr(news_dedup, "_load_reported", lambda since, before: [
+        ("2026-01-01", "", "Bounce raises Series B", "Raised a Series B round to expand across Indian cities."),
+    ])
+    items = [_item("Bounce", "Bounce raises Series B"), _item("Ola", "Ola news", summary="Other")]
+    result = news_dedup.dedup_news(items, today=date(2026, 1, 3), days=7, threshold=0.6, mode="suppress")
+    assert [i.competitor_name for i in result] == ["Ola"]
+
+
+def test_dedup_fields_are_not_in_the_llm_schema():
+    schema = NewsExtractionResponse.model_json_schema()
+    fields = schema["$defs"]["NewsDigestItem"]["properties"]
+    assert "also_competitors" not in fields and "first_reported" not in fields
@@ -0,0 +1,51 @@
+import pytest
+
+from yulu_intel import outbox
+from yulu_intel.config import settings
+
+
+@pytest.fixture
+def bot(monkeypatch, store):
+    monkeypatch.setattr(settings, "SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setattr(settings, "SLACK_CHANNEL", "C1")
+    monkeypatch.setattr(settings, "SLACK_CHANNELS", "")
+    posts = []
+
+    def post_bot(payload, thread_ts=None, channel=None):
+        posts.append((payload["text"], thread_ts))
+        return f"ts-{len(posts)}"
+    monkeypatch.setattr(outbox, "_post_bot", post_bot)
+    return posts
+
+
+def _payloads(run):
+    return [{"text": f"{run}-{i}", "blocks": []} for i in range(3)]
+
+
+def test_same_day_runs_are_delivered_in_queue_order_in_their_own_threads(bot, store):
+    outbox.enqueue("2026-10-18", _payloads("a"))
+    outbox.enqueue("2026-10-18", _payloads("b"))
+
+    assert outbox.flush() == {"channel:C1": (6, 0)}
+    assert bot == [
+        ("a-0", None), ("a-1", "ts-1"), ("a-2", "ts-1"),
+        ("b-0", None), ("b-1", "ts-4"), ("b-2", "ts-4"),
+    ]
+
+
+def test_retried_replies_thread_under_their_own_run(bot, store, monkeypatch):
+    outbox.enqueue("2026-10-18", _payloads("a"))
+    real = outbox._post_bot
+
+    def fail_replies(payload, thread_ts=None, channel=None):
+        if thread_ts:
+            raise RuntimeError("slack down")
+        return real(payload, thread_ts, channel)
+    monkeypatch.setattr(outbox, "_post_bot", fail_replies)
+    assert outbox.flush() == {"channel:C1": (1, 2)}
+
+    monkeypatch.setattr(outbox, "_post_bot", real)
+    outbox.enqueue("2026-10-18", _payloads("b"))
+    outbox.flush()
+    assert bot[1:3] == [("a-1", "ts-1"), ("a-2", "ts-1")]
+    assert {r["status"] for r in store.rows("slack_outbox")} == {"sent"}
@@ -0,0 +1,71 @@
+import json
+from datetime import date
+
+import pytest
+
+from yulu_intel import prefilter
+
+
+@pytest.fixture
+def paths(monkeypatch, tmp_path):
+    monkeypatch.setattr(prefilter, "SAMPLES_PATH", tmp_path / "samples.jsonl")
+    monkeypatch.setattr(prefilter, "MODEL_PATH", tmp_path / "model.json")
+    monkeypatch.setattr(prefilter, "_samples", [])
+    return tmp_path
+
+
+@pytest.mark.parametrize("subject, text", [
+    ("Bounce (Bounce Infinity)", "Bounce raises funds for its EV fleet"),
+    ("Rapido Bike Taxi", "Rapido expands to Pune"),
+    ("Vogo / Vogo Automotive", "vogo adds 500 scooters"),
+])
+def test_rule_score_matches_subject_aliases_and_tokens(subject, text):
+    doc = {"title": text, "body": ""}
+    assert prefilter.rule_score(doc, subject, require_subject=True) == prefilter.rule_score(doc, subject)
+
+
+def test_rule_score_penalises_missing_subject_on_generic_words_only():
+    doc = {"title": "Electric bike taxi rules in India", "body": ""}
+    assert prefilter.rule_score(doc, "Rapido Bike Taxi", require_subject=True) < prefilter.rule_score(doc)
+
+
+def test_samples_are_labelled_by_cited_url_not_by_name():
+    samples = [
+        {"run_date": "2026-10-01", "url": "https://a", "title": "Rapido news", "body": ""},
+        {"run_date": "2026-10-01", "url": "https://b", "title": "Rapido news again", "body": ""},
+        {"run_date": "2026-09-01", "url": "https://a", "title": "", "body": ""},
+    ]
+    assert prefilter.label_samples(samples, {"2026-10-01": {"https://a"}}) == [1.0, 0.0, None]
+
+
+def test_only_news_searches_are_sampled(paths, store):
+    docs = [{"href": "https://a", "title": "Yulu", "body": "battery swap"}]
+    prefilter.filter_documents(docs)
+    assert prefilter._samples == []
+    prefilter.filter_documents(docs, subject="Yulu", require_subject=True)
+    assert [(s["url"], s["subject"]) for s in prefilter._samples] == [("https://a", "Yulu")]
+
+
+def test_finish_run_keeps_a_rolling_window_in_supabase(paths, store):
+    old = {"run_date": "2026-08-01", "url": "https://old"}
+    recent = {"run_date": "2026-10-10", "url": "https://recent"}
+    replaced = {"run_date": "2026-10-18", "url": "https://earlier-today"}
+    prefilter.save_samples([old, recent, replaced])
+    prefilter._samples.append({"run_date": "2026-10-18", "url": "https://today"})
+
+    prefilter.finish_run(today=date(2026, 10, 18))
+
+    stored = prefilter.get_report_asset(prefilter.SAMPLES_NAME)
+    assert [json.loads(line)["url"] for line in stored.splitlines()] == ["https://recent", "https://today"]
+    assert prefilter._samples == []
+
+
+def test_finish_run_ignores_a_stale_local_window(paths, store):
+    prefilter.save_samples([{"run_date": "2026-10-10", "url": "https://other-runner"}])
+    (paths / "samples.jsonl").write_text(json.dumps({"run_date": "2026-10-01", "url": "https://stale"}) + "\n")
+    prefilter._samples.append({"run_date": "2026-10-18", "url": "https://today"})
+
+    prefilter.finish_run(today=date(2026, 10, 18))
+
+    stored = prefilter.get_report_asset(prefilter.SAMPLES_NAME)
+    assert [json.loads(line)["url"] for line in stored.splitlines()] == ["https://other-runner", "https://today"]
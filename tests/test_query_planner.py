@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from benchmarks.synthetic import make_analysis
+from yulu_intel.query_planner import DECAY, MIN_CALLS, PlannedQuery, QueryPlanner, load_stats, save_stats, stats_key
+
+TODAY = date(2026, 10, 18)
+CORE = [("{p} a", {"p": "Yulu"}), ("{p} b", {"p": "Yulu"}), ("{p} c", {"p": "Yulu"})]
+
+
+def test_plan_keeps_listed_order_without_history():
+    planner = QueryPlanner(today=TODAY)
+    planned = planner.plan("initial", CORE, slots=2)
+    assert [q.query for q in planned] == ["Yulu a", "Yulu b"]
+    assert planner.used == 2
+
+
+def test_plan_ranks_by_yield_and_skips_dead_templates():
+    stats = {
+        "{p} a": {"calls": 10.0, "cited": 0.0, "last_used": "2026-10-17"},
+        "{p} c": {"calls": 10.0, "cited": 15.0, "last_used": "2026-10-17"},
+    }
+    planner = QueryPlanner(stats, today=TODAY)
+    planned = planner.plan("initial", CORE, [("{p} extra", {"p": "Yulu"})], slots=4)
+    assert [q.template for q in planned] == ["{p} c", "{p} b", "{p} extra"]
+    assert planner.skipped == ["{p} a"]
+
+
+def test_dead_templates_are_retried_after_the_explore_interval():
+    stats = {"{p} a": {"calls": MIN_CALLS, "cited": 0.0, "last_used": "2026-10-01"}}
+    planned = QueryPlanner(stats, today=TODAY).plan("initial", CORE, slots=3)
+    assert "{p} a" in [q.template for q in planned]
+
+
+@pytest.mark.parametrize("budget, expected", [(0, 7), (40, 30), (10, 4), (6, 4), (3, 3)])
+def test_product_calls_reserve_the_initial_queries(budget, expected):
+    assert QueryPlanner(budget=budget).product_calls(7, 2, reserved=4) == expected
+
+
+def test_citations_credit_product_docs_about_selected_competitors_and_news_by_url():
+    analysis = make_analysis(n_competitors=2, n_news=1)
+    url = analysis.news_digest[0].url = "https://news.test/1"
+    selected = analysis.competitors[0].name
+    planner = QueryPlanner(today=TODAY)
+    planner.plan("initial", [("product", {})], slots=1)
+    planner.plan("news", [("{c} news", {"c": selected})], slots=1, scope=selected)
+    news_key = stats_key("{c} news", selected)
+    planner.record_kept([
+        {"template": "product", "href": "https://a", "title": f"{selected} expands", "body": ""},
+        {"template": "product", "href": "https://b", "title": "Unrelated startup", "body": ""},
+        {"template": news_key, "href": url, "title": "", "body": ""},
+        {"template": news_key, "href": "https://c", "title": f"{selected} again", "body": ""},
+    ])
+    planner.record_citations(analysis)
+    assert {t: c["cited"] for t, c in planner.run.items()} == {"product": 1.0, news_key: 1.0}
+
+
+def test_product_templates_keep_yield_across_runs_with_only_returning_competitors():
+    analysis = make_analysis(n_competitors=3, n_news=0)
+    names = [c.name for c in analysis.competitors]
+    stats = {}
+    for day in range(1, 15):
+        planner = QueryPlanner(stats, today=date(2026, 10, day))
+        for query in planner.plan("initial", CORE, slots=3):
+            docs = [{"template": query.key, "href": f"https://{day}/{query.key}/{n}", "title": f"{n} grows", "body": ""} for n in names]
+            planner.record_results(query, docs)
+            planner.record_kept(docs)
+        planner.record_citations(analysis)
+        assert planner.skipped == []
+        stats = planner.merged_stats()
+    assert all(stats[t]["cited"] > stats[t]["calls"] for t, _ in CORE)
+
+
+def test_news_yield_is_tracked_per_competitor():
+    stats = {stats_key("{c} news", "Bounce"): {"calls": 10.0, "cited": 0.0, "last_used": "2026-10-17"}}
+    planner = QueryPlanner(stats, today=TODAY)
+    core = [("{c} news", {"c": "x"})]
+    assert planner.plan("news", core, slots=1, scope="Bounce") == []
+    [query] = planner.plan("news", core, slots=1, scope="Vogo")
+    assert query.key == stats_key("{c} news", "Vogo")
+
+
+def test_load_stats_prefers_the_stored_copy(store, tmp_path):
+    save_stats({"shared": {"calls": 3.0}}, tmp_path / "ci.json")
+    stale = tmp_path / "stale.json"
+    stale.write_text('{"stale": {"calls": 1.0}}')
+    assert load_stats(stale) == {"shared": {"calls": 3.0}}
+
+
+def test_merged_stats_decay_history_and_add_this_run():
+    stats = {"old": {"calls": 5.0, "results": 50.0, "new_urls": 10.0, "kept": 5.0, "cited": 2.0, "last_used": "2026-10-01"}}
+    planner = QueryPlanner(stats, today=TODAY)
+    planner.record_results(PlannedQuery("initial", "new", "q"), [{}, {}])
+    merged = planner.merged_stats()
+    assert merged["old"]["calls"] == pytest.approx(5.0 * DECAY)
+    assert merged["old"]["last_used"] == "2026-10-01"
+    assert merged["new"]["calls"] == 1.0 and merged["new"]["results"] == 2.0
+    assert merged["new"]["last_used"] == TODAY.isoformat()
@@ -0,0 +1,109 @@
+import pytest
+
+from yulu_intel import replay, tracing
+from yulu_intel.config import settings
+
+
+@pytest.fixture
+def tapes(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "replay_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "replay_latency_ms", 0)
+    replay.reset()
+
+    def mode(value):
+        monkeypatch.setattr(settings, "replay_mode", value)
+        replay.reset()
+    yield mode
+    replay.reset()
+
+
+calls = []
+
+
+@replay.recorded("test_search")
+def search(query, page=1):
+    calls.append(query)
+    return {"query": query, "page": page, "n": len(calls)}
+
+
+produced = []
+
+
+@replay.recorded("test_stream")
+def stream(query):
+    for i in range(3):
+        produced.append(i)
+        yield f"{query}-{i}"
+
+
+def test_replay_matches_calls_by_arguments_not_order(tapes):
+    tapes("record")
+    recorded = [search("a"), search("b"), search("a", page=2), search("a")]
+
+    tapes("replay")
+    calls.clear()
+    assert search("a", page=2) == recorded[2]
+    assert search("b") == recorded[1]
+    # Repeated identical calls get their recordings in order, then the last one again
+    assert [search("a"), search("a"), search("a")] == [recorded[0], recorded[3], recorded[3]]
+    assert calls == []
+
+
+def test_drifted_arguments_fall_back_to_call_position(tapes):
+    tapes("record")
+    recorded = [search("news 2026-10-17"), search("other 2026-10-17")]
+
+    tapes("replay")
+    assert search("news 2026-10-18") == recorded[0]
+    assert search("other 2026-10-18") == recorded[1]
+    assert search("extra") == recorded[1]
+
+
+def test_generators_replay_as_iterators(tapes):
+    tapes("record")
+    assert list(stream("q")) == ["q-0", "q-1", "q-2"]
+
+    tapes("replay")
+    assert list(stream("q")) == ["q-0", "q-1", "q-2"]
+
+
+@pytest.mark.parametrize("mode", ["", "record"])
+def test_generators_stay_lazy_while_recording_and_tracing(tapes, mode):
+    tapes(mode)
+    tracing.start_trace("test")
+    try:
+        produced.clear()
+        items = stream("q")
+        assert next(items) == "q-0"
+        assert produced == [0]
+        assert list(items) == ["q-1", "q-2"]
+    finally:
+        trace = tracing.finish_trace()
+    [call] = [s for s in trace.spans if s.name == "test_stream"]
+    assert call.attrs["bytes_in"] == 3 * len('"q-0"')
+
+
+def test_a_stream_closed_early_replays_what_was_consumed(tapes):
+    tapes("record")
+    items = stream("q")
+    next(items)
+    items.close()
+
+    tapes("replay")
+    assert list(stream("q")) == ["q-0"]
+
+
+def test_replay_without_a_tape_raises(tapes):
+    tapes("replay")
+    with pytest.raises(replay.ReplayMiss):
+        search("never recorded")
+
+
+def test_recording_again_replaces_the_tape(tapes):
+    tapes("record")
+    search("old")
+    tapes("record")
+    fresh = search("new")
+
+    tapes("replay")
+    assert search("old") == fresh
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from yulu_intel import prefilter, search
+from yulu_intel.config import settings
+from yulu_intel.documents import PromptBuilder
+
+
+@pytest.fixture
+def tiered(monkeypatch):
+    monkeypatch.setattr(settings, "search_fetch_mode", "tiered")
+    monkeypatch.setattr(prefilter, "_model_loaded", True)
+    monkeypatch.setattr(prefilter, "_model", None)
+    fetched = []
+
+    def fetch(urls):
+        fetched.append(list(urls))
+        return {u: f"full text of {u}" for u in urls}
+    monkeypatch.setattr(search, "_fetch_contents", fetch)
+    return fetched
+
+
+async def _stream(docs):
+    for doc in docs:
+        yield doc
+
+
+def _collect(builder, docs, limit=None):
+    async def run():
+        out = []
+        async for doc in search._full_text(_stream([dict(d) for d in docs]), builder, "Yulu"):
+            out.append(doc["href"])
+            if limit and len(out) >= limit:
+                break
+        return out
+    return asyncio.run(run())
+
+
+DOCS = [
+    {"href": "https://off", "title": "Yulu", "body": "new car launch showroom"},
+    {"href": "https://weak", "title": "Yulu", "body": "city news"},
+    {"href": "https://best", "title": "Yulu", "body": "gig workers delivery partners battery swap rental"},
+]
+
+
+def test_survivors_are_hydrated_best_score_first(tiered):
+    assert _collect(PromptBuilder(1_000_000), DOCS) == ["https://best", "https://weak", "https://off"]
+    assert tiered == [["https://best", "https://weak", "https://off"]]
+
+
+def test_full_text_is_fetched_only_for_what_the_builder_can_hold(tiered):
+    builder = PromptBuilder(search.FULL_TEXT_CHARS)
+    assert _collect(builder, DOCS, limit=1) == ["https://best"]
+    assert tiered == [["https://best", "https://weak"]]
+
+
+def test_full_mode_streams_in_arrival_order_without_fetching(tiered, monkeypatch):
+    monkeypatch.setattr(settings, "search_fetch_mode", "full")
+    assert _collect(PromptBuilder(1_000_000), DOCS) == [d["href"] for d in DOCS]
+    assert tiered == []
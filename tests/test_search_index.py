@@ -0,0 +1,50 @@
+from benchmarks.synthetic import make_analysis
+from yulu_intel import search_index
+from yulu_intel.models import NewsDigestItem
+
+
+def _analysis():
+    analysis = make_analysis(n_competitors=2, n_news=0)
+    analysis.news_digest = [
+        NewsDigestItem(
+            headline="Bounce partners with Zepto for deliveries",
+            competitor_name=analysis.competitors[0].name,
+            summary="The partnership adds battery swapping for riders.",
+            url="https://example.com/bounce-zepto",
+            date="2026-01-02",
+            type="partnership",
+        )
+    ]
+    return analysis
+
+
+def test_index_and_search_oldest_first(tmp_path):
+    conn = search_index.connect(tmp_path / "index.sqlite")
+    analysis = _analysis()
+    search_index.index_run("2026-01-05", analysis, conn)
+    search_index.index_run("2026-01-02", analysis, conn)
+    # Re-indexing a date replaces its documents
+    search_index.index_run("2026-01-05", analysis, conn)
+
+    hits = search_index.search("zepto partnership", oldest_first=True, conn=conn)
+    assert [h["run_date"] for h in hits] == ["2026-01-02", "2026-01-05"]
+    assert hits[0]["url"] == "https://example.com/bounce-zepto"
+    assert search_index.search("zepto", competitor="nobody", conn=conn) == []
+
+
+def test_update_local_index_skips_without_an_index(tmp_path):
+    path = tmp_path / "index.sqlite"
+    assert search_index.update_local_index("2026-01-05", _analysis(), path) is None
+    assert not path.exists()
+
+    search_index.connect(path).close()
+    assert search_index.update_local_index("2026-01-05", _analysis(), path) > 0
+
+
+def test_sync_indexes_stored_runs_once(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "iter_runs", lambda columns: iter(store.rows("analysis_runs")))
+    for day in ("2026-01-01", "2026-01-02"):
+        store.insert("analysis_runs", {"run_date": day, "analysis_json": _analysis().model_dump_json()})
+    conn = search_index.connect(tmp_path / "index.sqlite")
+    assert search_index.sync_index(conn) == 2
+    assert search_index.sync_index(conn) == 0
@@ -0,0 +1,88 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from yulu_intel import slack
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(slack.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(slack.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = slack.TokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.now == 0.0
+    bucket.acquire()
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_token_bucket_pause_blocks_for_retry_after(clock):
+    bucket = slack.TokenBucket(rate=1.0, capacity=3)
+    bucket.pause(10)
+    bucket.acquire()
+    assert clock.now == pytest.approx(10.0)
+
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        resp = requests.Response()
+        resp.status_code = outcome
+        return resp
+
+
+def _refused():
+    return requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused")))
+
+
+@pytest.fixture
+def session(monkeypatch, clock):
+    monkeypatch.setattr(slack, "_buckets", {})
+
+    def install(*outcomes):
+        fake = FakeSession(outcomes)
+        monkeypatch.setattr(slack, "_get_session", lambda: fake)
+        return fake
+    return install
+
+
+def test_post_retries_rate_limits_and_refused_connections(session):
+    fake = session(429, _refused(), 200)
+    assert slack._post("c", "https://slack.test", {}).status_code == 200
+    assert fake.calls == 3
+
+
+@pytest.mark.parametrize("outcome", [
+    requests.ConnectionError(ProtocolError("Connection aborted.")),
+    requests.ReadTimeout("read timed out"),
+    502,
+])
+def test_post_does_not_retry_after_the_request_may_have_been_sent(session, outcome):
+    fake = session(outcome, 200)
+    with pytest.raises(requests.RequestException):
+        slack._post("c", "https://slack.test", {})
+    assert fake.calls == 1
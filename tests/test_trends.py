@@ -0,0 +1,25 @@
+import re
+
+from benchmarks.synthetic import make_analysis
+from yulu_intel import trends
+from yulu_intel.trends import render_page
+
+
+def test_page_script_waits_for_deferred_chartjs():
+    html = render_page("Yulu")
+    chart = html.index('<script src="')
+    inline = re.findall(r"<script>(.*?)</script>", html, re.S)
+    assert html.index("<script>") > chart
+    assert inline[-1].startswith('document.addEventListener("DOMContentLoaded"')
+    assert "<script defer>" not in html
+
+
+def test_append_run_extends_the_stored_aggregate_not_a_stale_local_one(store, tmp_path):
+    analysis = make_analysis(n_competitors=2, n_news=2)
+    trends.append_run("2026-10-16", analysis, tmp_path / "ci")
+    trends.append_run("2026-10-17", analysis, tmp_path / "ci")
+    trends.save_trends(trends.empty_trends(), "Yulu", tmp_path, upload=False)
+
+    result = trends.append_run("2026-10-18", analysis, tmp_path)
+    assert [d["date"] for d in result["days"]] == ["2026-10-16", "2026-10-17", "2026-10-18"]
+    assert trends.load_trends(tmp_path) == result
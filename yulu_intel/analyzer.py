@@ -1,6 +1,5 @@
-from typing import List
-
-from openai import OpenAI
+import time
+from typing import TYPE_CHECKING, Dict, List
 
 from yulu_intel.config import settings
 from yulu_intel.models import CompetitiveAnalysis, NewsDigestItem, NewsExtractionResponse
@@ -10,46 +9,131 @@ from yulu_intel.prompts import (
     NEWS_SYSTEM_PROMPT,
     NEWS_USER_PROMPT_TEMPLATE,
 )
+from yulu_intel import batch, tracing, usage
+from yulu_intel.replay import recorded
+from yulu_intel.usage import estimate_tokens
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 MAX_SEARCH_DATA_CHARS = 60_000
+# Output tokens reserved when checking a call against the run's token budget
+ANALYSIS_COMPLETION_TOKENS = 4_000
+NEWS_COMPLETION_TOKENS = 1_000
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+_client = None
 
 
-def analyze_product(product_name: str, search_data: str) -> CompetitiveAnalysis:
+def _get_client() -> "OpenAI":
+    global _client
+    if _client is None:
+        if not settings.OPENAI_API_KEY:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+
+def _parse(phase: str, messages: List[Dict], response_format):
+    """Structured completion; token usage and latency go to the run's ledger."""
+    started = time.perf_counter()
+    completion = _get_client().beta.chat.completions.parse(
+        model=settings.openai_model,
+        messages=messages,
+        response_format=response_format,
+    )
+    call = usage.ledger.record(phase, settings.openai_model, completion.usage, time.perf_counter() - started)
+    tracing.annotate(
+        prompt_tokens=call.prompt_tokens,
+        cached_tokens=call.cached_tokens,
+        completion_tokens=call.completion_tokens,
+        cost_usd=round(call.cost_usd, 6),
+    )
+    return completion.choices[0].message.parsed
+
+
+def _analysis_reserve() -> int:
+    return estimate_tokens(SYSTEM_PROMPT + USER_PROMPT_TEMPLATE) + ANALYSIS_COMPLETION_TOKENS
+
+
+def _analysis_messages(product_name: str, search_data: str) -> List[Dict]:
     if len(search_data) > MAX_SEARCH_DATA_CHARS:
         search_data = search_data[:MAX_SEARCH_DATA_CHARS]
+    # The analysis is required, so under a tight budget it gets less data rather than being skipped
+    search_data = usage.ledger.fit(search_data, _analysis_reserve())
 
     user_prompt = USER_PROMPT_TEMPLATE.format(
         product_name=product_name,
         search_data=search_data,
     )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    completion = client.beta.chat.completions.parse(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format=CompetitiveAnalysis,
-    )
-
-    return completion.choices[0].message.parsed
 
-
-def extract_news(competitor_name: str, search_data: str) -> List[NewsDigestItem]:
+def _news_messages(competitor_name: str, search_data: str) -> List[Dict]:
     user_prompt = NEWS_USER_PROMPT_TEMPLATE.format(
         competitor_name=competitor_name,
         search_data=search_data,
     )
+    return [
+        {"role": "system", "content": NEWS_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def analysis_data_chars() -> int:
+    """Search-data budget for ``analyze_product``: the hard cap, lowered by the LLM budget."""
+    budget = usage.ledger.max_chars(_analysis_reserve())
+    return MAX_SEARCH_DATA_CHARS if budget is None else min(MAX_SEARCH_DATA_CHARS, budget)
+
+
+def news_call_tokens(search_data: str) -> int:
+    """Estimated tokens of one ``extract_news`` call, for budget checks."""
+    return estimate_tokens(NEWS_SYSTEM_PROMPT + NEWS_USER_PROMPT_TEMPLATE + search_data) + NEWS_COMPLETION_TOKENS
+
+
+@recorded(
+    "openai_analyze",
+    encode=lambda analysis: analysis.model_dump(mode="json"),
+    decode=CompetitiveAnalysis.model_validate,
+)
+def analyze_product(product_name: str, search_data: str) -> CompetitiveAnalysis:
+    return _parse("analyze", _analysis_messages(product_name, search_data), CompetitiveAnalysis)
+
+
+@recorded(
+    "openai_extract_news",
+    encode=lambda items: [item.model_dump(mode="json") for item in items],
+    decode=lambda items: [NewsDigestItem.model_validate(item) for item in items],
+)
+def extract_news(competitor_name: str, search_data: str) -> List[NewsDigestItem]:
+    parsed = _parse("news_extract", _news_messages(competitor_name, search_data), NewsExtractionResponse)
+    return parsed.items
+
+
+# -- Batch API (see batch.py): same prompts and response models, half the price, hours of latency --
+
+
+def analyze_products_batch(search_data: Dict[str, str], name: str = "analyze") -> Dict[str, CompetitiveAnalysis]:
+    """``analyze_product`` for many ``{product_name: search_data}`` in one batch.
+
+    Products whose request failed are logged by ``batch.run`` and left out.
+    """
+    requests = [
+        batch.BatchRequest(product, "analyze", _analysis_messages(product, data), CompetitiveAnalysis)
+        for product, data in search_data.items()
+    ]
+    return batch.run(requests, name).parsed
 
-    completion = client.beta.chat.completions.parse(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": NEWS_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format=NewsExtractionResponse,
-    )
 
-    return completion.choices[0].message.parsed.items
+def extract_news_batch(search_data: Dict[str, str], name: str = "news") -> Dict[str, List[NewsDigestItem]]:
+    """``extract_news`` for many ``{competitor_name: search_data}`` in one batch."""
+    requests = [
+        batch.BatchRequest(competitor, "news_extract", _news_messages(competitor, data), NewsExtractionResponse)
+        for competitor, data in search_data.items()
+    ]
+    result = batch.run(requests, name)
+    return {competitor: parsed.items for competitor, parsed in result.parsed.items()}
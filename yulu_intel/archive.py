@@ -0,0 +1,345 @@
+"""Cold-tier archive for old analysis_runs rows.
+
+Runs older than the retention window are moved out of the hot
+``analysis_runs`` table into month-partitioned, gzip-compressed JSONL:
+
+    archive/manifest.json
+    archive/2025/2025-01.jsonl.gz
+
+The durable copy lives in Supabase: each partition is a row of
+``archive_partitions`` (base64 gzip plus its SHA-256) and the manifest is the
+``archive-manifest.json`` report asset, so CI runners and the reports server
+see the same archive. ``archive/`` is only a local cache, checked against the
+manifest's checksums. Rows are deleted from ``analysis_runs`` only after their
+partition has been read back from Supabase and its checksum matches.
+
+The manifest maps each archived run date to its partition so readers
+(history, backfill, the reports server) can find a run without scanning.
+``iter_runs`` reads both tiers transparently.
+
+Usage:
+    python -m yulu_intel.archive --retention-days 90 [--dry-run]
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from yulu_intel.db import (
+    delete_analysis_runs,
+    get_archive_partition,
+    get_report_asset,
+    iter_analysis_runs,
+    put_archive_partition,
+    put_report_asset,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(__file__).resolve().parent.parent / "archive"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_ASSET = "archive-manifest.json"
+DEFAULT_RETENTION_DAYS = 90
+
+
+def _manifest_path(archive_dir: Path) -> Path:
+    return archive_dir / MANIFEST_NAME
+
+
+def _empty_manifest() -> Dict:
+    return {"version": 1, "partitions": {}, "runs": {}}
+
+
+def _load_local_manifest(archive_dir: Path) -> Optional[Dict]:
+    path = _manifest_path(archive_dir)
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _stored_manifest() -> Optional[Dict]:
+    stored = get_report_asset(MANIFEST_ASSET)
+    return json.loads(stored) if stored else None
+
+
+def load_manifest(archive_dir: Path = ARCHIVE_DIR) -> Dict:
+    """The manifest in Supabase (archiving may have run elsewhere), else the local copy."""
+    try:
+        stored = _stored_manifest()
+    except Exception as e:
+        logger.warning("Could not load the stored archive manifest, using the local copy: %s", e)
+        stored = None
+    return stored or _load_local_manifest(archive_dir) or _empty_manifest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _save_manifest(manifest: Dict, archive_dir: Path) -> None:
+    data = json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+    _write_atomic(_manifest_path(archive_dir), data)
+
+
+def _partition_key(run_date: str) -> str:
+    return run_date[:7]
+
+
+def _partition_file(key: str) -> str:
+    return f"{key[:4]}/{key}.jsonl.gz"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _decode_rows(data: bytes) -> List[Dict]:
+    body = gzip.decompress(data).decode("utf-8")
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def _partition_bytes(archive_dir: Path, key: str, part: Dict) -> bytes:
+    """A partition's gzip bytes: the local copy if it matches the manifest, else Supabase."""
+    path = archive_dir / part["file"]
+    if path.exists():
+        data = path.read_bytes()
+        if part.get("sha256") in (None, _sha256(data)):
+            return data
+    stored = get_archive_partition(key)
+    if stored is None:
+        raise RuntimeError(f"Archive partition {key} is in the manifest but not stored")
+    data = base64.b64decode(stored["content"])
+    if part.get("sha256") and _sha256(data) != part["sha256"]:
+        raise RuntimeError(f"Archive partition {key} does not match its manifest checksum")
+    _write_atomic(path, data)
+    return data
+
+
+def _read_partition(archive_dir: Path, key: str, part: Optional[Dict]) -> List[Dict]:
+    if part is None:
+        return []
+    return _decode_rows(_partition_bytes(archive_dir, key, part))
+
+
+def _write_partition(
+    manifest: Dict, archive_dir: Path, key: str, rows: List[Dict]
+) -> bytes:
+    """Merge rows into a month partition, record it in the manifest and return its bytes."""
+    rel_path = _partition_file(key)
+    merged = {r["id"]: r for r in _read_partition(archive_dir, key, manifest["partitions"].get(key))}
+    merged.update((r["id"], r) for r in rows)
+    ordered = sorted(merged.values(), key=lambda r: (r["run_date"], r["id"]))
+
+    body = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in ordered)
+    data = gzip.compress(body.encode("utf-8"), compresslevel=9)
+    _write_atomic(archive_dir / rel_path, data)
+
+    manifest["partitions"][key] = {
+        "file": rel_path,
+        "runs": len(ordered),
+        "bytes": len(data),
+        "sha256": _sha256(data),
+        "first": ordered[0]["run_date"],
+        "last": ordered[-1]["run_date"],
+    }
+    for r in ordered:
+        entry = manifest["runs"].get(r["run_date"])
+        if entry is None or r["id"] >= entry["id"]:
+            manifest["runs"][r["run_date"]] = {
+                "partition": key,
+                "id": r["id"],
+                "has_report": bool(r.get("report_html")),
+            }
+    return data
+
+
+def _upload_partition(key: str, part: Dict, data: bytes) -> None:
+    """Store a partition in Supabase and read it back; raises unless the copy matches."""
+    put_archive_partition({
+        "key": key,
+        "file": part["file"],
+        "runs": part["runs"],
+        "bytes": part["bytes"],
+        "sha256": part["sha256"],
+        "content": base64.b64encode(data).decode("ascii"),
+    })
+    stored = get_archive_partition(key)
+    if (
+        stored is None
+        or stored.get("sha256") != part["sha256"]
+        or _sha256(base64.b64decode(stored["content"])) != part["sha256"]
+    ):
+        raise RuntimeError(f"Archive partition {key} did not verify after upload")
+
+
+def _store_partition(manifest: Dict, archive_dir: Path, key: str, rows: List[Dict]) -> None:
+    """Merge ``rows`` into partition ``key``, upload and verify it, then publish the manifest."""
+    data = _write_partition(manifest, archive_dir, key, rows)
+    _upload_partition(key, manifest["partitions"][key], data)
+    put_report_asset(MANIFEST_ASSET, json.dumps(manifest, indent=1, sort_keys=True))
+    _save_manifest(manifest, archive_dir)
+
+
+def _upload_local_partitions(manifest: Dict, archive_dir: Path) -> None:
+    """Store partitions that so far exist only in the local ``archive/`` (older archiver)."""
+    local = _load_local_manifest(archive_dir)
+    if not local:
+        return
+    for key, part in sorted(local["partitions"].items()):
+        path = archive_dir / part["file"]
+        if key in manifest["partitions"] or not path.exists():
+            continue
+        logger.info("  %s: uploading local-only partition", key)
+        _store_partition(manifest, archive_dir, key, _decode_rows(path.read_bytes()))
+
+
+def archive_runs(
+    retention_days: int = DEFAULT_RETENTION_DAYS,
+    archive_dir: Path = ARCHIVE_DIR,
+    dry_run: bool = False,
+) -> int:
+    """Move runs older than ``retention_days`` into the archive. Returns the count.
+
+    A partition failing to upload or verify raises; its rows stay in
+    ``analysis_runs``, so archiving can simply be re-run.
+    """
+    cutoff = (date.today() - timedelta(days=retention_days + 1)).isoformat()
+    if dry_run:
+        manifest = load_manifest(archive_dir)
+    else:
+        # Never merge into a stale local copy: start from what Supabase holds
+        manifest = _stored_manifest() or _empty_manifest()
+        _upload_local_partitions(manifest, archive_dir)
+
+    count = 0
+    verified_ids: List[int] = []
+    pending: List[Dict] = []
+    current_key: Optional[str] = None
+
+    def flush() -> None:
+        nonlocal count
+        if pending and not dry_run:
+            _store_partition(manifest, archive_dir, current_key, pending)
+            verified_ids.extend(r["id"] for r in pending)
+        if pending:
+            logger.info("  %s: %d run(s)", current_key, len(pending))
+        count += len(pending)
+        pending.clear()
+
+    # Rows arrive ordered by run_date, so one month partition is buffered at a time.
+    # Deletes wait until the scan is done so they don't shift its pages.
+    try:
+        for row in iter_analysis_runs("*", end_date=cutoff):
+            key = _partition_key(row["run_date"])
+            if key != current_key:
+                flush()
+                current_key = key
+            pending.append(row)
+        flush()
+    finally:
+        if verified_ids:
+            delete_analysis_runs(verified_ids)
+    logger.info(
+        "%s %d run(s) up to %s",
+        "Would archive" if dry_run else "Archived",
+        count,
+        cutoff,
+    )
+    return count
+
+
+def _project(row: Dict, columns: str) -> Dict:
+    if columns.strip() == "*":
+        return row
+    return {c.strip(): row.get(c.strip()) for c in columns.split(",")}
+
+
+def iter_archived_runs(
+    columns: str = "*",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    archive_dir: Path = ARCHIVE_DIR,
+) -> Iterator[Dict]:
+    """Yield archived rows in run_date order, reading only overlapping partitions."""
+    manifest = load_manifest(archive_dir)
+    for key in sorted(manifest["partitions"]):
+        part = manifest["partitions"][key]
+        if start_date and part["last"] < start_date:
+            continue
+        if end_date and part["first"] > end_date:
+            continue
+        for row in _read_partition(archive_dir, key, part):
+            if start_date and row["run_date"] < start_date:
+                continue
+            if end_date and row["run_date"] > end_date:
+                continue
+            yield _project(row, columns)
+
+
+def get_archived_run(run_date: str, archive_dir: Path = ARCHIVE_DIR) -> Optional[Dict]:
+    """Return the latest archived row for ``run_date``, or None."""
+    manifest = load_manifest(archive_dir)
+    entry = manifest["runs"].get(run_date)
+    if entry is None:
+        return None
+    key = entry["partition"]
+    for row in _read_partition(archive_dir, key, manifest["partitions"][key]):
+        if row["id"] == entry["id"]:
+            return row
+    return None
+
+
+def iter_runs(
+    columns: str = "run_date, analysis_json",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    latest: Optional[int] = None,
+    archive_dir: Path = ARCHIVE_DIR,
+) -> Iterator[Dict]:
+    """Read runs from the archive and the hot table as one stream.
+
+    Order matches ``iter_analysis_runs``: oldest first, or newest first when
+    ``latest`` is given.
+    """
+    if latest is None:
+        yield from iter_archived_runs(columns, start_date, end_date, archive_dir)
+        yield from iter_analysis_runs(columns, start_date, end_date)
+        return
+
+    remaining = latest
+    for row in iter_analysis_runs(columns, start_date, end_date, latest=latest):
+        remaining -= 1
+        yield row
+    if remaining > 0:
+        archived = list(iter_archived_runs(columns, start_date, end_date, archive_dir))
+        yield from reversed(archived[-remaining:])
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Archive old analysis_runs into month partitions.")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS,
+        help="keep this many days in Supabase (default %(default)s)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report without writing or deleting")
+    args = parser.parse_args()
+    archive_runs(args.retention_days, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Re-render stored runs with the current report templates.
+
+Streams ``analysis_runs`` (archive tier first, then the hot table) for a date
+range, rebuilds each ``CompetitiveAnalysis`` from ``analysis_json`` and
+renders the HTML in a process pool. Reports are written to ``reports/``;
+with ``--store`` the linked asset bundle is uploaded first, the hot-table rows
+get their ``report_html`` replaced in batched upserts, and the manifest and
+index pages are rebuilt. No search or LLM calls are made.
+
+Usage:
+    python -m yulu_intel.backfill --since 2026-01-01 --until 2026-03-31 --workers 4 [--store]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from yulu_intel.archive import iter_archived_runs
+from yulu_intel.config import settings
+from yulu_intel.db import iter_analysis_runs, store_report_assets, upsert_analysis_runs
+from yulu_intel.html_report import generate_html_report
+from yulu_intel.manifest import rebuild_manifest
+from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.report_assets import build_bundle
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).resolve().parent.parent / "reports"
+PROGRESS_EVERY = 25
+
+
+def render_row(row: Dict, linked: bool) -> str:
+    """Render one stored run. Runs in worker processes."""
+    analysis = CompetitiveAnalysis.model_validate_json(row["analysis_json"])
+    new_competitors = json.loads(row.get("new_competitors") or "[]")
+    new_set = set(new_competitors)
+    returning = [c.name for c in analysis.competitors if c.name not in new_set]
+    # The first run marks every competitor as new; nothing else records it.
+    first_run = bool(analysis.competitors) and not returning
+
+    return generate_html_report(
+        analysis,
+        new_competitors,
+        returning,
+        first_run,
+        assets=build_bundle() if linked else None,
+        report_date=date.fromisoformat(row["run_date"]),
+    )
+
+
+def _rows(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    store: bool,
+) -> Iterator[Tuple[Dict, bool]]:
+    """Yield ``(row, is_hot)`` oldest first across both tiers."""
+    for row in iter_archived_runs("*", start_date, end_date):
+        yield row, False
+    columns = "*" if store else "id, run_date, analysis_json, new_competitors"
+    for row in iter_analysis_runs(columns, start_date, end_date):
+        yield row, True
+
+
+def backfill(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    workers: Optional[int] = None,
+    store: bool = False,
+    out_dir: Path = REPORTS_DIR,
+    batch_size: int = 50,
+) -> int:
+    workers = workers or os.cpu_count() or 1
+    linked = settings.report_asset_mode == "linked"
+    if linked:
+        bundle = build_bundle()
+        bundle.write(out_dir / "assets")
+        if store:
+            # Stored reports link these; upload them before any row points at them.
+            uploaded = store_report_assets(bundle.files)
+            logger.info("Uploaded %d new report asset(s)", uploaded)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    done = 0
+    total_bytes = 0
+    pending_store: List[Dict] = []
+    latest_id: Dict[str, int] = {}
+
+    def finish(row: Dict, is_hot: bool, report_html: str) -> None:
+        nonlocal done, total_bytes
+        # Several runs on one date: the local file keeps the latest, as run.py does.
+        if row["id"] >= latest_id.get(row["run_date"], row["id"]):
+            latest_id[row["run_date"]] = row["id"]
+            (out_dir / f"{row['run_date']}.html").write_text(report_html, encoding="utf-8")
+        total_bytes += len(report_html.encode("utf-8"))
+        done += 1
+        if store and is_hot:
+            pending_store.append({**row, "report_html": report_html})
+            if len(pending_store) >= batch_size:
+                upsert_analysis_runs(pending_store, batch_size)
+                pending_store.clear()
+        if done % PROGRESS_EVERY == 0:
+            elapsed = time.perf_counter() - started
+            logger.info("  %d reports (%s) — %.1f reports/s", done, row["run_date"], done / elapsed)
+
+    # Bounded in-flight window keeps memory flat however long the range is.
+    max_in_flight = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        for row, is_hot in _rows(start_date, end_date, store):
+            if len(in_flight) >= max_in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    finish(*in_flight.pop(fut), fut.result())
+            in_flight[pool.submit(render_row, row, linked)] = (row, is_hot)
+        for fut in sorted(in_flight, key=lambda f: in_flight[f][0]["run_date"]):
+            finish(*in_flight[fut], fut.result())
+
+    if pending_store:
+        upsert_analysis_runs(pending_store, batch_size)
+    if store and done:
+        manifest = rebuild_manifest(out_dir)
+        logger.info("Manifest rebuilt (%d reports)", len(manifest["reports"]))
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Backfilled %d report(s) in %.1fs (%.1f reports/s, %.1f MB written)",
+        done,
+        elapsed,
+        done / elapsed if elapsed else 0.0,
+        total_bytes / 1e6,
+    )
+    return done
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Re-render stored runs with the current templates.")
+    parser.add_argument("--since", help="start date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="end date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--store", action="store_true", help="also replace report_html in Supabase")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per Supabase upsert")
+    parser.add_argument("--out", type=Path, default=REPORTS_DIR, help="output directory")
+    args = parser.parse_args()
+
+    backfill(args.since, args.until, args.workers, args.store, args.out, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
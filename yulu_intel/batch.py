@@ -0,0 +1,390 @@
+"""OpenAI Batch API execution for bulk, non-urgent structured completions.
+
+Backfills, re-analysis and low-priority news extraction don't need
+interactive latency. Their requests are written to a JSONL batch file
+(``data/batches/<name>.jsonl``), uploaded and submitted to
+``/v1/chat/completions`` with a 24h completion window, polled until done, and
+each output line is parsed back into its response model
+(``CompetitiveAnalysis``, ``NewsExtractionResponse``). Batch calls are billed
+at half price and don't count against interactive rate limits; their usage
+goes to the run's ledger like synchronous calls.
+
+``OPENAI_BATCH_BACKEND=local`` swaps in ``LocalBackend``, an offline
+stand-in that keeps files and batches under ``data/batches/local`` and
+answers each request with a schema-valid placeholder (or a custom
+``responder``), so the write/submit/poll/collect path runs without network.
+
+Replay runs (``REPLAY_MODE=replay``) also use the stand-in. A submitted batch
+is recorded in ``data/batches/<batch_id>.json``, so a process that stops
+waiting can collect the results later on the same machine. Real batches can
+take up to 24h, so ``run.py`` refuses batch mode unless the stand-in is used.
+
+Usage:
+    python -m yulu_intel.batch status <batch_id>
+    python -m yulu_intel.batch collect <batch_id>
+"""
+
+import argparse
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from yulu_intel import models, tracing, usage
+from yulu_intel.config import DATA_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+BATCH_DIR = DATA_DIR / "batches"
+ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL = ("completed", "failed", "expired", "cancelled")
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    phase: str  # ledger phase, as in analyzer._parse
+    messages: List[Dict]
+    response_format: Type[BaseModel]
+
+
+@dataclass
+class BatchResult:
+    batch_id: str
+    status: str
+    parsed: Dict[str, BaseModel] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def _strict(schema: Dict) -> Dict:
+    """Structured-outputs strict form: closed objects, every property required, no null defaults."""
+    schema = dict(schema)
+    if schema.get("type") == "object":
+        schema["additionalProperties"] = False
+        schema["required"] = list(schema.get("properties", {}))
+    if schema.get("default", ...) is None:
+        del schema["default"]
+    for key in ("properties", "$defs"):
+        if key in schema:
+            schema[key] = {name: _strict(sub) for name, sub in schema[key].items()}
+    for key in ("anyOf", "allOf"):
+        if key in schema:
+            schema[key] = [_strict(sub) for sub in schema[key]]
+    if isinstance(schema.get("items"), dict):
+        schema["items"] = _strict(schema["items"])
+    return schema
+
+
+def _response_format(model: Type[BaseModel]) -> Dict:
+    # The same strict JSON schema ``beta.chat.completions.parse`` sends for these models
+    return {
+        "type": "json_schema",
+        "json_schema": {"schema": _strict(model.model_json_schema()), "name": model.__name__, "strict": True},
+    }
+
+
+def request_line(req: BatchRequest, model: str) -> Dict:
+    return {
+        "custom_id": req.custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": req.messages,
+            "response_format": _response_format(req.response_format),
+        },
+    }
+
+
+def write_batch(requests: List[BatchRequest], path: Path, model: Optional[str] = None) -> Path:
+    ids = [r.custom_id for r in requests]
+    if len(set(ids)) != len(ids):
+        raise ValueError("custom_id values must be unique within a batch")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for req in requests:
+            f.write(json.dumps(request_line(req, model or settings.openai_model)) + "\n")
+    return path
+
+
+# -- backends ----------------------------------------------------------------
+
+
+class OpenAIBackend:
+    """The Batch API proper."""
+
+    def __init__(self):
+        from yulu_intel.analyzer import _get_client
+
+        self.client = _get_client()
+
+    def upload(self, path: Path) -> str:
+        with path.open("rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create(self, input_file_id: str, metadata: Dict[str, str]) -> Dict:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+            metadata=metadata,
+        )
+        return batch.model_dump()
+
+    def retrieve(self, batch_id: str) -> Dict:
+        return self.client.batches.retrieve(batch_id).model_dump()
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+def placeholder(schema: Dict, defs: Optional[Dict] = None) -> Any:
+    """Smallest value satisfying a strict JSON schema (empty lists and strings, zeros)."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return placeholder(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in schema:
+        return placeholder(schema["anyOf"][0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        return {name: placeholder(sub, defs) for name, sub in schema.get("properties", {}).items()}
+    return {"array": [], "string": "", "integer": 0, "number": 0, "boolean": False}.get(kind)
+
+
+def placeholder_response(body: Dict) -> str:
+    return json.dumps(placeholder(body["response_format"]["json_schema"]["schema"]))
+
+
+class LocalBackend:
+    """Offline stand-in with the Batch API's file and status flow.
+
+    A batch moves ``validating -> in_progress -> completed`` over successive
+    ``retrieve`` calls; on completion every request line is answered by
+    ``responder(body) -> message content``.
+    """
+
+    def __init__(self, root: Path = BATCH_DIR / "local", responder: Callable[[Dict], str] = placeholder_response):
+        self.root = root
+        self.responder = responder
+
+    def _file(self, file_id: str) -> Path:
+        return self.root / "files" / f"{file_id}.jsonl"
+
+    def _batch(self, batch_id: str) -> Path:
+        return self.root / "batches" / f"{batch_id}.json"
+
+    def upload(self, path: Path) -> str:
+        file_id = f"file-local-{uuid.uuid4().hex[:12]}"
+        target = self._file(file_id)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(path.read_bytes())
+        return file_id
+
+    def create(self, input_file_id: str, metadata: Dict[str, str]) -> Dict:
+        batch = {
+            "id": f"batch-local-{uuid.uuid4().hex[:12]}",
+            "status": "validating",
+            "input_file_id": input_file_id,
+            "output_file_id": None,
+            "error_file_id": None,
+            "metadata": metadata,
+        }
+        path = self._batch(batch["id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(batch), encoding="utf-8")
+        return batch
+
+    def retrieve(self, batch_id: str) -> Dict:
+        path = self._batch(batch_id)
+        batch = json.loads(path.read_text(encoding="utf-8"))
+        if batch["status"] == "validating":
+            batch["status"] = "in_progress"
+        elif batch["status"] == "in_progress":
+            batch["output_file_id"] = self._complete(batch)
+            batch["status"] = "completed"
+        path.write_text(json.dumps(batch), encoding="utf-8")
+        return batch
+
+    def _complete(self, batch: Dict) -> str:
+        lines = []
+        for raw in self._file(batch["input_file_id"]).read_text(encoding="utf-8").splitlines():
+            req = json.loads(raw)
+            content = self.responder(req["body"])
+            prompt_tokens = usage.estimate_tokens(json.dumps(req["body"]["messages"]))
+            completion_tokens = usage.estimate_tokens(content)
+            lines.append(json.dumps({
+                "id": f"req-{uuid.uuid4().hex[:12]}",
+                "custom_id": req["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": req["body"]["model"],
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                },
+                "error": None,
+            }))
+        output_id = f"file-local-{uuid.uuid4().hex[:12]}"
+        self._file(output_id).write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return output_id
+
+    def download(self, file_id: str) -> str:
+        return self._file(file_id).read_text(encoding="utf-8")
+
+
+def uses_local_backend() -> bool:
+    # Batch jobs are not recorded, so replay runs use the stand-in too
+    return settings.openai_batch_backend == "local" or settings.replay_mode == "replay"
+
+
+def get_backend():
+    return LocalBackend() if uses_local_backend() else OpenAIBackend()
+
+
+# -- submit / wait / collect ---------------------------------------------------
+
+
+def _state_path(batch_id: str) -> Path:
+    return BATCH_DIR / f"{batch_id}.json"
+
+
+def submit(requests: List[BatchRequest], name: str, backend=None) -> str:
+    """Write, upload and submit ``requests``; returns the batch id."""
+    backend = backend or get_backend()
+    path = write_batch(requests, BATCH_DIR / f"{name}.jsonl")
+    batch = backend.create(backend.upload(path), {"name": name})
+    state = {
+        "name": name,
+        "model": settings.openai_model,
+        "submitted_at": time.time(),
+        "requests": {r.custom_id: {"phase": r.phase, "response_format": r.response_format.__name__} for r in requests},
+    }
+    _state_path(batch["id"]).write_text(json.dumps(state, indent=1), encoding="utf-8")
+    logger.info("Submitted batch %s: %d request(s) from %s", batch["id"], len(requests), path)
+    return batch["id"]
+
+
+def wait(batch_id: str, backend=None, poll_seconds: Optional[float] = None, timeout: Optional[float] = None) -> Dict:
+    """Poll until the batch reaches a terminal status or ``timeout`` seconds pass."""
+    backend = backend or get_backend()
+    poll_seconds = settings.openai_batch_poll_seconds if poll_seconds is None else poll_seconds
+    timeout = settings.openai_batch_timeout_s if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while True:
+        batch = backend.retrieve(batch_id)
+        if batch["status"] in TERMINAL:
+            return batch
+        if time.monotonic() >= deadline:
+            logger.warning("Batch %s still %s after %.0fs; collect it later", batch_id, batch["status"], timeout)
+            return batch
+        counts = batch.get("request_counts") or {}
+        logger.info("  Batch %s %s (%s/%s done)", batch_id, batch["status"], counts.get("completed", "?"), counts.get("total", "?"))
+        time.sleep(poll_seconds)
+
+
+def _parse_line(line: Dict, response_format: Type[BaseModel]) -> BaseModel:
+    if line.get("error"):
+        raise ValueError(line["error"].get("message") or str(line["error"]))
+    response = line["response"]
+    if response["status_code"] != 200:
+        raise ValueError(f"HTTP {response['status_code']}: {response['body'].get('error', response['body'])}")
+    message = response["body"]["choices"][0]["message"]
+    if message.get("refusal"):
+        raise ValueError(f"refused: {message['refusal']}")
+    return response_format.model_validate_json(message["content"])
+
+
+def collect(batch_id: str, batch: Dict, backend=None) -> BatchResult:
+    """Parse a finished batch's output into response models; usage goes to the ledger."""
+    from openai.types import CompletionUsage
+
+    backend = backend or get_backend()
+    state = json.loads(_state_path(batch_id).read_text(encoding="utf-8"))
+    result = BatchResult(batch_id, batch["status"])
+    elapsed = time.time() - state["submitted_at"]
+
+    lines = []
+    for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+        if file_id:
+            lines.extend(json.loads(raw) for raw in backend.download(file_id).splitlines() if raw.strip())
+    for line in lines:
+        custom_id = line["custom_id"]
+        meta = state["requests"].get(custom_id)
+        if meta is None:
+            continue
+        body = (line.get("response") or {}).get("body") or {}
+        if body.get("usage"):
+            usage.ledger.record(
+                meta["phase"],
+                body.get("model", state["model"]),
+                CompletionUsage.model_validate(body["usage"]),
+                elapsed,
+                usage.BATCH_DISCOUNT,
+            )
+        try:
+            result.parsed[custom_id] = _parse_line(line, getattr(models, meta["response_format"]))
+        except Exception as e:
+            result.errors[custom_id] = str(e)
+    for custom_id in state["requests"]:
+        if custom_id not in result.parsed and custom_id not in result.errors:
+            result.errors[custom_id] = f"no result (batch {batch['status']})"
+    if result.errors:
+        logger.warning("Batch %s: %d request(s) failed: %s", batch_id, len(result.errors), result.errors)
+    return result
+
+
+def run(requests: List[BatchRequest], name: str, backend=None) -> BatchResult:
+    """Submit, wait for and collect one batch."""
+    backend = backend or get_backend()
+    with tracing.span("openai_batch", kind="call", requests=len(requests)):
+        batch_id = submit(requests, name, backend)
+        batch = wait(batch_id, backend)
+        result = collect(batch_id, batch, backend)
+        tracing.annotate(
+            outcome=None if batch["status"] == "completed" else batch["status"],
+            batch_id=batch_id,
+            failed=len(result.errors),
+        )
+    return result
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Inspect or collect an OpenAI batch.")
+    parser.add_argument("command", choices=["status", "collect"])
+    parser.add_argument("batch_id")
+    args = parser.parse_args()
+
+    backend = get_backend()
+    batch = backend.retrieve(args.batch_id)
+    if args.command == "status":
+        print(json.dumps({k: batch.get(k) for k in ("id", "status", "request_counts", "output_file_id")}, indent=1))
+        return
+    result = collect(args.batch_id, batch, backend)
+    print(json.dumps(
+        {
+            "status": result.status,
+            "parsed": {cid: parsed.model_dump(mode="json") for cid, parsed in result.parsed.items()},
+            "errors": result.errors,
+        },
+        indent=1,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ from pydantic_settings import BaseSettings
 
 _ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
 
+# Local working files (search index, dedup state, ...) that are not committed.
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
 
 FOCUS_PERSONA = {
     "segment": "gig workers and daily bike renters",
@@ -26,17 +29,42 @@ FOCUS_PERSONA = {
 
 
 class Settings(BaseSettings):
-    OPENAI_API_KEY: str
+    OPENAI_API_KEY: str = ""  # required only by commands that call OpenAI
     openai_model: str = "gpt-4o-mini"
     max_search_results: int = 5
     PRODUCT_NAME: str = "Yulu"
     SLACK_WEBHOOK_URL: str = ""
     SLACK_BOT_TOKEN: str = ""
     SLACK_CHANNEL: str = ""
+    SLACK_WEBHOOK_URLS: str = ""  # extra webhooks, comma-separated
+    SLACK_CHANNELS: str = ""  # extra bot-mode channels, comma-separated
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     EXA_API_KEY: str = ""
     REPORT_BASE_URL: str = ""
+    news_dedup_days: int = 7
+    news_dedup_threshold: float = 0.6
+    news_dedup_mode: str = "suppress"  # "suppress" or "mark" already-reported stories
+    prefilter_enabled: bool = True
+    prefilter_threshold: float = 0.25
+    report_asset_mode: str = "linked"  # "linked" (shared hashed assets) or "inline"
+    slack_rate_per_sec: float = 1.0  # Slack allows ~1 message/s per channel
+    slack_burst: int = 3
+    slack_max_retries: int = 5
+    slack_outbox_max_attempts: int = 10
+    replay_mode: str = ""  # "record" or "replay" outbound calls (see replay.py)
+    replay_dir: str = ""  # defaults to data/replay
+    replay_latency_ms: float = -1.0  # replay delay per call; -1 uses the recorded duration
+    search_fetch_mode: str = "tiered"  # "tiered" (highlights, then full text for the top-ranked survivors) or "full"
+    search_query_budget: int = 0  # max Exa calls per run; 0 = the static count (see query_planner.py)
+    llm_token_budget: int = 0  # max prompt+completion tokens per run; 0 = unlimited
+    llm_cost_budget_usd: float = 0.0  # max estimated OpenAI spend per run; 0 = unlimited
+    news_extraction_mode: str = "sync"  # "sync" (one call per competitor) or "batch" (OpenAI Batch API)
+    openai_batch_backend: str = "openai"  # "openai" or "local" (offline stand-in, see batch.py)
+    openai_batch_poll_seconds: float = 30.0
+    openai_batch_timeout_s: float = 3600.0  # stop waiting (results stay collectable) after this long
+    trace_dir: str = ""  # per-run JSON traces; defaults to data/traces
+    metrics_textfile: str = ""  # Prometheus textfile snapshot; defaults to data/metrics/yulu_intel.prom
 
     model_config = {"env_file": str(_ENV_FILE)}
 
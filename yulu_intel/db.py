@@ -1,24 +1,28 @@
 import json
 from datetime import date
-from typing import List, Optional, Tuple
-
-from supabase import create_client
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from yulu_intel.config import settings
 from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.replay import recorded
 
 _client = None
 
+RUNS_PAGE_SIZE = 100
+
 
 def _get_client():
     global _client
     if _client is None:
+        # Imported on first use: offline commands that never touch Supabase skip the SDK
+        from supabase import create_client
+
         _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
     return _client
 
 
 def init_db() -> None:
-    # Tables are created in Supabase dashboard — this is a no-op.
+    # Tables are created from supabase/schema.sql (Supabase SQL editor) — this is a no-op.
     # Kept for API compatibility with run.py.
     pass
 
@@ -27,17 +31,24 @@ def _normalize(name: str) -> str:
     return name.strip().lower()
 
 
+@recorded("supabase_is_first_run")
 def is_first_run() -> bool:
     sb = _get_client()
     result = sb.table("competitors").select("id", count="exact").limit(1).execute()
     return result.count == 0
 
 
+@recorded("supabase_detect_and_store")
 def detect_and_store(
     analysis: CompetitiveAnalysis,
     report_html: Optional[str] = None,
+    llm_usage: Optional[Dict] = None,
 ) -> Tuple[List[str], List[str]]:
-    """Returns (new_competitors, returning_competitors)."""
+    """Returns (new_competitors, returning_competitors).
+
+    ``llm_usage`` (token, latency and cost totals from ``usage.UsageLedger``)
+    is stored as JSON in the run row's ``llm_usage`` column.
+    """
     today = date.today().isoformat()
     sb = _get_client()
 
@@ -75,11 +86,14 @@ def detect_and_store(
     }
     if report_html is not None:
         row_data["report_html"] = report_html
+    if llm_usage is not None:
+        row_data["llm_usage"] = json.dumps(llm_usage)
     sb.table("analysis_runs").insert(row_data).execute()
 
     return new_competitors, returning_competitors
 
 
+@recorded("supabase_store_report_html")
 def store_report_html(run_date: str, report_html: str) -> None:
     """Update the most recent analysis_runs row for the given date with report HTML."""
     sb = _get_client()
@@ -95,7 +109,153 @@ def store_report_html(run_date: str, report_html: str) -> None:
         }).eq("id", row_id).execute()
 
 
+@recorded("supabase_store_report_assets")
+def store_report_assets(files: Dict[str, str]) -> int:
+    """Upload content-hashed report assets that are not stored yet. Returns the count uploaded."""
+    if not files:
+        return 0
+    sb = _get_client()
+    result = sb.table("report_assets").select("name").in_("name", list(files)).execute()
+    existing = {row["name"] for row in result.data}
+    missing = [
+        {"name": name, "content": content}
+        for name, content in files.items()
+        if name not in existing
+    ]
+    if missing:
+        sb.table("report_assets").insert(missing).execute()
+    return len(missing)
+
+
+@recorded("supabase_put_report_asset")
+def put_report_asset(name: str, content: str) -> None:
+    """Create or replace a mutable report asset (manifest, index pages)."""
+    sb = _get_client()
+    sb.table("report_assets").upsert({"name": name, "content": content}, on_conflict="name").execute()
+
+
+@recorded("supabase_get_report_asset")
+def get_report_asset(name: str) -> Optional[str]:
+    sb = _get_client()
+    result = sb.table("report_assets").select("content").eq("name", name).limit(1).execute()
+    return result.data[0]["content"] if result.data else None
+
+
+@recorded("supabase_get_all_known_competitors")
 def get_all_known_competitors() -> List[dict]:
     sb = _get_client()
     result = sb.table("competitors").select("name, normalized_name, first_seen_date, last_seen_date, times_seen").order("first_seen_date").execute()
     return result.data
+
+
+@recorded("supabase_iter_analysis_runs")
+def iter_analysis_runs(
+    columns: str = "run_date, analysis_json",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    latest: Optional[int] = None,
+) -> Iterator[dict]:
+    """Stream analysis_runs rows page by page instead of loading the whole table.
+
+    Rows come back oldest first, or newest first when ``latest`` limits the
+    scan to the most recent N runs.
+    """
+    sb = _get_client()
+    offset = 0
+    remaining = latest
+    while remaining is None or remaining > 0:
+        page = RUNS_PAGE_SIZE if remaining is None else min(RUNS_PAGE_SIZE, remaining)
+        query = sb.table("analysis_runs").select(columns)
+        if start_date:
+            query = query.gte("run_date", start_date)
+        if end_date:
+            query = query.lte("run_date", end_date)
+        descending = latest is not None
+        result = query.order("run_date", desc=descending).order(
+            "id", desc=descending
+        ).range(offset, offset + page - 1).execute()
+
+        yield from result.data
+        if len(result.data) < page:
+            break
+        offset += page
+        if remaining is not None:
+            remaining -= page
+
+
+@recorded("supabase_delete_analysis_runs")
+def delete_analysis_runs(ids: List[int], batch_size: int = 100) -> None:
+    """Delete analysis_runs rows by id in batches (used after archiving)."""
+    sb = _get_client()
+    for i in range(0, len(ids), batch_size):
+        sb.table("analysis_runs").delete().in_("id", ids[i:i + batch_size]).execute()
+
+
+@recorded("supabase_put_archive_partition")
+def put_archive_partition(row: Dict) -> None:
+    """Create or replace one month partition of the run archive (see archive.py)."""
+    sb = _get_client()
+    sb.table("archive_partitions").upsert(row, on_conflict="key").execute()
+
+
+@recorded("supabase_get_archive_partition")
+def get_archive_partition(key: str) -> Optional[Dict]:
+    sb = _get_client()
+    result = sb.table("archive_partitions").select("key, sha256, content").eq("key", key).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+@recorded("supabase_upsert_analysis_runs")
+def upsert_analysis_runs(rows: List[dict], batch_size: int = 50) -> None:
+    """Write full analysis_runs rows back by id, ``batch_size`` rows per request."""
+    sb = _get_client()
+    for i in range(0, len(rows), batch_size):
+        sb.table("analysis_runs").upsert(rows[i:i + batch_size], on_conflict="id").execute()
+
+
+@recorded("supabase_enqueue_slack_messages")
+def enqueue_slack_messages(rows: List[dict]) -> List[dict]:
+    """Insert pending slack_outbox rows and return them with their ids."""
+    if not rows:
+        return []
+    sb = _get_client()
+    result = sb.table("slack_outbox").insert(rows).execute()
+    return result.data
+
+
+@recorded("supabase_get_pending_slack_messages")
+def get_pending_slack_messages(max_attempts: int) -> List[dict]:
+    """Undelivered outbox rows in the order they were queued."""
+    sb = _get_client()
+    result = sb.table("slack_outbox").select("*").eq("status", "pending").lt(
+        "attempts", max_attempts
+    ).order("id").execute()
+    return result.data
+
+
+@recorded("supabase_get_slack_thread_ts")
+def get_slack_thread_ts(destination: str, run_id: str) -> Optional[str]:
+    """``slack_ts`` of the delivered first message of a run, to thread replies under."""
+    sb = _get_client()
+    result = sb.table("slack_outbox").select("slack_ts").eq("destination", destination).eq(
+        "run_id", run_id
+    ).eq("seq", 0).eq("status", "sent").limit(1).execute()
+    return result.data[0]["slack_ts"] if result.data else None
+
+
+@recorded("supabase_update_slack_message")
+def update_slack_message(row_id: int, fields: Dict) -> None:
+    sb = _get_client()
+    sb.table("slack_outbox").update(fields).eq("id", row_id).execute()
+
+
+@recorded("supabase_count_slack_messages")
+def count_slack_messages() -> Dict[str, Dict[str, int]]:
+    """``{destination: {status: count}}`` over the whole outbox."""
+    sb = _get_client()
+    result = sb.table("slack_outbox").select("destination, status").execute()
+    counts: Dict[str, Dict[str, int]] = {}
+    for row in result.data:
+        by_status = counts.setdefault(row["destination"], {})
+        by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+    return counts
@@ -0,0 +1,72 @@
+"""Search documents and the bounded prompt builder they stream into.
+
+``search.py`` yields ``SearchDocument`` dicts one at a time through dedup,
+the prefilter and full-text fetching; ``PromptBuilder`` formats each one as it
+arrives and stops accepting once its character budget is spent. Only the
+formatted parts that fit are kept, so memory is bounded by the prompt budget
+rather than by how much the searches returned, and the final prompt is built
+with a single join.
+"""
+
+from typing import List, TypedDict
+
+SEPARATOR = "\n---\n"
+# A document cut to less than this is not worth the tokens
+MIN_PARTIAL_CHARS = 500
+
+
+class SearchDocument(TypedDict, total=False):
+    title: str
+    href: str
+    body: str
+    published_date: str
+    template: str  # stats key of the query template that found it (see query_planner.py)
+
+
+def format_document(doc: SearchDocument, body_limit: int = -1) -> str:
+    body = doc.get("body", "")
+    if body_limit >= 0:
+        body = body[:body_limit]
+    header = f"Title: {doc.get('title', '')}\nURL: {doc.get('href', '')}"
+    published = doc.get("published_date", "")
+    if published:
+        header += f"\nPublished: {published}"
+    return header + f"\nContent: {body}\n"
+
+
+class PromptBuilder:
+    """Accumulates formatted documents up to ``max_chars`` (separators included)."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.chars = 0
+        self.full = False
+        self.dropped = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_chars - self.chars)
+
+    def add(self, doc: SearchDocument) -> bool:
+        """Append ``doc``; returns False once the budget is spent (later documents are dropped)."""
+        if self.full:
+            self.dropped += 1
+            return False
+        sep = len(SEPARATOR) if self.parts else 0
+        part = format_document(doc)
+        if self.chars + sep + len(part) > self.max_chars:
+            # Keep the head of the document if a useful amount still fits
+            overflow = self.chars + sep + len(part) - self.max_chars
+            body_limit = len(doc.get("body", "")) - overflow
+            self.full = True
+            if body_limit < MIN_PARTIAL_CHARS:
+                self.dropped += 1
+                return False
+            part = format_document(doc, body_limit)
+        self.parts.append(part)
+        self.chars += sep + len(part)
+        return True
+
+    def text(self) -> str:
+        return SEPARATOR.join(self.parts)
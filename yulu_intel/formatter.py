@@ -1,7 +1,8 @@
-from datetime import date
-from typing import Dict, List, Optional
+import json
+from typing import Dict, Iterable, List, Optional
 
 from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.view import ReportView, build_view, clip, news_note
 
 
 def _section(text: str) -> Dict:
@@ -16,52 +17,104 @@ def _divider() -> Dict:
     return {"type": "divider"}
 
 
-def _truncate(text: str, limit: int = 2900) -> str:
-    """Slack blocks have a 3000 char limit per text field."""
-    return text[:limit] + "..." if len(text) > limit else text
-
-
-def _clip(text: str, limit: int = 200) -> str:
-    """Truncate to limit chars for punchy summary lines."""
-    return text[:limit - 1] + "\u2026" if len(text) > limit else text
-
-
-def format_summary(
-    analysis: CompetitiveAnalysis,
-    report_url: Optional[str] = None,
-) -> List[Dict]:
+# Slack limits: 50 blocks per message, 3000 chars per section text, 150 per
+# header. The payload cap is our own margin below Slack's request size limit.
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 3000
+MAX_HEADER_CHARS = 150
+MAX_PAYLOAD_BYTES = 40_000
+
+
+def _split_text(text: str, limit: int = MAX_SECTION_CHARS) -> List[str]:
+    """Split at line boundaries so each chunk fits ``limit``; only over-long lines are cut at spaces."""
+    chunks: List[str] = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            cut = line.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:cut])
+            line = line[cut:].lstrip()
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            candidate = line
+        current = candidate
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def _fit_block(block: Dict) -> List[Dict]:
+    if block["type"] == "header":
+        return [_header(clip(block["text"]["text"], MAX_HEADER_CHARS))]
+    if block["type"] == "section" and len(block["text"]["text"]) > MAX_SECTION_CHARS:
+        return [_section(chunk) for chunk in _split_text(block["text"]["text"])]
+    return [block]
+
+
+def _block_bytes(block: Dict) -> int:
+    return len(json.dumps(block).encode("utf-8")) + 2  # + ", " separator
+
+
+def pack_blocks(blocks: Iterable[Dict]) -> List[Dict]:
+    """Pack a block stream into as few message payloads as Slack's limits allow.
+
+    Blocks keep their order (next-fit, which is optimal for an ordered
+    stream). Oversized sections are split rather than truncated; messages
+    never start with a divider or end with a dangling header or divider.
+    """
+    messages: List[List[Dict]] = []
+    current: List[Dict] = []
+
+    def close() -> None:
+        trailing: List[Dict] = []
+        while current and current[-1]["type"] in ("header", "divider"):
+            trailing.insert(0, current.pop())
+        if current:
+            messages.append(list(current))
+        current.clear()
+        # A header moves with the content it introduces
+        current.extend(b for b in trailing if b["type"] == "header")
+
+    empty = len(json.dumps({"blocks": []}))
+    size = empty
+    for block in blocks:
+        for piece in _fit_block(block):
+            piece_bytes = _block_bytes(piece)
+            if current and (len(current) >= MAX_BLOCKS or size + piece_bytes > MAX_PAYLOAD_BYTES):
+                close()
+                size = empty + sum(_block_bytes(b) for b in current)
+            if piece["type"] == "divider" and not current:
+                continue
+            current.append(piece)
+            size += piece_bytes
+    close()
+    return [{"blocks": message} for message in messages]
+
+
+def render_slack_summary(view: ReportView) -> List[Dict]:
     """Build 1 short Slack summary message (~10 lines) linking to the full HTML report."""
-    today = date.today().strftime("%b %d, %Y")
-
-    threat = _clip(analysis.biggest_threats[0]) if analysis.biggest_threats else "No major threats today"
-    insight = _clip(analysis.key_insights[0]) if analysis.key_insights else "No new insights"
-    opportunity = _clip(analysis.urgent_opportunities[0]) if analysis.urgent_opportunities else "No urgent opportunities"
-
-    watch_out = threat
-    opp_line = opportunity
-
-    # First action from Month 1 of 90-day plan
-    action = "Review competitive report"
-    if analysis.action_plan_90day:
-        m1 = analysis.action_plan_90day[0]
-        if m1.actions:
-            action = _clip(m1.actions[0])
+    today = view.report_date.strftime("%b %d, %Y")
 
     report_line = ""
-    if report_url:
-        report_line = f"\n\n:bar_chart: *<{report_url}|View Full Report \u2192>*"
+    if view.report_url:
+        report_line = f"\n\n:bar_chart: *<{view.report_url}|View Full Report \u2192>*"
 
     text = (
         f":mag: *CompeteIQ Daily \u2014 {today}*\n"
         f"\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\n"
         f":round_pushpin: *Market:* Micromobility | Gig Worker Segment\n\n"
         f":zap: *Top 3 Moves Today*\n"
-        f"\u2022 :red_circle: {threat}\n"
-        f"\u2022 :large_yellow_circle: {insight}\n"
-        f"\u2022 :large_green_circle: {opportunity}\n\n"
-        f":eyes: *Watch Out:* {watch_out}\n"
-        f":bulb: *Opportunity:* {opp_line}\n"
-        f":white_check_mark: *Action Today:* {action}\n"
+        f"\u2022 :red_circle: {view.top_threat}\n"
+        f"\u2022 :large_yellow_circle: {view.top_insight}\n"
+        f"\u2022 :large_green_circle: {view.top_opportunity}\n\n"
+        f":eyes: *Watch Out:* {view.top_threat}\n"
+        f":bulb: *Opportunity:* {view.top_opportunity}\n"
+        f":white_check_mark: *Action Today:* {view.first_action}\n"
         f"\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501\u2501"
         f"{report_line}"
     )
@@ -69,49 +122,53 @@ def format_summary(
     return [{"blocks": [_section(text)]}]
 
 
-def format_messages(
+def format_summary(
     analysis: CompetitiveAnalysis,
-    new_competitors: List[str],
-    returning_competitors: List[str],
-    is_first_run: bool,
+    report_url: Optional[str] = None,
 ) -> List[Dict]:
-    """Build 4 Slack Block Kit payloads."""
-    new_set = set(new_competitors)
-    today = date.today().strftime("%B %d, %Y")
+    return render_slack_summary(build_view(analysis, report_url=report_url))
+
 
-    # === MESSAGE 1: Header + Overview + New Competitor Alert ===
+def render_slack_messages(view: ReportView) -> List[Dict]:
+    """Build Slack Block Kit payloads, packed into as few messages as Slack allows."""
+    analysis = view.analysis
+    today = view.report_date.strftime("%B %d, %Y")
+
+    # === SECTION 1: Header + Overview + New Competitor Alert ===
     msg1_blocks = [
         _header(f"Competitive Intel Report - {analysis.product_name}"),
-        _section(f"*Date:* {today}  |  *Competitors tracked:* {len(analysis.competitors)}"),
+        _section(f"*Date:* {today}  |  *Competitors tracked:* {view.kpis['competitors']}"),
         _divider(),
-        _section(f"*Market Overview*\n{_truncate(analysis.market_overview)}"),
+        _section(f"*Market Overview*\n{analysis.market_overview}"),
         _divider(),
     ]
 
-    if is_first_run:
+    if view.is_first_run:
         msg1_blocks.append(
             _section(":information_source: *First Run* — All competitors are newly tracked. Future reports will highlight only new entrants.")
         )
-    elif new_competitors:
+    elif view.new_competitors:
         alert_lines = [":rotating_light: *New Competitor Alert!*\n"]
-        for comp in analysis.competitors:
-            if comp.name in new_set:
+        for c in view.competitors:
+            if c.is_new:
+                comp = c.competitor
                 strengths = ", ".join(comp.strengths[:3]) if comp.strengths else "N/A"
                 weaknesses = ", ".join(comp.weaknesses[:3]) if comp.weaknesses else "N/A"
                 alert_lines.append(f":new: *{comp.name}*")
                 alert_lines.append(f"  _Strengths:_ {strengths}")
                 alert_lines.append(f"  _Weaknesses:_ {weaknesses}\n")
-        msg1_blocks.append(_section(_truncate("\n".join(alert_lines))))
+        msg1_blocks.append(_section("\n".join(alert_lines)))
     else:
         msg1_blocks.append(
-            _section(":white_check_mark: *No new competitors detected.* All {0} competitors are returning.".format(len(returning_competitors)))
+            _section(":white_check_mark: *No new competitors detected.* All {0} competitors are returning.".format(len(view.returning_competitors)))
         )
 
-    # === MESSAGE 2: Competitor Profiles ===
+    # === SECTION 2: Competitor Profiles ===
     msg2_blocks = [_header("Competitor Profiles")]
 
-    for comp in analysis.competitors:
-        badge = " :new:" if comp.name in new_set and not is_first_run else ""
+    for c in view.competitors:
+        comp = c.competitor
+        badge = " :new:" if c.is_new else ""
         strengths = "\n".join(f"  :white_check_mark: {s}" for s in comp.strengths[:4])
         weaknesses = "\n".join(f"  :x: {w}" for w in comp.weaknesses[:4])
         sentiment_str = ""
@@ -129,17 +186,20 @@ def format_messages(
             f"{sentiment_str}"
         )
         msg2_blocks.append(_divider())
-        msg2_blocks.append(_section(_truncate(profile)))
+        msg2_blocks.append(_section(profile))
 
-    # === MESSAGE 3: News Digest + SWOT ===
+    # === SECTION 3: News Digest + SWOT ===
     msg3_blocks = [_header("News Digest & SWOT Analysis")]
 
-    linked_news = [item for item in (analysis.news_digest or []) if item.url]
-    if linked_news:
+    if view.linked_news:
         news_lines = ["*:newspaper: Recent News*\n"]
-        for item in linked_news[:8]:
-            news_lines.append(f":small_blue_diamond: <{item.url}|{item.headline}> — {item.summary} ({item.date})")
-        msg3_blocks.append(_section(_truncate("\n".join(news_lines))))
+        for item in view.linked_news[:8]:
+            note = news_note(item)
+            news_lines.append(
+                f":small_blue_diamond: <{item.url}|{item.headline}> — {item.summary} ({item.date})"
+                + (f" _{note}_" if note else "")
+            )
+        msg3_blocks.append(_section("\n".join(news_lines)))
 
     msg3_blocks.append(_divider())
     swot = analysis.swot
@@ -150,9 +210,9 @@ def format_messages(
         f"*:bulb: Opportunities*\n" + "\n".join(f"  • {o}" for o in swot.opportunities) + "\n\n"
         f"*:exclamation: Threats*\n" + "\n".join(f"  • {t}" for t in swot.threats)
     )
-    msg3_blocks.append(_section(_truncate(swot_text)))
+    msg3_blocks.append(_section(swot_text))
 
-    # === MESSAGE 4: Strategies + Threats/Gaps/Opportunities + 90-Day Plan + Key Insights ===
+    # === SECTION 4: Strategies + Threats/Gaps/Opportunities + 90-Day Plan + Key Insights ===
     msg4_blocks = [_header("Strategy & Action Plan")]
 
     # Strategies
@@ -165,54 +225,58 @@ def format_messages(
         }.get(s.priority.lower(), ":black_circle:")
         strat_lines.append(f"{priority_emoji} *{s.title}* [{s.category}]")
         strat_lines.append(f"  {s.description}\n")
-    msg4_blocks.append(_section(_truncate("\n".join(strat_lines))))
+    msg4_blocks.append(_section("\n".join(strat_lines)))
     msg4_blocks.append(_divider())
 
     # Threats / Gaps / Opportunities
     tgo_lines = []
-    if analysis.biggest_threats:
+    if view.threats:
         tgo_lines.append("*:rotating_light: Biggest Threats*")
-        tgo_lines.extend(f"  • {t}" for t in analysis.biggest_threats)
+        tgo_lines.extend(f"  • {t}" for t in view.threats)
         tgo_lines.append("")
-    if analysis.market_gaps:
+    if view.gaps:
         tgo_lines.append("*:mag: Market Gaps*")
-        tgo_lines.extend(f"  • {g}" for g in analysis.market_gaps)
+        tgo_lines.extend(f"  • {g}" for g in view.gaps)
         tgo_lines.append("")
-    if analysis.urgent_opportunities:
+    if view.opportunities:
         tgo_lines.append("*:rocket: Urgent Opportunities*")
-        tgo_lines.extend(f"  • {o}" for o in analysis.urgent_opportunities)
+        tgo_lines.extend(f"  • {o}" for o in view.opportunities)
     if tgo_lines:
-        msg4_blocks.append(_section(_truncate("\n".join(tgo_lines))))
+        msg4_blocks.append(_section("\n".join(tgo_lines)))
         msg4_blocks.append(_divider())
 
     # 90-Day Plan
-    if analysis.action_plan_90day:
+    if view.action_plan:
         plan_lines = ["*:calendar: 90-Day Action Plan*\n"]
-        for m in analysis.action_plan_90day:
+        for m in view.action_plan:
             plan_lines.append(f"*{m.month}: {m.title}*")
             plan_lines.append(f"_{m.description}_")
             plan_lines.extend(f"  {i+1}. {a}" for i, a in enumerate(m.actions))
             plan_lines.append("")
-        msg4_blocks.append(_section(_truncate("\n".join(plan_lines))))
+        msg4_blocks.append(_section("\n".join(plan_lines)))
         msg4_blocks.append(_divider())
 
     # Gig Worker Pulse
-    if analysis.gig_worker_pulse:
+    if view.pulse:
         pulse_lines = ["*:speaking_head_in_silhouette: Gig Worker Pulse*\n"]
-        for item in analysis.gig_worker_pulse[:3]:
+        for item in view.pulse[:3]:
             pulse_lines.append(f"  :speech_balloon: \"{item.quote}\" — _{item.source_platform}_")
-        msg4_blocks.append(_section(_truncate("\n".join(pulse_lines))))
+        msg4_blocks.append(_section("\n".join(pulse_lines)))
         msg4_blocks.append(_divider())
 
     # Key Insights
     insight_lines = ["*:brain: Key Insights*\n"]
     for idx, ins in enumerate(analysis.key_insights, 1):
         insight_lines.append(f"  {idx}. {ins}")
-    msg4_blocks.append(_section(_truncate("\n".join(insight_lines))))
+    msg4_blocks.append(_section("\n".join(insight_lines)))
 
-    return [
-        {"blocks": msg1_blocks},
-        {"blocks": msg2_blocks},
-        {"blocks": msg3_blocks},
-        {"blocks": msg4_blocks},
-    ]
+    return pack_blocks(msg1_blocks + msg2_blocks + msg3_blocks + msg4_blocks)
+
+
+def format_messages(
+    analysis: CompetitiveAnalysis,
+    new_competitors: List[str],
+    returning_competitors: List[str],
+    is_first_run: bool,
+) -> List[Dict]:
+    return render_slack_messages(build_view(analysis, new_competitors, returning_competitors, is_first_run))
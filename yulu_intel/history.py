@@ -0,0 +1,243 @@
+"""Columnar loader and vectorized aggregations over stored analysis runs.
+
+Runs are decoded straight from ``analysis_json`` into NumPy arrays instead of
+being validated into ``CompetitiveAnalysis`` objects one at a time.
+
+Usage:
+    python -m yulu_intel.history --runs 180
+    python -m yulu_intel.history --since 2026-01-01 --top 10
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from yulu_intel.archive import iter_runs
+from yulu_intel.db import _normalize
+
+SENTIMENTS = ["positive", "mixed", "neutral", "negative"]
+UNKNOWN = -1
+
+
+@dataclass
+class RunHistory:
+    """Compact columnar view of analysis runs.
+
+    One row per run in ``run_dates``; one row per (run, competitor) appearance
+    in the ``app_*`` columns; one row per news item in the ``news_*`` columns.
+    Run and competitor columns are indices into ``run_dates`` and
+    ``competitors``; sentiment and news type are indices into ``SENTIMENTS``
+    and ``news_types`` (``-1`` when unknown).
+    """
+
+    run_dates: np.ndarray
+    competitors: List[str]
+    news_types: List[str]
+    app_run: np.ndarray
+    app_comp: np.ndarray
+    app_strengths: np.ndarray
+    app_weaknesses: np.ndarray
+    app_sentiment: np.ndarray
+    news_run: np.ndarray
+    news_comp: np.ndarray
+    news_type: np.ndarray
+
+    @property
+    def n_runs(self) -> int:
+        return len(self.run_dates)
+
+    def last(self, n: int) -> "RunHistory":
+        """Restrict to the most recent ``n`` runs."""
+        if n >= self.n_runs:
+            return self
+        start = self.n_runs - n
+        app = self.app_run >= start
+        news = self.news_run >= start
+        return RunHistory(
+            run_dates=self.run_dates[start:],
+            competitors=self.competitors,
+            news_types=self.news_types,
+            app_run=self.app_run[app] - start,
+            app_comp=self.app_comp[app],
+            app_strengths=self.app_strengths[app],
+            app_weaknesses=self.app_weaknesses[app],
+            app_sentiment=self.app_sentiment[app],
+            news_run=self.news_run[news] - start,
+            news_comp=self.news_comp[news],
+            news_type=self.news_type[news],
+        )
+
+    def threat_scores(self) -> np.ndarray:
+        """Per-appearance threat score, same heuristic as the HTML report chart."""
+        positive = (self.app_sentiment == SENTIMENTS.index("positive")).astype(np.int16)
+        return np.minimum(10, self.app_strengths * 2 + positive)
+
+    def competitor_appearances(self) -> np.ndarray:
+        """Number of runs each competitor appeared in, indexed like ``competitors``.
+
+        A competitor listed twice in one run counts once.
+        """
+        n = len(self.competitors)
+        pairs = np.unique(self.app_run.astype(np.int64) * n + self.app_comp)
+        return np.bincount(pairs % n, minlength=n) if n else np.zeros(0, dtype=np.int64)
+
+    def mean_threat_by_competitor(self) -> np.ndarray:
+        """Mean threat score over all of a competitor's appearance rows."""
+        totals = np.bincount(
+            self.app_comp, weights=self.threat_scores(), minlength=len(self.competitors)
+        )
+        counts = np.bincount(self.app_comp, minlength=len(self.competitors)).astype(totals.dtype)
+        return np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+
+    def top_competitors(self, n: int = 10) -> List[Tuple[str, int, float]]:
+        """Return ``(name, appearances, mean_threat)`` for the most frequent competitors."""
+        counts = self.competitor_appearances()
+        threat = self.mean_threat_by_competitor()
+        order = np.argsort(-counts, kind="stable")[:n]
+        return [
+            (self.competitors[i], int(counts[i]), float(threat[i]))
+            for i in order
+            if counts[i] > 0
+        ]
+
+    def run_months(self) -> np.ndarray:
+        return self.run_dates.astype("datetime64[M]")
+
+    def news_type_mix_by_month(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """Return ``(months, news_types, counts)`` with ``counts[month, type]``."""
+        months, month_idx = np.unique(self.run_months(), return_inverse=True)
+        n_types = len(self.news_types)
+        known = self.news_type >= 0
+        cells = month_idx[self.news_run[known]] * n_types + self.news_type[known]
+        counts = np.bincount(cells, minlength=len(months) * n_types)
+        return (
+            [str(m) for m in months],
+            list(self.news_types),
+            counts.reshape(len(months), n_types),
+        )
+
+
+def _codes(values: List[int], vocab_size: int) -> np.ndarray:
+    """Signed vocabulary codes (``UNKNOWN`` included) in the smallest dtype that holds them."""
+    dtype = np.int16 if vocab_size <= np.iinfo(np.int16).max else np.int32
+    return np.array(values, dtype=dtype)
+
+
+def _index(vocab: Dict[str, int], names: List[str], key: str, display: str) -> int:
+    idx = vocab.get(key)
+    if idx is None:
+        idx = vocab[key] = len(names)
+        names.append(display)
+    return idx
+
+
+def build_history(rows: Iterable[dict]) -> RunHistory:
+    """Decode ``analysis_runs`` rows (``run_date`` + ``analysis_json``) into columns."""
+    dates: List[str] = []
+    comp_vocab: Dict[str, int] = {}
+    comp_names: List[str] = []
+    type_vocab: Dict[str, int] = {}
+    type_names: List[str] = []
+    sentiment_codes = {s: i for i, s in enumerate(SENTIMENTS)}
+
+    app_run: List[int] = []
+    app_comp: List[int] = []
+    app_strengths: List[int] = []
+    app_weaknesses: List[int] = []
+    app_sentiment: List[int] = []
+    news_run: List[int] = []
+    news_comp: List[int] = []
+    news_type: List[int] = []
+
+    for row in sorted(rows, key=lambda r: r["run_date"]):
+        raw = row["analysis_json"]
+        doc = orjson.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        run_idx = len(dates)
+        dates.append(row["run_date"])
+
+        for comp in doc.get("competitors") or []:
+            name = comp.get("name") or ""
+            app_run.append(run_idx)
+            app_comp.append(_index(comp_vocab, comp_names, _normalize(name), name))
+            app_strengths.append(len(comp.get("strengths") or []))
+            app_weaknesses.append(len(comp.get("weaknesses") or []))
+            sentiment = (comp.get("sentiment") or {}).get("net_sentiment") or ""
+            app_sentiment.append(sentiment_codes.get(sentiment.lower(), UNKNOWN))
+
+        for item in doc.get("news_digest") or []:
+            name = item.get("competitor_name") or ""
+            kind = (item.get("type") or "").lower()
+            news_run.append(run_idx)
+            news_comp.append(_index(comp_vocab, comp_names, _normalize(name), name))
+            news_type.append(_index(type_vocab, type_names, kind, kind) if kind else UNKNOWN)
+
+    return RunHistory(
+        run_dates=np.array(dates, dtype="datetime64[D]"),
+        competitors=comp_names,
+        news_types=type_names,
+        app_run=np.array(app_run, dtype=np.int32),
+        app_comp=np.array(app_comp, dtype=np.int32),
+        app_strengths=np.array(app_strengths, dtype=np.int16),
+        app_weaknesses=np.array(app_weaknesses, dtype=np.int16),
+        app_sentiment=_codes(app_sentiment, len(SENTIMENTS)),
+        news_run=np.array(news_run, dtype=np.int32),
+        news_comp=np.array(news_comp, dtype=np.int32),
+        news_type=_codes(news_type, len(type_names)),
+    )
+
+
+def load_history(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    latest: Optional[int] = None,
+) -> RunHistory:
+    """Bulk-load stored runs (hot table and archive) into a :class:`RunHistory`."""
+    rows = iter_runs(
+        "run_date, analysis_json",
+        start_date=start_date,
+        end_date=end_date,
+        latest=latest,
+    )
+    return build_history(rows)
+
+
+def format_report(history: RunHistory, top: int = 10) -> str:
+    if history.n_runs == 0:
+        return "No analysis runs found."
+
+    lines = [
+        f"Runs: {history.n_runs} ({history.run_dates[0]} → {history.run_dates[-1]})",
+        "",
+        f"Top {top} competitors by appearances",
+        f"{'Competitor':<28}{'Runs':>6}{'Share':>8}{'Threat':>8}",
+    ]
+    for name, count, threat in history.top_competitors(top):
+        share = count / history.n_runs
+        lines.append(f"{name[:27]:<28}{count:>6}{share:>8.0%}{threat:>8.1f}")
+
+    months, types, counts = history.news_type_mix_by_month()
+    if types:
+        lines += ["", "News type mix by month", f"{'Month':<10}" + "".join(f"{t[:11]:>12}" for t in types)]
+        for month, row in zip(months, counts):
+            lines.append(f"{month:<10}" + "".join(f"{n:>12}" for n in row))
+
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarise stored competitive intel runs.")
+    parser.add_argument("--runs", type=int, help="only the most recent N runs")
+    parser.add_argument("--since", help="start date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="end date (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=10, help="competitors to list")
+    args = parser.parse_args()
+
+    history = load_history(args.since, args.until, latest=args.runs)
+    print(format_report(history, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compact JSON rendering of a ``ReportView`` for dashboards and integrations.
+
+Unlike ``analysis_json`` this carries the derived fields (NEW badges, threat
+scores, KPIs, summary lines) so consumers do not re-implement them.
+"""
+
+from typing import Dict
+
+import orjson
+
+from yulu_intel.view import ReportView
+
+
+def view_to_dict(view: ReportView) -> Dict:
+    analysis = view.analysis
+    return {
+        "product": view.product,
+        "date": view.report_date.isoformat(),
+        "first_run": view.is_first_run,
+        "report_url": view.report_url,
+        "kpis": view.kpis,
+        "summary": {
+            "threat": view.top_threat,
+            "insight": view.top_insight,
+            "opportunity": view.top_opportunity,
+            "action": view.first_action,
+        },
+        "competitors": [
+            {
+                "name": c.name,
+                "new": c.is_new,
+                "threat_score": c.threat_score,
+                "sentiment": c.competitor.sentiment.net_sentiment if c.competitor.sentiment else None,
+                "market_position": c.competitor.market_position,
+            }
+            for c in view.competitors
+        ],
+        "news": [item.model_dump(exclude_none=True) for item in view.news],
+        "swot": analysis.swot.model_dump(),
+        "threats": view.threats,
+        "gaps": view.gaps,
+        "opportunities": view.opportunities,
+        "insights": analysis.key_insights,
+    }
+
+
+def render_json(view: ReportView) -> str:
+    return orjson.dumps(view_to_dict(view)).decode("utf-8")
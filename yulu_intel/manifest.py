@@ -0,0 +1,209 @@
+"""Report manifest and pre-rendered, paginated report index.
+
+After each run the Python side records the report in ``reports/manifest.json``
+(date, product, size, hash, KPI counts) and re-renders ``reports/index.html``,
+``index-2.html``, ... Both are mirrored to the ``report_assets`` table so the
+reports server can answer ``/reports`` and ``/report/latest`` from memory
+without listing directories or scanning ``analysis_runs``.
+
+Usage:
+    python -m yulu_intel.manifest --rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from yulu_intel.archive import iter_runs
+from yulu_intel.db import get_report_asset, put_report_asset
+from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.templates import Template
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).resolve().parent.parent / "reports"
+MANIFEST_NAME = "manifest.json"
+PAGE_SIZE = 50
+
+_INDEX_CARD = Template("""
+      <a href="/report/{{ date }}" class="report-card">
+        <span class="report-date">{{ date }}</span>
+        {{{ badge }}}
+        <span class="kpis">{{ competitors }} competitors · {{ threats }} threats · {{ news }} news</span>
+        <span class="view-link">View Report &rarr;</span>
+      </a>""", "index_card")
+
+_INDEX_PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>CompeteIQ Reports</title>
+<style>
+*,*::before,*::after{box-sizing:border-box;margin:0;padding:0}
+body{font-family:'Inter',system-ui,sans-serif;background:#f8fafc;color:#1e293b;padding:40px 20px}
+.container{max-width:700px;margin:0 auto}
+h1{font-size:1.8rem;font-weight:700;margin-bottom:8px}
+p.sub{color:#64748b;margin-bottom:32px}
+p.sub a{color:#4f46e5;text-decoration:none;font-weight:500}
+.report-card{display:flex;align-items:center;gap:12px;background:#fff;border-radius:12px;padding:18px 24px;margin-bottom:12px;text-decoration:none;color:#1e293b;box-shadow:0 1px 3px rgba(0,0,0,.08);transition:transform .1s,box-shadow .15s}
+.report-card:hover{transform:translateY(-2px);box-shadow:0 4px 12px rgba(0,0,0,.12)}
+.report-date{font-weight:600;font-size:1.05rem}
+.badge{background:#4f46e5;color:#fff;font-size:.7rem;font-weight:600;padding:2px 10px;border-radius:99px;text-transform:uppercase}
+.kpis{color:#64748b;font-size:.85rem}
+.view-link{margin-left:auto;color:#4f46e5;font-weight:500;font-size:.9rem}
+.empty{text-align:center;color:#94a3b8;margin-top:60px;font-size:1.1rem}
+.pager{display:flex;justify-content:space-between;margin-top:24px}
+.pager a{color:#4f46e5;text-decoration:none;font-weight:500}
+</style>
+</head>
+<body>
+<div class="container">
+<h1>CompeteIQ Reports</h1>
+<p class="sub">Competitive intelligence reports for {{ product }} · <a href="/trends">Trends</a></p>
+{{{ cards }}}
+<nav class="pager"><span>{{{ newer }}}</span><span>{{{ older }}}</span></nav>
+</div>
+</body>
+</html>""", "index_page")
+
+
+def page_name(page: int) -> str:
+    return "index.html" if page == 1 else f"index-{page}.html"
+
+
+def _page_href(page: int) -> str:
+    return "/reports" if page == 1 else f"/reports?page={page}"
+
+
+def make_entry(
+    run_date: str,
+    report_html: str,
+    analysis: CompetitiveAnalysis,
+) -> Dict:
+    body = report_html.encode("utf-8")
+    return {
+        "date": run_date,
+        "product": analysis.product_name,
+        "size": len(body),
+        "sha256": hashlib.sha256(body).hexdigest(),
+        "kpis": {
+            "competitors": len(analysis.competitors),
+            "threats": len(analysis.biggest_threats or []),
+            "opportunities": len(analysis.urgent_opportunities or []),
+            "news": len(analysis.news_digest or []),
+        },
+    }
+
+
+def load_manifest(reports_dir: Path = REPORTS_DIR) -> Dict:
+    """The manifest in Supabase, else the local copy (offline only).
+
+    Runs happen on several machines, so a local ``reports/`` directory can be
+    behind; saving on top of it would drop the reports it never saw.
+    """
+    try:
+        stored = get_report_asset(MANIFEST_NAME)
+    except Exception as e:
+        logger.warning("Could not load the stored manifest, using the local copy: %s", e)
+        stored = None
+    if stored:
+        return json.loads(stored)
+    path = reports_dir / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"version": 1, "latest": None, "reports": []}
+
+
+def render_index_pages(manifest: Dict) -> Dict[str, str]:
+    """Return ``{file name: html}`` for every index page."""
+    reports = manifest["reports"]
+    product = reports[0]["product"] if reports else ""
+    n_pages = max(1, -(-len(reports) // PAGE_SIZE))
+    pages = {}
+    for page in range(1, n_pages + 1):
+        chunk = reports[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        cards = "\n".join(
+            _INDEX_CARD.render(
+                date=r["date"],
+                badge='<span class="badge">Latest</span>' if r["date"] == manifest["latest"] else "",
+                competitors=r["kpis"]["competitors"],
+                threats=r["kpis"]["threats"],
+                news=r["kpis"]["news"],
+            )
+            for r in chunk
+        )
+        if not cards:
+            cards = '<p class="empty">No reports yet. Run the agent to generate your first report.</p>'
+        newer = f'<a href="{_page_href(page - 1)}">&larr; Newer</a>' if page > 1 else ""
+        older = f'<a href="{_page_href(page + 1)}">Older &rarr;</a>' if page < n_pages else ""
+        pages[page_name(page)] = _INDEX_PAGE.render(product=product, cards=cards, newer=newer, older=older)
+    return pages
+
+
+def save_manifest(manifest: Dict, reports_dir: Path = REPORTS_DIR, upload: bool = True) -> None:
+    """Write the manifest and index pages locally and mirror them to Supabase."""
+    manifest["reports"].sort(key=lambda r: r["date"], reverse=True)
+    manifest["latest"] = manifest["reports"][0]["date"] if manifest["reports"] else None
+    manifest["generated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    manifest["page_size"] = PAGE_SIZE
+
+    files = {MANIFEST_NAME: json.dumps(manifest, separators=(",", ":"))}
+    files.update(render_index_pages(manifest))
+
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        (reports_dir / name).write_text(content, encoding="utf-8")
+    if upload:
+        for name, content in files.items():
+            put_report_asset(name, content)
+
+
+def record_report(
+    run_date: str,
+    report_html: str,
+    analysis: CompetitiveAnalysis,
+    reports_dir: Path = REPORTS_DIR,
+) -> Dict:
+    """Add or replace today's entry and regenerate the index."""
+    manifest = load_manifest(reports_dir)
+    manifest["reports"] = [r for r in manifest["reports"] if r["date"] != run_date]
+    manifest["reports"].append(make_entry(run_date, report_html, analysis))
+    save_manifest(manifest, reports_dir)
+    return manifest
+
+
+def rebuild_manifest(reports_dir: Path = REPORTS_DIR, upload: bool = True) -> Dict:
+    """Rebuild from every stored run that has a report (hot table and archive)."""
+    entries: Dict[str, Dict] = {}
+    for row in iter_runs("run_date, analysis_json, report_html"):
+        if not row.get("report_html"):
+            continue
+        analysis = CompetitiveAnalysis.model_validate_json(row["analysis_json"])
+        entries[row["run_date"]] = make_entry(row["run_date"], row["report_html"], analysis)
+    manifest = {"version": 1, "reports": list(entries.values())}
+    save_manifest(manifest, reports_dir, upload)
+    return manifest
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Build the report manifest and index pages.")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild from all stored runs")
+    parser.add_argument("--no-upload", action="store_true", help="write local files only")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        manifest = rebuild_manifest(upload=not args.no_upload)
+    else:
+        manifest = load_manifest()
+        save_manifest(manifest, upload=not args.no_upload)
+    logger.info("Manifest has %d report(s); latest %s", len(manifest["reports"]), manifest["latest"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Markdown rendering of a ``ReportView`` (wikis, email, GitHub issues)."""
+
+from typing import List
+
+from yulu_intel.view import ReportView, news_note
+
+
+def _bullets(items: List[str]) -> List[str]:
+    return [f"- {item}" for item in items]
+
+
+def render_markdown(view: ReportView) -> str:
+    analysis = view.analysis
+    today = view.report_date.strftime("%B %d, %Y")
+    k = view.kpis
+    lines = [
+        f"# CompeteIQ — {view.product} — {today}",
+        "",
+        f"**{k['competitors']}** competitors · **{k['threats']}** threats · "
+        f"**{k['opportunities']}** opportunities · **{k['news']}** news items",
+    ]
+    if view.report_url:
+        lines += ["", f"[View full report]({view.report_url})"]
+
+    lines += ["", "## Market Overview", "", analysis.market_overview]
+    if analysis.key_insights:
+        lines += ["", "## Key Insights", ""]
+        lines += [f"{i}. {ins}" for i, ins in enumerate(analysis.key_insights, 1)]
+
+    if view.news:
+        lines += ["", "## News Digest", ""]
+        for item in view.news:
+            headline = f"[{item.headline}]({item.url})" if item.url else item.headline
+            note = news_note(item)
+            lines.append(
+                f"- **{item.type}** · {item.date} · {item.competitor_name}: {headline} — {item.summary}"
+                + (f" _({note})_" if note else "")
+            )
+
+    lines += ["", "## Competitors", ""]
+    if view.is_first_run:
+        lines += ["_First run — all competitors are newly tracked._", ""]
+    for c in view.competitors:
+        comp = c.competitor
+        badge = " 🆕" if c.is_new else ""
+        sentiment = f" · sentiment: {comp.sentiment.net_sentiment}" if comp.sentiment else ""
+        lines += [
+            f"### {comp.name}{badge}",
+            "",
+            f"_{comp.market_position}_ · threat score {c.threat_score}/10{sentiment}",
+            "",
+            comp.description[:300],
+            "",
+            "**Strengths:** " + ("; ".join(comp.strengths) or "N/A"),
+            "",
+            "**Weaknesses:** " + ("; ".join(comp.weaknesses) or "N/A"),
+            "",
+            f"**Pricing:** {comp.pricing_model}  ",
+            f"**Differentiator:** {comp.key_differentiator}",
+            "",
+        ]
+
+    swot = analysis.swot
+    lines += ["## SWOT", ""]
+    for title, items in (
+        ("Strengths", swot.strengths),
+        ("Weaknesses", swot.weaknesses),
+        ("Opportunities", swot.opportunities),
+        ("Threats", swot.threats),
+    ):
+        lines += [f"**{title}**", ""] + _bullets(items) + [""]
+
+    if view.pulse:
+        lines += ["## Gig Worker Pulse", ""]
+        lines += [f"> \"{p.quote}\" — {p.source_platform}" for p in view.pulse[:4]]
+        lines.append("")
+
+    lines += ["## Strategic Recommendations", ""]
+    for s in analysis.strategies:
+        lines.append(f"- **{s.title}** ({s.priority.upper()}, {s.category}) — {s.description}")
+    lines.append("")
+
+    for title, items in (
+        ("Biggest Threats", view.threats),
+        ("Market Gaps", view.gaps),
+        ("Urgent Opportunities", view.opportunities),
+    ):
+        if items:
+            lines += [f"## {title}", ""] + _bullets(items) + [""]
+
+    if view.action_plan:
+        lines += ["## 90-Day Action Plan", ""]
+        for m in view.action_plan:
+            lines += [f"### {m.month}: {m.title}", "", f"_{m.description}_", ""]
+            lines += [f"{i}. {a}" for i, a in enumerate(m.actions, 1)]
+            lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
@@ -1,6 +1,7 @@
 from typing import List, Optional
 
 from pydantic import BaseModel
+from pydantic.json_schema import SkipJsonSchema
 
 
 class CompetitorInsights(BaseModel):
@@ -64,6 +65,9 @@ class NewsDigestItem(BaseModel):
     url: Optional[str] = None
     date: str
     type: str
+    # Set by news_dedup, not the LLM, so kept out of the response schema
+    also_competitors: SkipJsonSchema[Optional[List[str]]] = None  # other competitors the same story covers
+    first_reported: SkipJsonSchema[Optional[str]] = None  # run date it was first reported ("mark" mode)
 
 
 class NewsExtractionResponse(BaseModel):
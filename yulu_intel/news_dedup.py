@@ -0,0 +1,147 @@
+"""Same-run merging and cross-day suppression of repeated news stories.
+
+Stories are compared by URL and by cosine similarity of hashed
+headline + summary embeddings. Previously reported items come from the
+``news_digest`` of runs stored in the last ``news_dedup_days`` days.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+import orjson
+
+from yulu_intel.archive import iter_runs
+from yulu_intel.config import settings
+from yulu_intel.models import NewsDigestItem
+from yulu_intel.textvec import hash_vectorize
+
+logger = logging.getLogger(__name__)
+
+
+def _url_key(url: Optional[str]) -> str:
+    if not url:
+        return ""
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")])
+    return host + parts.path.rstrip("/") + (f"?{query}" if query else "")
+
+
+def _text(headline: str, summary: str) -> str:
+    return f"{headline}. {summary}"
+
+
+def merge_same_run(
+    items: List[NewsDigestItem],
+    threshold: float,
+) -> List[NewsDigestItem]:
+    """Collapse duplicates within one run.
+
+    The first item keeps its ``competitor_name``; the other competitors the
+    story covers go to ``also_competitors``.
+    """
+    if not items:
+        return []
+    vectors = hash_vectorize(_text(i.headline, i.summary) for i in items)
+
+    kept: List[int] = []
+    kept_urls: Dict[str, int] = {}
+    merged: List[NewsDigestItem] = []
+    for idx, item in enumerate(items):
+        target = kept_urls.get(_url_key(item.url))
+        if target is None and kept:
+            sims = vectors[kept] @ vectors[idx]
+            best = int(np.argmax(sims))
+            if sims[best] >= threshold:
+                target = best
+
+        if target is None:
+            kept.append(idx)
+            if item.url:
+                kept_urls[_url_key(item.url)] = len(merged)
+            merged.append(item.model_copy())
+            continue
+
+        existing = merged[target]
+        others = existing.also_competitors or []
+        if item.competitor_name != existing.competitor_name and item.competitor_name not in others:
+            existing.also_competitors = others + [item.competitor_name]
+
+    return merged
+
+
+def _load_reported(since: str, before: str) -> List[Tuple[str, str, str, str]]:
+    """Return ``(run_date, url_key, headline, summary)`` for stories already reported."""
+    reported = []
+    for row in iter_runs("run_date, analysis_json", start_date=since):
+        if row["run_date"] >= before:
+            continue
+        doc = orjson.loads(row["analysis_json"])
+        for item in doc.get("news_digest") or []:
+            reported.append((
+                row["run_date"],
+                _url_key(item.get("url")),
+                item.get("headline") or "",
+                item.get("summary") or "",
+            ))
+    return reported
+
+
+def dedup_news(
+    items: List[NewsDigestItem],
+    today: Optional[date] = None,
+    days: Optional[int] = None,
+    threshold: Optional[float] = None,
+    mode: Optional[str] = None,
+) -> List[NewsDigestItem]:
+    """Merge same-run duplicates, then suppress or mark stories reported in the last ``days``."""
+    today = today or date.today()
+    days = settings.news_dedup_days if days is None else days
+    threshold = settings.news_dedup_threshold if threshold is None else threshold
+    mode = mode or settings.news_dedup_mode
+
+    merged = merge_same_run(items, threshold)
+    if len(merged) < len(items):
+        logger.info("  Merged %d duplicate news item(s) within this run", len(items) - len(merged))
+    if days <= 0 or not merged:
+        return merged
+
+    since = (today - timedelta(days=days)).isoformat()
+    reported = _load_reported(since, today.isoformat())
+    if not reported:
+        return merged
+
+    first_seen: Dict[str, str] = {}
+    for run_date, url, _, _ in reported:
+        if url and (url not in first_seen or run_date < first_seen[url]):
+            first_seen[url] = run_date
+    past_vectors = hash_vectorize(_text(h, s) for _, _, h, s in reported)
+    new_vectors = hash_vectorize(_text(i.headline, i.summary) for i in merged)
+    sims = new_vectors @ past_vectors.T
+
+    result: List[NewsDigestItem] = []
+    repeats = 0
+    for idx, item in enumerate(merged):
+        seen_on = first_seen.get(_url_key(item.url)) if item.url else None
+        matches = np.nonzero(sims[idx] >= threshold)[0]
+        if matches.size:
+            earliest = min(reported[i][0] for i in matches)
+            seen_on = min(seen_on, earliest) if seen_on else earliest
+        if seen_on is None:
+            result.append(item)
+            continue
+        repeats += 1
+        if mode == "mark":
+            item.first_reported = seen_on
+            result.append(item)
+
+    logger.info(
+        "  %s %d news item(s) already reported since %s",
+        "Marked" if mode == "mark" else "Suppressed",
+        repeats,
+        since,
+    )
+    return result
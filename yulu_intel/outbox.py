@@ -0,0 +1,167 @@
+"""Durable Slack outbox with concurrent fan-out to every configured destination.
+
+``enqueue`` persists one ``slack_outbox`` row per (destination, message) before
+anything is sent. ``flush`` delivers pending rows: destinations run
+concurrently, messages within a destination go out in the order they were
+queued (bot-mode replies thread under the first message of the same run, keyed
+by the ``run_id`` each ``enqueue`` call generates, so same-day re-runs get their
+own threads). Each row tracks its own status, attempts and
+last error, so a failed delivery is retried by the next ``flush`` without
+re-running search or analysis.
+
+Destinations are ``SLACK_WEBHOOK_URL`` plus ``SLACK_WEBHOOK_URLS`` (webhook
+mode), or ``SLACK_CHANNEL`` plus ``SLACK_CHANNELS`` with ``SLACK_BOT_TOKEN``.
+Webhook URLs are secrets, so rows store a hash of the URL, not the URL itself.
+
+Usage:
+    python -m yulu_intel.outbox flush
+    python -m yulu_intel.outbox status
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from yulu_intel.config import settings
+from yulu_intel.db import (
+    count_slack_messages,
+    enqueue_slack_messages,
+    get_pending_slack_messages,
+    get_slack_thread_ts,
+    update_slack_message,
+)
+from yulu_intel.slack import _post_bot, _post_webhook
+
+logger = logging.getLogger(__name__)
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def destinations() -> Dict[str, Tuple[str, str]]:
+    """Return ``{destination key: (kind, target)}`` for the current configuration."""
+    if settings.SLACK_BOT_TOKEN and (settings.SLACK_CHANNEL or settings.SLACK_CHANNELS):
+        channels = _split(settings.SLACK_CHANNEL) + _split(settings.SLACK_CHANNELS)
+        return {f"channel:{c}": ("bot", c) for c in dict.fromkeys(channels)}
+    urls = _split(settings.SLACK_WEBHOOK_URL) + _split(settings.SLACK_WEBHOOK_URLS)
+    return {
+        "webhook:" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:12]: ("webhook", url)
+        for url in dict.fromkeys(urls)
+    }
+
+
+def enqueue(run_date: str, payloads: List[Dict]) -> int:
+    """Persist ``payloads`` for every destination as one run. Returns the number of rows queued."""
+    targets = destinations()
+    if not targets:
+        raise RuntimeError(
+            "No Slack credentials configured. Set SLACK_WEBHOOK_URL or (SLACK_BOT_TOKEN + SLACK_CHANNEL) in .env"
+        )
+    run_id = uuid.uuid4().hex[:12]
+    rows = [
+        {
+            "run_id": run_id,
+            "run_date": run_date,
+            "destination": key,
+            "seq": seq,
+            "payload": json.dumps(payload),
+            "status": "pending",
+            "attempts": 0,
+        }
+        for key in targets
+        for seq, payload in enumerate(payloads)
+    ]
+    return len(enqueue_slack_messages(rows))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _deliver(key: str, target: Optional[Tuple[str, str]], rows: List[Dict]) -> Tuple[int, int]:
+    """Send one destination's rows in order; stop at the first failure to keep ordering."""
+    sent = 0
+    thread_ts: Dict[str, Optional[str]] = {}
+    for i, row in enumerate(rows):
+        try:
+            if target is None:
+                raise RuntimeError("destination is no longer configured")
+            kind, dest = target
+            payload = json.loads(row["payload"])
+            slack_ts = None
+            if kind == "bot":
+                parent = None
+                if row["seq"] > 0:
+                    if row["run_id"] not in thread_ts:
+                        thread_ts[row["run_id"]] = get_slack_thread_ts(key, row["run_id"])
+                    parent = thread_ts[row["run_id"]]
+                slack_ts = _post_bot(payload, thread_ts=parent, channel=dest)
+                if row["seq"] == 0:
+                    thread_ts[row["run_id"]] = slack_ts
+            else:
+                _post_webhook(payload, url=dest)
+        except Exception as e:
+            attempts = row["attempts"] + 1
+            status = "failed" if attempts >= settings.slack_outbox_max_attempts else "pending"
+            update_slack_message(row["id"], {"attempts": attempts, "status": status, "last_error": str(e)[:500]})
+            logger.warning("  %s: message %d of %s failed (%s); %d left queued", key, row["seq"], row["run_date"], e, len(rows) - i)
+            return sent, len(rows) - i
+        update_slack_message(row["id"], {
+            "attempts": row["attempts"] + 1,
+            "status": "sent",
+            "slack_ts": slack_ts,
+            "sent_at": _now(),
+            "last_error": None,
+        })
+        sent += 1
+    return sent, 0
+
+
+def flush() -> Dict[str, Tuple[int, int]]:
+    """Deliver all pending rows. Returns ``{destination: (sent, still pending)}``."""
+    pending = get_pending_slack_messages(settings.slack_outbox_max_attempts)
+    if not pending:
+        return {}
+    by_destination: Dict[str, List[Dict]] = {}
+    for row in pending:
+        by_destination.setdefault(row["destination"], []).append(row)
+
+    targets = destinations()
+    logger.info("Delivering %d queued message(s) to %d destination(s)", len(pending), len(by_destination))
+    with ThreadPoolExecutor(max_workers=len(by_destination)) as pool:
+        # Each worker runs in a copy of this context so its spans nest under the caller's
+        futures = {
+            key: pool.submit(contextvars.copy_context().run, _deliver, key, targets.get(key), rows)
+            for key, rows in by_destination.items()
+        }
+        results = {key: fut.result() for key, fut in futures.items()}
+
+    for key, (sent, left) in results.items():
+        logger.info("  %s: %d sent, %d pending", key, sent, left)
+    return results
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Deliver or inspect queued Slack messages.")
+    parser.add_argument("command", choices=["flush", "status"])
+    args = parser.parse_args()
+
+    if args.command == "flush":
+        results = flush()
+        if any(left for _, left in results.values()):
+            raise SystemExit(1)
+    else:
+        for key, counts in sorted(count_slack_messages().items()):
+            print(f"{key:<24}" + "  ".join(f"{status}={n}" for status, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
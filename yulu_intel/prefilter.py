@@ -0,0 +1,316 @@
+"""Local relevance prefilter for search results, applied before any LLM call.
+
+Each document gets a 0-1 relevance score for the gig-worker / daily-rental
+segment in ``FOCUS_PERSONA``: a keyword rule score, blended with a small
+logistic-regression model when one has been trained from past runs.
+Documents below ``prefilter_threshold`` are dropped.
+
+News-search documents are recorded as training samples (a rolling
+``SAMPLE_DAYS`` window in ``data/prefilter_samples.jsonl``); the model and the
+samples are read from Supabase first, like the query planner's stats, so CI
+runners keep them and a stale local copy never replaces the shared one. A
+sample is positive when its run cited the URL in the news digest.
+Product-search documents are not sampled: nothing records which of
+them the analysis used, and labelling by "mentions a competitor" would only
+teach the model to spot names.
+
+Usage:
+    python -m yulu_intel.prefilter train
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import orjson
+
+from yulu_intel.archive import iter_runs
+from yulu_intel.config import DATA_DIR, FOCUS_PERSONA, settings
+from yulu_intel.db import get_report_asset, put_report_asset
+from yulu_intel.textvec import hash_vectorize
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "prefilter_model.json"
+MODEL_PATH = DATA_DIR / MODEL_NAME
+SAMPLES_NAME = "prefilter_samples.jsonl"
+SAMPLES_PATH = DATA_DIR / SAMPLES_NAME
+SAMPLE_DAYS = 30
+SAMPLE_BODY_CHARS = 1000
+
+# Rough chars-per-token ratio for English prompt text.
+CHARS_PER_TOKEN = 4
+
+_SEGMENT_TERMS = [
+    "gig worker", "gig workers", "delivery partner", "delivery partners", "rider", "riders",
+    "rental", "rent", "rentals", "sharing", "subscription", "fleet", "bike taxi",
+    "battery swap", "battery swapping", "swiggy", "zomato", "blinkit", "zepto",
+    "dunzo", "porter", "per km", "per hour", "daily rental", "last mile", "micromobility",
+]
+
+# EV makers that sell to consumers and retail/ownership vocabulary (see SYSTEM_PROMPT).
+_OFF_SEGMENT_TERMS = [
+    "ather", "ola electric", "tvs iqube", "iqube", "hero electric", "bajaj chetak",
+    "chetak", "ex-showroom", "on-road price", "showroom", "test ride", "top speed",
+    "variant", "variants", "bookings open", "ownership",
+]
+
+
+def _compile(terms: List[str]) -> List[re.Pattern]:
+    return [re.compile(r"\b" + re.escape(t) + r"\b") for t in terms]
+
+
+_POSITIVE = _compile(
+    _SEGMENT_TERMS
+    + [t.lower() for t in FOCUS_PERSONA["useCases"]]
+    + [t.lower() for t in FOCUS_PERSONA["keyConcerns"]]
+)
+_NEGATIVE = _compile(_OFF_SEGMENT_TERMS)
+
+# Words that say what a company does rather than which company it is
+_GENERIC_NAME_TOKENS = frozenset(
+    "the and app bike bikes taxi taxis cab cabs electric ev evs mobility india indian rental "
+    "rentals rent scooter scooters motor motors auto energy tech technologies pvt ltd "
+    "limited private inc services service delivery ride rides".split()
+)
+
+_model: Optional[Dict[str, np.ndarray]] = None
+_model_loaded = False
+
+_stats = {"docs_in": 0, "docs_out": 0, "chars_in": 0, "chars_out": 0}
+_samples: List[Dict] = []
+
+
+def _doc_text(doc: Dict) -> str:
+    return f"{doc.get('title', '')}\n{doc.get('body', '')}"
+
+
+@lru_cache(maxsize=256)
+def subject_patterns(subject: str) -> List[re.Pattern]:
+    """Ways a subject can be mentioned.
+
+    LLM-chosen names carry extras ("Bounce (Bounce Infinity)", "Rapido Bike
+    Taxi"), so each alias (split on parentheses, slashes and commas) and each
+    distinctive token of it counts as a mention.
+    """
+    aliases = [a.strip() for a in re.split(r"[()/,]", subject.lower()) if a.strip()]
+    tokens = {
+        t for a in aliases for t in re.findall(r"\w+", a)
+        if len(t) >= 3 and t not in _GENERIC_NAME_TOKENS
+    }
+    return _compile(aliases + sorted(tokens - set(aliases)))
+
+
+def mentions(text: str, subject: str) -> bool:
+    """Whether lowercased ``text`` mentions ``subject`` (see ``subject_patterns``)."""
+    return any(p.search(text) for p in subject_patterns(subject))
+
+
+def rule_score(doc: Dict, subject: Optional[str] = None, require_subject: bool = False) -> float:
+    """Keyword score: segment terms push up, consumer-EV / retail terms push down."""
+    text = _doc_text(doc).lower()
+    positive = sum(1 for p in _POSITIVE if p.search(text))
+    negative = sum(1 for p in _NEGATIVE if p.search(text))
+    raw = 0.6 * positive - 1.0 * negative
+    if subject:
+        if mentions(text, subject):
+            raw += 1.5
+        elif require_subject:
+            raw -= 1.5
+    return 1.0 / (1.0 + math.exp(-(raw - 1.0)))
+
+
+def _features(docs: List[Dict], rule_scores: List[float]) -> np.ndarray:
+    vectors = hash_vectorize(_doc_text(d)[:2000] for d in docs)
+    return np.hstack([vectors, np.array(rule_scores, dtype=np.float32)[:, None]])
+
+
+def _load_asset(path: Path, name: str) -> Optional[str]:
+    """The copy in Supabase (other runners add to it), else the local file."""
+    try:
+        stored = get_report_asset(name)
+    except Exception as e:
+        logger.warning("Could not load %s from Supabase, using the local copy: %s", name, e)
+        stored = None
+    if stored is None and path.exists():
+        return path.read_text(encoding="utf-8")
+    return stored
+
+
+def _save_asset(path: Path, name: str, content: str, upload: bool = True) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    if upload:
+        put_report_asset(name, content)
+
+
+def _load_model() -> Optional[Dict[str, np.ndarray]]:
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        try:
+            stored = _load_asset(MODEL_PATH, MODEL_NAME)
+        except Exception as e:
+            logger.warning("Could not load the prefilter model, using rule scores only: %s", e)
+            stored = None
+        if stored:
+            data = json.loads(stored)
+            _model = {"w": np.array(data["w"], dtype=np.float32), "b": np.float32(data["b"])}
+    return _model
+
+
+def score_documents(
+    docs: List[Dict],
+    subject: Optional[str] = None,
+    require_subject: bool = False,
+) -> List[float]:
+    rules = [rule_score(d, subject, require_subject) for d in docs]
+    model = _load_model()
+    if model is None or not docs:
+        return rules
+    logits = _features(docs, rules) @ model["w"] + model["b"]
+    learned = 1.0 / (1.0 + np.exp(-logits))
+    return [0.5 * r + 0.5 * float(m) for r, m in zip(rules, learned)]
+
+
+def _record_samples(docs: List[Dict], scores: List[float], subject: Optional[str]) -> None:
+    run_date = date.today().isoformat()
+    for doc, score in zip(docs, scores):
+        _samples.append({
+            "run_date": run_date,
+            "subject": subject or "",
+            "url": doc.get("href", ""),
+            "title": doc.get("title", ""),
+            "body": doc.get("body", "")[:SAMPLE_BODY_CHARS],
+            "score": round(score, 4),
+        })
+
+
+def filter_documents(
+    docs: List[Dict],
+    subject: Optional[str] = None,
+    require_subject: bool = False,
+) -> List[Dict]:
+    """Drop documents scoring below ``prefilter_threshold`` and update run stats."""
+    if not settings.prefilter_enabled or not docs:
+        return docs
+
+    scores = score_documents(docs, subject, require_subject)
+    if require_subject:
+        # News searches: the digest's cited URLs label these (see ``train``)
+        _record_samples(docs, scores, subject)
+    kept = [d for d, s in zip(docs, scores) if s >= settings.prefilter_threshold]
+
+    for d in docs:
+        _stats["docs_in"] += 1
+        _stats["chars_in"] += len(d.get("body", ""))
+    for d in kept:
+        _stats["docs_out"] += 1
+        _stats["chars_out"] += len(d.get("body", ""))
+    if len(kept) < len(docs):
+        logger.debug("Prefilter dropped %d/%d docs for %s", len(docs) - len(kept), len(docs), subject)
+    return kept
+
+
+def log_stats() -> None:
+    dropped = _stats["docs_in"] - _stats["docs_out"]
+    chars = _stats["chars_in"] - _stats["chars_out"]
+    logger.info(
+        "  Prefilter: kept %d/%d docs, dropped %d (~%d tokens)",
+        _stats["docs_out"],
+        _stats["docs_in"],
+        dropped,
+        chars // CHARS_PER_TOKEN,
+    )
+
+
+def load_samples(path: Optional[Path] = None) -> List[Dict]:
+    stored = _load_asset(path or SAMPLES_PATH, SAMPLES_NAME)
+    return [json.loads(line) for line in (stored or "").splitlines() if line.strip()]
+
+
+def save_samples(samples: List[Dict], path: Optional[Path] = None, upload: bool = True) -> None:
+    _save_asset(path or SAMPLES_PATH, SAMPLES_NAME, "".join(json.dumps(s) + "\n" for s in samples), upload)
+
+
+def finish_run(today: Optional[date] = None) -> None:
+    """Add this run's samples to the stored window, dropping days older than ``SAMPLE_DAYS``."""
+    if not _samples:
+        return
+    cutoff = ((today or date.today()) - timedelta(days=SAMPLE_DAYS)).isoformat()
+    try:
+        stored = load_samples()
+    except Exception as e:
+        logger.warning("Could not load stored prefilter samples, keeping only this run's: %s", e)
+        stored = []
+    runs = {s["run_date"] for s in _samples}
+    window = [s for s in stored if s["run_date"] > cutoff and s["run_date"] not in runs]
+    save_samples(window + _samples)
+    _samples.clear()
+
+
+def _cited_urls_by_date() -> Dict[str, set]:
+    """URLs cited in each stored run's news digest."""
+    cited = {}
+    for row in iter_runs("run_date, analysis_json"):
+        doc = orjson.loads(row["analysis_json"])
+        urls = {n.get("url") for n in doc.get("news_digest") or [] if n.get("url")}
+        cited.setdefault(row["run_date"], set()).update(urls)
+    return cited
+
+
+def label_samples(samples: List[Dict], cited: Dict[str, set]) -> List[float]:
+    """1.0 when the sample's run cited its URL; samples of unknown runs get None."""
+    return [
+        (1.0 if s["url"] in cited[s["run_date"]] else 0.0) if s["run_date"] in cited else None
+        for s in samples
+    ]
+
+
+def train(epochs: int = 300, lr: float = 0.5, l2: float = 1e-3) -> int:
+    """Fit the logistic-regression model on recorded news-search samples from past runs.
+
+    A sample is positive when its run cited the URL in the news digest.
+    """
+    samples = load_samples()
+    labels = label_samples(samples, _cited_urls_by_date())
+    docs = [s for s, label in zip(samples, labels) if label is not None]
+    y = [label for label in labels if label is not None]
+
+    if len(set(y)) < 2:
+        logger.warning("Not enough labelled samples to train (%d)", len(y))
+        return 0
+
+    X = _features(docs, [rule_score(d, d.get("subject"), require_subject=True) for d in docs])
+    target = np.array(y, dtype=np.float32)
+    w = np.zeros(X.shape[1], dtype=np.float32)
+    b = np.float32(0.0)
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X @ w + b)))
+        grad = p - target
+        w -= lr * (X.T @ grad / len(target) + l2 * w)
+        b -= lr * grad.mean()
+
+    _save_asset(MODEL_PATH, MODEL_NAME, json.dumps({"w": [round(float(v), 6) for v in w], "b": float(b)}))
+    accuracy = float(((X @ w + b > 0) == (target > 0.5)).mean())
+    logger.info("Trained prefilter on %d samples (train accuracy %.2f)", len(target), accuracy)
+    return len(target)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Search-result relevance prefilter.")
+    parser.add_argument("command", choices=["train"])
+    parser.parse_args()
+    train()
+
+
+if __name__ == "__main__":
+    main()
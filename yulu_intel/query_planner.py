@@ -0,0 +1,267 @@
+"""Adaptive search query planner driven by each template's historical yield.
+
+For every query template the pipeline records, per run: calls made, results
+returned, new unique URLs, documents kept after dedup and the prefilter, and
+documents the analysis used. A news document counts when its URL is in the
+news digest; a product document (initial and deep phases, which feed the
+analysis rather than the digest) also counts when it is about a competitor the
+analysis selected. News templates are tracked per competitor, so one
+competitor's quiet day does not skip a template for all of them.
+Counts decay by ``DECAY`` each run, so yield follows recent behaviour.
+
+``plan`` ranks a group's templates by smoothed cited documents per call.
+Templates that keep returning nothing useful are skipped (and re-tried every
+``EXPLORE_EVERY_DAYS``); the calls they free go to optional templates such as
+competitor-specific queries, which compete on the same score.
+``SEARCH_QUERY_BUDGET`` caps Exa calls per run; 0 keeps the static count
+(initial + deep templates, plus the news templates per competitor) and only
+reallocates it. The initial templates are funded before any news calls, so a
+small budget still builds a product corpus.
+
+Stats live in Supabase (``query_yield.json`` in ``report_assets``) with a local
+copy in ``data/`` for offline runs, so ephemeral CI runners keep their history
+and a stale local copy never replaces it.
+
+Usage:
+    python -m yulu_intel.query_planner
+"""
+
+import argparse
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from yulu_intel.config import DATA_DIR, settings
+from yulu_intel.db import get_all_known_competitors, get_report_asset, put_report_asset
+from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.prefilter import mentions
+
+logger = logging.getLogger(__name__)
+
+STATS_NAME = "query_yield.json"
+STATS_PATH = DATA_DIR / STATS_NAME
+FIELDS = ("calls", "results", "new_urls", "kept", "cited")
+
+DECAY = 0.8
+PRIOR_CALLS = 2.0
+CORE_PRIOR = 1.0  # cited docs per call assumed for a static template with no history
+EXTRA_PRIOR = 0.5  # ...and for an optional one, so it only fills freed calls
+SKIP_BELOW = 0.2  # cited docs per call
+MIN_CALLS = 4.0  # decayed calls observed before a template may be skipped
+EXPLORE_EVERY_DAYS = 7
+EXPECTED_COMPETITORS = 5  # the analysis prompt asks for the top 5
+RECENT_COMPETITORS = 5  # known competitors offered competitor-specific queries
+
+
+@dataclass
+class PlannedQuery:
+    group: str  # "initial", "deep" or "news"
+    template: str
+    query: str
+    key: str = ""  # stats key: the template, scoped per competitor for news
+
+    def __post_init__(self):
+        self.key = self.key or self.template
+
+
+def stats_key(template: str, scope: str = "") -> str:
+    return f"{template} [{scope}]" if scope else template
+
+
+class QueryPlanner:
+    """Plans one run's Exa calls and collects their yield."""
+
+    def __init__(self, stats: Optional[Dict[str, Dict]] = None, budget: int = 0, today: Optional[date] = None):
+        self.stats = stats or {}
+        self.budget = budget
+        self.today = today or date.today()
+        self.used = 0
+        self.run: Dict[str, Dict[str, float]] = {}
+        self.kept_docs: List[Tuple[str, str, str]] = []  # (stats key, url, lowercased text)
+        self.groups: Dict[str, str] = {}  # stats key -> query group
+        self.skipped: List[str] = []
+
+    # -- planning ----------------------------------------------------------
+
+    def score(self, template: str, prior: float) -> float:
+        s = self.stats.get(template, {})
+        return (s.get("cited", 0.0) + prior * PRIOR_CALLS) / (s.get("calls", 0.0) + PRIOR_CALLS)
+
+    def _eligible(self, template: str, prior: float) -> bool:
+        s = self.stats.get(template, {})
+        if s.get("calls", 0.0) < MIN_CALLS or self.score(template, prior) >= SKIP_BELOW:
+            return True
+        last = s.get("last_used")
+        return not last or date.fromisoformat(last) <= self.today - timedelta(days=EXPLORE_EVERY_DAYS)
+
+    def plan(
+        self,
+        group: str,
+        core: Iterable[Tuple[str, Dict[str, str]]],
+        extra: Iterable[Tuple[str, Dict[str, str]]] = (),
+        slots: int = 0,
+        scope: str = "",
+    ) -> List[PlannedQuery]:
+        """Pick up to ``slots`` queries from ``(template, format kwargs)`` candidates, best yield first.
+
+        With ``scope`` (a competitor) yield is tracked per template and scope.
+        """
+        candidates = [(t, kw, CORE_PRIOR) for t, kw in core] + [(t, kw, EXTRA_PRIOR) for t, kw in extra]
+        # Stable sort: without history, core templates keep their listed order
+        candidates.sort(key=lambda c: -self.score(stats_key(c[0], scope), c[2]))
+        planned = []
+        for template, kwargs, prior in candidates:
+            if len(planned) >= slots:
+                break
+            key = stats_key(template, scope)
+            if not self._eligible(key, prior):
+                if key not in self.skipped:
+                    self.skipped.append(key)
+                continue
+            self.groups[key] = group
+            planned.append(PlannedQuery(group, template, template.format(**kwargs), key))
+        self.used += len(planned)
+        return planned
+
+    def product_calls(self, static: int, news_per_competitor: int, reserved: int = 0) -> int:
+        """Calls for the product phases (initial + deep); the rest of the budget is kept for news.
+
+        ``reserved`` calls (the core initial templates) come first, however small the budget.
+        """
+        if not self.budget:
+            return static
+        return max(min(reserved, self.budget), self.budget - news_per_competitor * EXPECTED_COMPETITORS)
+
+    def news_calls(self, static: int) -> int:
+        return max(0, self.budget - self.used) if self.budget else static
+
+    # -- yield -------------------------------------------------------------
+
+    def _count(self, template: str, field: str, n: float = 1) -> None:
+        counts = self.run.setdefault(template, dict.fromkeys(FIELDS, 0.0))
+        counts[field] += n
+
+    def record_results(self, query: PlannedQuery, results: List[Dict]) -> None:
+        self._count(query.key, "calls")
+        self._count(query.key, "results", len(results))
+
+    def record_new(self, doc: Dict) -> None:
+        """A result whose URL had not been seen earlier in the run."""
+        if doc.get("template"):
+            self._count(doc["template"], "new_urls")
+
+    def record_kept(self, docs: List[Dict]) -> None:
+        """Documents that survived dedup and the prefilter (tagged with their stats key as ``template``)."""
+        for doc in docs:
+            template = doc.get("template")
+            if template:
+                self._count(template, "kept")
+                text = f"{doc.get('title', '')}\n{doc.get('body', '')[:2000]}".lower()
+                self.kept_docs.append((template, doc.get("href", ""), text))
+
+    def record_citations(self, analysis: CompetitiveAnalysis) -> None:
+        """Count kept documents the analysis used (see the module docstring)."""
+        urls = {item.url for item in analysis.news_digest or [] if item.url}
+        names = [c.name for c in analysis.competitors]
+        for key, url, text in self.kept_docs:
+            used = url in urls
+            if not used and self.groups.get(key) != "news":
+                used = any(mentions(text, n) for n in names)
+            if used:
+                self._count(key, "cited")
+
+    def merged_stats(self) -> Dict[str, Dict]:
+        """Stored stats decayed by one run, plus this run's counts."""
+        merged = {}
+        for template in set(self.stats) | set(self.run):
+            old = self.stats.get(template, {})
+            new = self.run.get(template, {})
+            entry = {f: round(old.get(f, 0.0) * DECAY + new.get(f, 0.0), 3) for f in FIELDS}
+            entry["last_used"] = self.today.isoformat() if new.get("calls") else old.get("last_used")
+            merged[template] = entry
+        return merged
+
+    def log_summary(self) -> None:
+        total = {f: sum(c[f] for c in self.run.values()) for f in FIELDS}
+        logger.info(
+            "  Query planner: %d Exa call(s), %d new URLs, %d kept, %d cited",
+            total["calls"], total["new_urls"], total["kept"], total["cited"],
+        )
+        if self.skipped:
+            logger.info("  Skipped low-yield templates: %s", "; ".join(t[:50] for t in self.skipped))
+
+
+planner = QueryPlanner()
+
+
+def load_stats(path: Path = STATS_PATH) -> Dict[str, Dict]:
+    """Stats in Supabase (every runner adds to them), else the local copy."""
+    try:
+        stored = get_report_asset(STATS_NAME)
+    except Exception as e:
+        logger.warning("Could not load stored query yield stats, using the local copy: %s", e)
+        stored = None
+    if stored:
+        return json.loads(stored)
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_stats(stats: Dict[str, Dict], path: Path = STATS_PATH, upload: bool = True) -> None:
+    content = json.dumps(stats, indent=1, sort_keys=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    if upload:
+        put_report_asset(STATS_NAME, content)
+
+
+def start_run() -> QueryPlanner:
+    """Planner for a run, with stored yield stats and the configured budget."""
+    global planner
+    try:
+        stats = load_stats()
+    except Exception as e:
+        logger.warning("Could not load query yield stats, planning from scratch: %s", e)
+        stats = {}
+    planner = QueryPlanner(stats, settings.search_query_budget)
+    return planner
+
+
+def finish_run(analysis: CompetitiveAnalysis) -> None:
+    planner.record_citations(analysis)
+    planner.log_summary()
+    save_stats(planner.merged_stats())
+
+
+def recent_competitors(limit: int = RECENT_COMPETITORS) -> List[str]:
+    """Most recently seen competitors, for competitor-specific queries."""
+    try:
+        rows = get_all_known_competitors()
+    except Exception as e:
+        logger.warning("Could not load known competitors: %s", e)
+        return []
+    rows.sort(key=lambda r: (r.get("last_seen_date") or "", r.get("times_seen") or 0), reverse=True)
+    return [r["name"] for r in rows[:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show per-template search yield.")
+    parser.add_argument("--stats", type=Path, help="stats file to show (default: the stored stats)")
+    args = parser.parse_args()
+
+    stats = json.loads(args.stats.read_text(encoding="utf-8")) if args.stats else load_stats()
+    p = QueryPlanner(stats)
+    print(f"{'Calls':>6}{'New URLs':>9}{'Kept':>7}{'Cited':>7}{'Score':>7}  Last used   Template")
+    for template, s in sorted(stats.items(), key=lambda kv: -p.score(kv[0], CORE_PRIOR)):
+        print(
+            f"{s['calls']:>6.1f}{s['new_urls']:>9.1f}{s['kept']:>7.1f}{s['cited']:>7.1f}"
+            f"{p.score(template, CORE_PRIOR):>7.2f}  {s.get('last_used') or '-':<10}  {template}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Record/replay of every outbound call (Exa, OpenAI, Supabase, Slack).
+
+Functions at the service boundaries are wrapped with ``@recorded(name)``. With
+``REPLAY_MODE=record`` each call runs normally and its result and wall time
+are appended to ``<REPLAY_DIR>/<name>.jsonl``. With ``REPLAY_MODE=replay`` the
+recorded result is returned instead, after an injected delay (the recorded
+duration, or a fixed ``REPLAY_LATENCY_MS``), so a full ``run.py`` runs offline
+with deterministic timings. Nothing is sent to Slack or written to Supabase
+in replay mode.
+
+Calls are matched by a hash of their arguments; when arguments drift between
+recording and replay (dates in queries, today's run date) the n-th call of
+that boundary gets the n-th recording instead. Arguments themselves are not
+stored, so webhook URLs and tokens never land in fixtures.
+
+Generator functions stay lazy in every mode: items are passed through as the
+caller consumes them, and recording spools them to a temporary file rather
+than a list, so streaming readers (``iter_analysis_runs``) keep flat memory.
+
+While a run trace is active (see ``tracing.py``) each wrapped call is also
+timed as a ``call`` span with the JSON size of its arguments and result.
+
+Usage:
+    REPLAY_MODE=record python run.py
+    REPLAY_MODE=replay REPLAY_LATENCY_MS=0 OPENAI_API_KEY=x python run.py
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from functools import wraps
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from yulu_intel import tracing
+from yulu_intel.config import DATA_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_DIR = DATA_DIR / "replay"
+
+
+class ReplayMiss(RuntimeError):
+    """Replay mode hit a call that was never recorded."""
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Path):
+        return str(value)
+    return repr(value)
+
+
+def _size(value: Any) -> int:
+    """Approximate wire size of a call's arguments or result."""
+    return len(json.dumps(value, default=_jsonable).encode("utf-8"))
+
+
+def _call_key(name: str, args: tuple, kwargs: dict) -> str:
+    raw = json.dumps([name, args, kwargs], default=_jsonable, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+class _Tape:
+    """Recordings for one boundary, loaded lazily and shared across threads."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: List[Dict] = []
+        self.by_key: Dict[str, List[Dict]] = {}
+        self.key_calls: Dict[str, int] = {}
+        self.calls = 0
+        self.truncated = False
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.append(entry)
+                        self.by_key.setdefault(entry["key"], []).append(entry)
+
+    def _open(self) -> IO[str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A new recording session replaces the previous tape
+        mode = "a" if self.truncated else "w"
+        self.truncated = True
+        return self.path.open(mode, encoding="utf-8")
+
+    def append(self, entry: Dict) -> None:
+        with self.lock, self._open() as f:
+            f.write(json.dumps(entry, default=_jsonable) + "\n")
+
+    def append_stream(self, key: str, duration: float, items: IO[str]) -> None:
+        """Append an entry whose result is the comma-separated JSON items spooled in ``items``."""
+        items.seek(0)
+        with self.lock, self._open() as f:
+            f.write(json.dumps({"key": key, "duration": round(duration, 4)})[:-1] + ', "result": [')
+            shutil.copyfileobj(items, f)
+            f.write("]}\n")
+
+    def next(self, key: str) -> Dict:
+        with self.lock:
+            position = self.calls
+            self.calls += 1
+            matches = self.by_key.get(key)
+            if matches:
+                i = self.key_calls.get(key, 0)
+                self.key_calls[key] = i + 1
+                return matches[min(i, len(matches) - 1)]
+            if not self.entries:
+                raise ReplayMiss(f"No recordings in {self.path}")
+            return self.entries[min(position, len(self.entries) - 1)]
+
+
+_tapes: Dict[str, _Tape] = {}
+_tapes_lock = threading.Lock()
+
+
+def replay_dir() -> Path:
+    return Path(settings.replay_dir) if settings.replay_dir else DEFAULT_REPLAY_DIR
+
+
+def _tape(name: str) -> _Tape:
+    with _tapes_lock:
+        if name not in _tapes:
+            _tapes[name] = _Tape(replay_dir() / f"{name}.jsonl")
+        return _tapes[name]
+
+
+def reset() -> None:
+    """Forget loaded tapes (e.g. after changing ``replay_dir``)."""
+    with _tapes_lock:
+        _tapes.clear()
+
+
+def _delay(entry: Dict) -> None:
+    latency_ms = settings.replay_latency_ms
+    seconds = entry.get("duration", 0.0) if latency_ms < 0 else latency_ms / 1000
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def recorded(
+    name: str,
+    encode: Optional[Callable[[Any], Any]] = None,
+    decode: Optional[Callable[[Any], Any]] = None,
+) -> Callable:
+    """Wrap a service call for record/replay.
+
+    ``encode`` turns the return value into JSON-able data and ``decode`` turns
+    it back; by default values pass through ``json`` (models are dumped).
+    Generator functions are recorded as a list and replayed as an iterator;
+    for them ``encode`` and ``decode`` apply to each item.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        is_generator = inspect.isgeneratorfunction(fn)
+        enc = encode or (lambda v: json.loads(json.dumps(v, default=_jsonable)))
+        dec = decode or (lambda v: v)
+
+        def call(args: tuple, kwargs: dict) -> Any:
+            mode = settings.replay_mode
+            if mode == "replay":
+                entry = _tape(name).next(_call_key(name, args, kwargs))
+                _delay(entry)
+                return dec(entry["result"])
+
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            if mode == "record":
+                _tape(name).append({
+                    "key": _call_key(name, args, kwargs),
+                    "duration": round(time.perf_counter() - started, 4),
+                    "result": enc(result),
+                })
+            return result
+
+        def traced(args: tuple, kwargs: dict) -> Any:
+            with tracing.span(name, kind="call") as sp:
+                sp.attrs["bytes_out"] = _size([args, kwargs])
+                result = call(args, kwargs)
+                if settings.replay_mode == "replay":
+                    sp.outcome = "replayed"
+                sp.attrs["bytes_in"] = _size(result)
+                return result
+
+        def call_stream(args: tuple, kwargs: dict) -> Iterator[Any]:
+            mode = settings.replay_mode
+            if mode == "replay":
+                entry = _tape(name).next(_call_key(name, args, kwargs))
+                _delay(entry)
+                for item in entry["result"]:
+                    yield dec(item)
+                return
+            if mode != "record":
+                yield from fn(*args, **kwargs)
+                return
+
+            started = time.perf_counter()
+            finished = False
+            with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+                try:
+                    for n, item in enumerate(fn(*args, **kwargs)):
+                        spool.write(("," if n else "") + json.dumps(enc(item), default=_jsonable))
+                        yield item
+                    finished = True
+                except GeneratorExit:
+                    # The caller stopped early; a replay will stop at the same point
+                    finished = True
+                    raise
+                finally:
+                    if finished:
+                        duration = time.perf_counter() - started
+                        _tape(name).append_stream(_call_key(name, args, kwargs), duration, spool)
+
+        def traced_stream(args: tuple, kwargs: dict) -> Iterator[Any]:
+            with tracing.span(name, kind="call") as sp:
+                sp.attrs["bytes_out"] = _size([args, kwargs])
+                sp.attrs["bytes_in"] = 0
+                if settings.replay_mode == "replay":
+                    sp.outcome = "replayed"
+                for item in call_stream(args, kwargs):
+                    sp.attrs["bytes_in"] += _size(item)
+                    yield item
+
+        if is_generator:
+            @wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                if tracing.active():
+                    yield from traced_stream(args, kwargs)
+                elif settings.replay_mode:
+                    yield from call_stream(args, kwargs)
+                else:
+                    yield from fn(*args, **kwargs)
+            return gen_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if tracing.active():
+                return traced(args, kwargs)
+            if not settings.replay_mode:
+                return fn(*args, **kwargs)
+            return call(args, kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,142 @@
+"""Shared CSS/JS for HTML reports, inlined or emitted once as hashed files.
+
+``AssetBundle`` holds minified, content-hashed copies of ``static/report.css``,
+``static/report.js`` and (when vendored) Chart.js. Linked reports reference
+them by URL, so each day's HTML only carries its own content. Hashed names
+mean a changed stylesheet never collides with a cached one.
+
+Usage:
+    python -m yulu_intel.report_assets vendor   # download Chart.js once
+    python -m yulu_intel.report_assets build reports/assets
+"""
+
+import argparse
+import hashlib
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+CHARTJS_VERSION = "4.4.1"
+CHARTJS_CDN_URL = f"https://cdn.jsdelivr.net/npm/chart.js@{CHARTJS_VERSION}/dist/chart.umd.js"
+CHARTJS_VENDOR_PATH = STATIC_DIR / "vendor" / "chart.umd.js"
+
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap"
+
+
+def minify_css(text: str) -> str:
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};:,>])\s*", r"\1", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text: str) -> str:
+    """Conservative minifier: drops comment-only lines, indentation and blank lines."""
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("//"):
+            lines.append(stripped)
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def report_css() -> str:
+    return minify_css((STATIC_DIR / "report.css").read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=None)
+def report_js() -> str:
+    return minify_js((STATIC_DIR / "report.js").read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=None)
+def chartjs_source() -> Optional[str]:
+    """Vendored Chart.js, or None when ``vendor`` has not been run."""
+    if not CHARTJS_VENDOR_PATH.exists():
+        return None
+    return CHARTJS_VENDOR_PATH.read_text(encoding="utf-8")
+
+
+def _hashed(stem: str, ext: str, content: str) -> str:
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    return f"{stem}.{digest}.{ext}"
+
+
+@dataclass
+class AssetBundle:
+    base_url: str = "/assets/"
+    files: Dict[str, str] = field(default_factory=dict)
+    css_name: str = ""
+    js_name: str = ""
+    chart_name: Optional[str] = None
+
+    @property
+    def css_href(self) -> str:
+        return self.base_url + self.css_name
+
+    @property
+    def js_src(self) -> str:
+        return self.base_url + self.js_name
+
+    @property
+    def chart_src(self) -> str:
+        return self.base_url + self.chart_name if self.chart_name else CHARTJS_CDN_URL
+
+    def write(self, out_dir: Path) -> int:
+        """Write files that are not already present (names are content-addressed)."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for name, content in self.files.items():
+            path = out_dir / name
+            if not path.exists():
+                path.write_text(content, encoding="utf-8")
+                written += 1
+        return written
+
+
+def build_bundle(base_url: str = "/assets/") -> AssetBundle:
+    bundle = AssetBundle(base_url=base_url)
+    css, js, chart = report_css(), report_js(), chartjs_source()
+    bundle.css_name = _hashed("report", "css", css)
+    bundle.js_name = _hashed("report", "js", js)
+    bundle.files = {bundle.css_name: css, bundle.js_name: js}
+    if chart is not None:
+        bundle.chart_name = _hashed("chart", "js", chart)
+        bundle.files[bundle.chart_name] = chart
+    return bundle
+
+
+def vendor_chartjs() -> Path:
+    """Download the pinned Chart.js build into ``static/vendor``."""
+    import requests
+
+    resp = requests.get(CHARTJS_CDN_URL, timeout=30)
+    resp.raise_for_status()
+    CHARTJS_VENDOR_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CHARTJS_VENDOR_PATH.write_text(resp.text, encoding="utf-8")
+    chartjs_source.cache_clear()
+    return CHARTJS_VENDOR_PATH
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage shared report assets.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("vendor", help=f"download Chart.js {CHARTJS_VERSION} into static/vendor")
+    build = sub.add_parser("build", help="write hashed assets to a directory")
+    build.add_argument("out_dir", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "vendor":
+        print(f"Vendored Chart.js to {vendor_chartjs()}")
+    else:
+        bundle = build_bundle()
+        print(f"Wrote {bundle.write(args.out_dir)} new file(s): {', '.join(bundle.files)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from functools import partial
-from typing import Dict, List, Set, Tuple
-
-from exa_py import Exa
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Set, Tuple
 
+from yulu_intel import query_planner, tracing
 from yulu_intel.config import settings
+from yulu_intel.documents import PromptBuilder, SearchDocument
+from yulu_intel.prefilter import filter_documents, score_documents
+from yulu_intel.query_planner import PlannedQuery
+from yulu_intel.replay import recorded
+
+if TYPE_CHECKING:
+    from exa_py import Exa
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +34,11 @@ EXCLUDED_DOMAINS = [
 ]
 
 
-def _get_exa() -> Exa:
+def _get_exa() -> "Exa":
     global _exa
     if _exa is None:
+        from exa_py import Exa
+
         _exa = Exa(settings.EXA_API_KEY)
     return _exa
 
@@ -53,20 +61,37 @@ DEEP_QUERIES = [
     "{product} industry trends predictions 2025 India EV last mile",
 ]
 
+# Optional competitor-specific templates; they compete for calls freed by low-yield ones
+COMPETITOR_QUERIES = [
+    "{competitor} pricing plans daily rental gig workers India",
+    "{competitor} vs {product} riders reviews availability",
+]
+
+
+FULL_TEXT_CHARS = 5000
+HYDRATE_BATCH = 10  # documents per batched contents call
+MAX_NEWS_DATA_CHARS = 60_000  # per competitor news prompt
+
+
+def _tiered() -> bool:
+    return settings.search_fetch_mode == "tiered"
 
+
+@recorded("exa_search")
 def _run_search(
     query: str,
     max_results: int,
     category: str = None,
     start_published_date: str = None,
-) -> List[Dict]:
+) -> List[SearchDocument]:
     try:
         exa = _get_exa()
         kwargs = {
             "query": query,
             "type": "auto",
             "num_results": max_results,
-            "contents": {"text": {"max_characters": 5000}},
+            # Tiered mode asks for highlights only; full text comes later for the top-ranked survivors
+            "contents": {"highlights": True} if _tiered() else {"text": {"max_characters": FULL_TEXT_CHARS}},
         }
         if category:
             kwargs["category"] = category
@@ -79,90 +104,209 @@ def _run_search(
             results.append({
                 "title": r.title or "",
                 "href": r.url or "",
-                "body": r.text or "",
+                "body": " … ".join(r.highlights or []) if _tiered() else r.text or "",
                 "published_date": r.published_date or "",
             })
         return results
     except Exception as e:
         logger.warning("Search failed for '%s': %s", query[:60], e)
+        tracing.annotate(outcome="error", error=str(e)[:300])
         return []
 
 
-def _format_results(results: List[Dict]) -> str:
-    text_parts: List[str] = []
-    for item in results:
-        title = item.get("title", "")
-        body = item.get("body", "")
-        href = item.get("href", "")
-        published = item.get("published_date", "")
-        header = f"Title: {title}\nURL: {href}"
-        if published:
-            header += f"\nPublished: {published}"
-        header += f"\nContent: {body}\n"
-        text_parts.append(header)
-    return "\n---\n".join(text_parts) if text_parts else ""
+@recorded("exa_contents")
+def _fetch_contents(urls: List[str]) -> Dict[str, str]:
+    """Full text for ``urls`` in one batched call; ``{}`` on failure."""
+    try:
+        response = _get_exa().get_contents(urls, text={"max_characters": FULL_TEXT_CHARS})
+        texts = {}
+        for r in response.results:
+            if r.text:
+                # Results are keyed by the requested URL (id); url may be the canonical form
+                texts[r.id or r.url] = texts[r.url] = r.text
+        return texts
+    except Exception as e:
+        logger.warning("Contents fetch failed for %d URL(s): %s", len(urls), e)
+        tracing.annotate(outcome="error", error=str(e)[:300])
+        return {}
+
+
+async def _hydrate(docs: List[SearchDocument]) -> List[SearchDocument]:
+    """Second tier: swap highlights for full text on top-ranked documents (see ``_full_text``).
+
+    Documents whose text could not be fetched keep their highlights.
+    """
+    if not _tiered() or not docs:
+        return docs
+    urls = list(dict.fromkeys(d["href"] for d in docs if d.get("href")))
+    try:
+        texts = await asyncio.wait_for(asyncio.to_thread(_fetch_contents, urls), timeout=60)
+    except asyncio.TimeoutError:
+        logger.warning("Timeout fetching contents for %d URL(s)", len(urls))
+        texts = {}
+    for doc in docs:
+        text = texts.get(doc.get("href", ""))
+        if text:
+            doc["body"] = text
+    logger.debug("Fetched full text for %d/%d ranked results", sum(1 for u in urls if u in texts), len(urls))
+    return docs
 
 
 def _thirty_days_ago() -> str:
-    return (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%dT00:00:00.000Z")
+    return (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%dT00:00:00.000Z")
 
 
-async def _run_queries(
-    product_name: str,
-    templates: List[str],
+async def _search(query: PlannedQuery, category: str = None, start_published_date: str = None) -> List[SearchDocument]:
+    try:
+        result = await asyncio.wait_for(
+            asyncio.to_thread(
+                _run_search,
+                query.query,
+                settings.max_search_results,
+                category,
+                start_published_date,
+            ),
+            timeout=30,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Timeout for query: %s", query.query[:60])
+        result = []
+    # Tag results so the planner can credit the template with what survives and gets cited
+    for item in result:
+        item["template"] = query.key
+    return result
+
+
+# -- streaming stages: each pulls from the previous one, so a full prompt stops the searches --
+
+
+async def _searched(
+    queries: List[PlannedQuery], category: str = None, start_published_date: str = None
+) -> AsyncIterator[SearchDocument]:
+    for query in queries:
+        result = await _search(query, category, start_published_date)
+        query_planner.planner.record_results(query, result)
+        for doc in result:
+            yield doc
+
+
+async def _unique(docs: AsyncIterator[SearchDocument], seen_urls: Set[str]) -> AsyncIterator[SearchDocument]:
+    async for doc in docs:
+        url = doc.get("href", "")
+        if url not in seen_urls:
+            seen_urls.add(url)
+            query_planner.planner.record_new(doc)
+            yield doc
+
+
+async def _relevant(
+    docs: AsyncIterator[SearchDocument], subject: str, require_subject: bool = False
+) -> AsyncIterator[SearchDocument]:
+    async for doc in docs:
+        if filter_documents([doc], subject=subject, require_subject=require_subject):
+            yield doc
+
+
+async def _full_text(
+    docs: AsyncIterator[SearchDocument],
+    builder: PromptBuilder,
+    subject: str,
+    require_subject: bool = False,
+) -> AsyncIterator[SearchDocument]:
+    """Tiered mode: rank the survivors' highlights, then fetch full text best first.
+
+    Survivors are ordered by prefilter score (rule score, plus the model when
+    one is trained; also when the prefilter itself is disabled). Full text is
+    fetched in batches sized to what the builder can still take, so once it is
+    full no lower-ranked document is fetched. In full mode documents already
+    carry their text and stream through unchanged.
+    """
+    if not _tiered():
+        async for doc in docs:
+            yield doc
+        return
+    survivors = [doc async for doc in docs]
+    scores = score_documents(survivors, subject, require_subject)
+    # Stable: equal scores keep arrival order
+    ranked = [survivors[i] for i in sorted(range(len(survivors)), key=lambda i: -scores[i])]
+    start = 0
+    while start < len(ranked):
+        size = min(HYDRATE_BATCH, builder.remaining // FULL_TEXT_CHARS + 1)
+        for d in await _hydrate(ranked[start:start + size]):
+            yield d
+        start += size
+
+
+async def _fill(
+    builder: PromptBuilder,
+    subject: str,
+    queries: List[PlannedQuery],
     seen_urls: Set[str],
     category: str = None,
     start_published_date: str = None,
-) -> Tuple[str, Set[str]]:
-    loop = asyncio.get_event_loop()
-    all_results: List[Dict] = []
-
-    for template in templates:
-        query = template.format(product=product_name)
-        try:
-            result = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    partial(
-                        _run_search,
-                        query,
-                        settings.max_search_results,
-                        category,
-                        start_published_date,
-                    ),
-                ),
-                timeout=30,
-            )
-        except asyncio.TimeoutError:
-            logger.warning("Timeout for query: %s", query[:60])
-            result = []
-
-        for item in result:
-            url = item.get("href", "")
-            if url not in seen_urls:
-                seen_urls.add(url)
-                all_results.append(item)
-
-    return _format_results(all_results), seen_urls
-
-
-async def search_product_initial(product_name: str) -> Tuple[str, Set[str]]:
+    require_subject: bool = False,
+) -> int:
+    """Stream ``queries`` through dedup, the prefilter and full-text fetching into ``builder``.
+
+    Returns the number of documents added. Once the builder is full the
+    pipeline is closed: in full mode remaining queries are not sent, in
+    tiered mode (where every planned query runs so the hits can be ranked)
+    no more full text is fetched.
+    """
+    stream = _full_text(
+        _relevant(_unique(_searched(queries, category, start_published_date), seen_urls), subject, require_subject),
+        builder,
+        subject,
+        require_subject,
+    )
+    added = 0
+    async with aclosing(stream):
+        async for doc in stream:
+            query_planner.planner.record_kept([doc])
+            if builder.add(doc):
+                added += 1
+            if builder.full:
+                break
+    return added
+
+
+def _product_calls() -> int:
+    static = len(INITIAL_QUERIES) + len(DEEP_QUERIES)
+    return query_planner.planner.product_calls(static, len(NEWS_QUERIES), reserved=len(INITIAL_QUERIES))
+
+
+async def search_product_initial(product_name: str, builder: PromptBuilder) -> Set[str]:
+    """Initial queries into ``builder``; returns the URLs seen, for the deep phase."""
     seen_urls: Set[str] = set()
     cutoff = _thirty_days_ago()
-    text, seen_urls = await _run_queries(
-        product_name, INITIAL_QUERIES, seen_urls, start_published_date=cutoff
+    queries = query_planner.planner.plan(
+        "initial",
+        [(t, {"product": product_name}) for t in INITIAL_QUERIES],
+        slots=min(len(INITIAL_QUERIES), _product_calls()),
     )
-    return text, seen_urls
+    await _fill(builder, product_name, queries, seen_urls, start_published_date=cutoff)
+    return seen_urls
 
 
 async def search_product_deep(
-    product_name: str, seen_urls: Set[str]
-) -> str:
+    product_name: str,
+    seen_urls: Set[str],
+    builder: PromptBuilder,
+    competitors: Optional[List[str]] = None,
+) -> None:
+    """Deep templates, plus competitor-specific queries for ``competitors`` when calls are freed."""
+    if builder.full:
+        logger.info("  Prompt budget already spent; deep search skipped")
+        return
     cutoff = _thirty_days_ago()
-    text, _ = await _run_queries(
-        product_name, DEEP_QUERIES, seen_urls, start_published_date=cutoff
+    planner = query_planner.planner
+    queries = planner.plan(
+        "deep",
+        [(t, {"product": product_name}) for t in DEEP_QUERIES],
+        [(t, {"product": product_name, "competitor": c}) for c in competitors or [] for t in COMPETITOR_QUERIES],
+        slots=_product_calls() - planner.used,
     )
-    return text
+    await _fill(builder, product_name, queries, seen_urls, start_published_date=cutoff)
 
 
 NEWS_QUERIES = [
@@ -170,51 +314,43 @@ NEWS_QUERIES = [
     "{competitor} funding launch partnership expansion India",
 ]
 
+# Optional news templates; the planner uses them when core ones stop yielding
+NEWS_EXTRA_QUERIES = [
+    "{competitor} pricing change riders delivery partners India",
+    "{competitor} layoffs shutdown controversy India",
+]
+
 
-async def search_competitor_news(competitor_names: List[str]) -> Dict[str, str]:
-    """Run news-specific queries for each competitor using Exa news category with date filter."""
-    loop = asyncio.get_event_loop()
-    results_by_competitor: Dict[str, str] = {}
+async def stream_competitor_news(
+    competitor_names: List[str], max_chars: int = MAX_NEWS_DATA_CHARS
+) -> AsyncIterator[Tuple[str, str]]:
+    """Yield ``(competitor, search text)`` as each competitor's news queries finish.
+
+    Uses the Exa news category with a 30-day date filter; competitors with
+    nothing relevant are not yielded. Callers can start extracting one
+    competitor's news while the next one is still being searched.
+    """
+    if not competitor_names:
+        return
 
     # Only fetch news from the last 30 days
     cutoff = _thirty_days_ago()
 
-    for name in competitor_names:
-        all_items: List[Dict] = []
-
-        for template in NEWS_QUERIES:
-            query = template.format(competitor=name)
-            try:
-                result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None,
-                        partial(
-                            _run_search,
-                            query,
-                            settings.max_search_results,
-                            "news",
-                            cutoff,
-                        ),
-                    ),
-                    timeout=30,
-                )
-            except asyncio.TimeoutError:
-                logger.warning("Timeout for news query: %s", query[:60])
-                result = []
-
-            all_items.extend(result)
-
-        # Deduplicate by URL
-        seen = set()
-        unique = []
-        for item in all_items:
-            url = item.get("href", "")
-            if url not in seen:
-                seen.add(url)
-                unique.append(item)
-
-        text = _format_results(unique)
-        if text:
-            results_by_competitor[name] = text
-
-    return results_by_competitor
+    # Spread the news calls evenly; earlier (listed first) competitors get any remainder
+    planner = query_planner.planner
+    total = planner.news_calls(len(NEWS_QUERIES) * len(competitor_names))
+    per_competitor, remainder = divmod(total, len(competitor_names))
+
+    for i, name in enumerate(competitor_names):
+        queries = planner.plan(
+            "news",
+            [(t, {"competitor": name}) for t in NEWS_QUERIES],
+            [(t, {"competitor": name}) for t in NEWS_EXTRA_QUERIES],
+            slots=per_competitor + (1 if i < remainder else 0),
+            scope=name,
+        )
+        builder = PromptBuilder(max_chars)
+        # URLs are deduplicated per competitor
+        await _fill(builder, name, queries, set(), "news", cutoff, require_subject=True)
+        if builder.parts:
+            yield name, builder.text()
@@ -0,0 +1,254 @@
+"""Local full-text index over past runs (SQLite FTS5).
+
+Indexes news digest items, competitor profiles and key insights per run date
+so questions like "when did we first see Bounce partner with Zepto?" are a
+single ranked query.
+
+The index file (``data/intel_index.sqlite``) is local and is not stored
+anywhere, so it is rebuilt from Supabase plus the archive: every query first
+indexes the stored runs it has not seen yet (``--no-sync`` skips that).
+Incremental indexing in ``run.py`` therefore only applies to local runs with an
+existing index; CI runners start without one and skip it.
+
+Usage:
+    python -m yulu_intel.search_index --sync
+    python -m yulu_intel.search_index "bounce zepto" --competitor Bounce --first
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from yulu_intel.archive import iter_runs
+from yulu_intel.config import DATA_DIR
+from yulu_intel.models import CompetitiveAnalysis
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = DATA_DIR / "intel_index.sqlite"
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    kind UNINDEXED,
+    run_date UNINDEXED,
+    competitor_key UNINDEXED,
+    url UNINDEXED,
+    competitor,
+    title,
+    body,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS indexed_runs (
+    run_date TEXT PRIMARY KEY,
+    indexed_at TEXT NOT NULL
+);
+"""
+
+# bm25 column weights, in schema order: matches in titles rank above bodies.
+_BM25_WEIGHTS = "0, 0, 0, 0, 2.0, 4.0, 1.0"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def connect(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _key(name: str) -> str:
+    return name.strip().lower()
+
+
+def _competitor_body(comp) -> str:
+    parts = [
+        comp.description,
+        comp.market_position,
+        comp.pricing_model,
+        comp.key_differentiator,
+        *comp.strengths,
+        *comp.weaknesses,
+    ]
+    if comp.insights:
+        parts += comp.insights.top_features + comp.insights.growth_signals
+        parts += comp.insights.winning_segments + comp.insights.marketing_angles
+    for dev in comp.recent_developments or []:
+        parts += [dev.headline, dev.summary]
+    return "\n".join(p for p in parts if p)
+
+
+def _documents(analysis: CompetitiveAnalysis) -> List[tuple]:
+    docs = []
+    for item in analysis.news_digest or []:
+        docs.append((
+            "news", _key(item.competitor_name), item.url or "",
+            item.competitor_name, item.headline, item.summary,
+        ))
+    for comp in analysis.competitors:
+        docs.append((
+            "competitor", _key(comp.name), "",
+            comp.name, comp.name, _competitor_body(comp),
+        ))
+    for insight in analysis.key_insights:
+        docs.append(("insight", "", "", "", "Key insight", insight))
+    return docs
+
+
+def index_run(
+    run_date: str,
+    analysis: CompetitiveAnalysis,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """(Re)index one run. Re-running the same date replaces its documents."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        docs = _documents(analysis)
+        with conn:
+            conn.execute("DELETE FROM docs WHERE run_date = ?", (run_date,))
+            conn.executemany(
+                "INSERT INTO docs (kind, run_date, competitor_key, url, competitor, title, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(kind, run_date, key, url, comp, title, body) for kind, key, url, comp, title, body in docs],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed_runs (run_date, indexed_at) VALUES (?, ?)",
+                (run_date, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")),
+            )
+        return len(docs)
+    finally:
+        if own:
+            conn.close()
+
+
+def update_local_index(run_date: str, analysis: CompetitiveAnalysis, path: Path = INDEX_PATH) -> Optional[int]:
+    """Index a finished run into an existing local index; None when there is none to update."""
+    if not path.exists():
+        return None
+    conn = connect(path)
+    try:
+        return index_run(run_date, analysis, conn)
+    finally:
+        conn.close()
+
+
+def sync_index(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Index every stored run (hot table + archive) missing from the local index."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        done = {r["run_date"] for r in conn.execute("SELECT run_date FROM indexed_runs")}
+        count = 0
+        for row in iter_runs("run_date, analysis_json"):
+            if row["run_date"] in done:
+                continue
+            analysis = CompetitiveAnalysis.model_validate_json(row["analysis_json"])
+            index_run(row["run_date"], analysis, conn)
+            done.add(row["run_date"])
+            count += 1
+        return count
+    finally:
+        if own:
+            conn.close()
+
+
+def _match_expr(query: str) -> str:
+    """Turn free text into an FTS5 expression that requires every term."""
+    return " ".join(f'"{t}"' for t in _TOKEN_RE.findall(query))
+
+
+def search(
+    query: str,
+    competitor: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    kind: Optional[str] = None,
+    oldest_first: bool = False,
+    limit: int = 20,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict]:
+    """Ranked full-text search. ``oldest_first`` answers "when did we first see ...?"."""
+    expr = _match_expr(query)
+    if not expr:
+        return []
+
+    sql = [
+        f"SELECT kind, run_date, competitor, title, url, "
+        f"snippet(docs, 6, '[', ']', '…', 16) AS snippet, "
+        f"bm25(docs, {_BM25_WEIGHTS}) AS score "
+        f"FROM docs WHERE docs MATCH ?"
+    ]
+    params: List = [expr]
+    if competitor:
+        sql.append("AND competitor_key = ?")
+        params.append(_key(competitor))
+    if start_date:
+        sql.append("AND run_date >= ?")
+        params.append(start_date)
+    if end_date:
+        sql.append("AND run_date <= ?")
+        params.append(end_date)
+    if kind:
+        sql.append("AND kind = ?")
+        params.append(kind)
+    sql.append("ORDER BY run_date, score" if oldest_first else "ORDER BY score, run_date DESC")
+    sql.append("LIMIT ?")
+    params.append(limit)
+
+    own = conn is None
+    conn = conn or connect()
+    try:
+        return [dict(r) for r in conn.execute(" ".join(sql), params)]
+    finally:
+        if own:
+            conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full-text search over past competitive intel runs.")
+    parser.add_argument("query", nargs="?", help="words to search for")
+    parser.add_argument("--competitor", help="only documents about this competitor")
+    parser.add_argument("--since", help="start date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="end date (YYYY-MM-DD)")
+    parser.add_argument("--kind", choices=["news", "competitor", "insight"])
+    parser.add_argument("--first", action="store_true", help="oldest matches first")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--sync", action="store_true", help="index stored runs missing locally, then exit")
+    parser.add_argument("--no-sync", action="store_true", help="query the local index as it is")
+    args = parser.parse_args()
+
+    if args.sync or (args.query and not args.no_sync):
+        print(f"Indexed {sync_index()} new run(s)")
+    if not args.query:
+        return
+
+    started = time.perf_counter()
+    hits = search(
+        args.query,
+        competitor=args.competitor,
+        start_date=args.since,
+        end_date=args.until,
+        kind=args.kind,
+        oldest_first=args.first,
+        limit=args.limit,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for hit in hits:
+        who = f" [{hit['competitor']}]" if hit["competitor"] else ""
+        print(f"{hit['run_date']}  {hit['kind']:<10}{who} {hit['title']}")
+        print(f"    {hit['snippet']}")
+        if hit["url"]:
+            print(f"    {hit['url']}")
+    print(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
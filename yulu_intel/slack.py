@@ -1,15 +1,133 @@
 import logging
+import random
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
+from yulu_intel import tracing
 from yulu_intel.config import settings
+from yulu_intel.replay import recorded
 
 logger = logging.getLogger(__name__)
 
+POST_MESSAGE_URL = "https://slack.com/api/chat.postMessage"
+RETRY_STATUSES = {429}
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
 
-def _post_webhook(payload: Dict) -> None:
+
+class SlackDeliveryError(RuntimeError):
+    """A message could not be delivered after all retries."""
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so nothing is sent for ``seconds`` (Retry-After)."""
+        with self.lock:
+            self.tokens = 1 - seconds * self.rate
+            self.updated = time.monotonic()
+
+
+_session: Optional[requests.Session] = None
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return _session
+
+
+def _bucket(destination: str) -> TokenBucket:
+    """Slack limits posting per channel, so each destination has its own bucket."""
+    with _buckets_lock:
+        if destination not in _buckets:
+            _buckets[destination] = TokenBucket(settings.slack_rate_per_sec, settings.slack_burst)
+        return _buckets[destination]
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _never_sent(error: requests.RequestException) -> bool:
+    """Whether the request failed before any of it reached Slack (no connection made)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _post(destination: str, url: str, body: Dict, headers: Optional[Dict] = None) -> requests.Response:
+    """POST with rate limiting and retries.
+
+    Only failures where Slack cannot have accepted the message are retried
+    here: 429 and errors before a connection was made. Read errors, timeouts
+    and 5xx responses are ambiguous and raise at once; the outbox retries them
+    on a later flush, where a duplicate post is possible.
+    """
+    bucket = _bucket(destination)
+    attempts = settings.slack_max_retries + 1
+    for attempt in range(attempts):
+        bucket.acquire()
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+        try:
+            resp = _get_session().post(url, json=body, headers=headers, timeout=15)
+        except requests.ConnectionError as e:
+            if not _never_sent(e):
+                raise
+            error = str(e)
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                tracing.annotate(retries=attempt)
+                resp.raise_for_status()
+                return resp
+            error = f"HTTP {resp.status_code}"
+            retry_after = _retry_after(resp)
+            if retry_after is not None:
+                bucket.pause(retry_after)
+                delay = 0.0
+        if attempt + 1 < attempts:
+            logger.warning("  Slack %s (attempt %d/%d), retrying", error, attempt + 1, attempts)
+            time.sleep(delay)
+    tracing.annotate(retries=attempts - 1)
+    raise SlackDeliveryError(f"Slack delivery failed after {attempts} attempts: {error}")
+
+
+@recorded("slack_webhook")
+def _post_webhook(payload: Dict, url: Optional[str] = None) -> None:
+    url = url or settings.SLACK_WEBHOOK_URL
     # Slack webhooks require a top-level "text" fallback
     body = dict(payload)
     if "text" not in body:
@@ -17,52 +135,27 @@ def _post_webhook(payload: Dict) -> None:
         blocks = body.get("blocks", [])
         if blocks:
             body["text"] = blocks[0].get("text", {}).get("text", "CompeteIQ Update")
-    resp = requests.post(
-        settings.SLACK_WEBHOOK_URL,
-        json=body,
-        timeout=15,
-    )
-    resp.raise_for_status()
+    _post(url, url, body)
 
 
-def _post_bot(payload: Dict, thread_ts: Optional[str] = None) -> Optional[str]:
+@recorded("slack_bot")
+def _post_bot(payload: Dict, thread_ts: Optional[str] = None, channel: Optional[str] = None) -> Optional[str]:
+    channel = channel or settings.SLACK_CHANNEL
     body = {
-        "channel": settings.SLACK_CHANNEL,
+        "channel": channel,
         "blocks": payload["blocks"],
     }
     if thread_ts:
         body["thread_ts"] = thread_ts
 
-    resp = requests.post(
-        "https://slack.com/api/chat.postMessage",
-        json=body,
+    resp = _post(
+        channel,
+        POST_MESSAGE_URL,
+        body,
         headers={"Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}"},
-        timeout=15,
     )
-    resp.raise_for_status()
     data = resp.json()
     if not data.get("ok"):
         raise RuntimeError(f"Slack API error: {data.get('error', 'unknown')}")
     return data.get("ts")
 
-
-def send_messages(payloads: List[Dict]) -> None:
-    if settings.SLACK_BOT_TOKEN and settings.SLACK_CHANNEL:
-        logger.info("Sending via bot token to %s", settings.SLACK_CHANNEL)
-        thread_ts = None
-        for i, payload in enumerate(payloads):
-            ts = _post_bot(payload, thread_ts=thread_ts)
-            if i == 0:
-                thread_ts = ts
-            logger.info("  Message %d/%d sent", i + 1, len(payloads))
-            time.sleep(1)
-    elif settings.SLACK_WEBHOOK_URL:
-        logger.info("Sending via webhook")
-        for i, payload in enumerate(payloads):
-            _post_webhook(payload)
-            logger.info("  Message %d/%d sent", i + 1, len(payloads))
-            time.sleep(1)
-    else:
-        raise RuntimeError(
-            "No Slack credentials configured. Set SLACK_WEBHOOK_URL or (SLACK_BOT_TOKEN + SLACK_CHANNEL) in .env"
-        )
@@ -0,0 +1,76 @@
+// Shared behaviour for CompeteIQ daily reports.
+// Per-report chart data comes from <script id="report-data" type="application/json">.
+const REPORT_DATA = JSON.parse(document.getElementById('report-data').textContent);
+
+// Tab switching
+document.querySelectorAll('.tab-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
+        document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+        btn.classList.add('active');
+        document.getElementById(btn.dataset.tab).classList.add('active');
+    });
+});
+
+// News filter
+document.querySelectorAll('.filter-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+        const filter = btn.dataset.filter;
+        document.querySelectorAll('.news-card').forEach(card => {
+            card.classList.toggle('hidden', filter !== 'all' && card.dataset.type !== filter);
+        });
+    });
+});
+
+// Competitor "Show More"
+document.querySelectorAll('.expand-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        btn.previousElementSibling.style.display = 'block';
+        btn.style.display = 'none';
+    });
+});
+
+// Charts
+const threatCtx = document.getElementById('threatChart');
+if (threatCtx && window.Chart) {
+    new Chart(threatCtx, {
+        type: 'bar',
+        data: {
+            labels: REPORT_DATA.competitors,
+            datasets: [{
+                label: 'Threat Score',
+                data: REPORT_DATA.threatScores,
+                backgroundColor: ['#6366f1','#8b5cf6','#a78bfa','#c4b5fd','#ddd6fe','#ede9fe'],
+                borderRadius: 8,
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { display: false } },
+            scales: { y: { beginAtZero: true, max: 10 } }
+        }
+    });
+}
+
+const radarCtx = document.getElementById('radarChart');
+if (radarCtx && window.Chart) {
+    new Chart(radarCtx, {
+        type: 'radar',
+        data: {
+            labels: REPORT_DATA.radarLabels,
+            datasets: [{
+                label: REPORT_DATA.product,
+                data: REPORT_DATA.radarData,
+                backgroundColor: 'rgba(99,102,241,.2)',
+                borderColor: '#6366f1',
+                pointBackgroundColor: '#6366f1',
+            }]
+        },
+        options: {
+            responsive: true,
+            scales: { r: { beginAtZero: true } }
+        }
+    });
+}
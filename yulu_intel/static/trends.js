@@ -0,0 +1,147 @@
+// CompeteIQ trends page. Loads the precomputed aggregate once and charts it.
+// Config (colours, data URL) comes from <script id="trends-config" type="application/json">.
+const TRENDS_CONFIG = JSON.parse(document.getElementById('trends-config').textContent);
+const PALETTE = ['#6366f1','#22c55e','#f59e0b','#ef4444','#3b82f6','#8b5cf6','#14b8a6','#ec4899'];
+const charts = {};
+let TRENDS = null;
+
+function draw(id, config) {
+    if (charts[id]) charts[id].destroy();
+    charts[id] = new Chart(document.getElementById(id), config);
+}
+
+function windowed(days) {
+    if (!days) return TRENDS.days;
+    const cutoff = new Date(TRENDS.days[TRENDS.days.length - 1].date);
+    cutoff.setDate(cutoff.getDate() - days);
+    const since = cutoff.toISOString().slice(0, 10);
+    return TRENDS.days.filter(d => d.date > since);
+}
+
+// Long ranges are bucketed by month so charts stay readable
+function bucketOf(date, monthly) {
+    return monthly ? date.slice(0, 7) : date;
+}
+
+function render(days) {
+    const rows = windowed(days);
+    const monthly = rows.length > 120;
+    const buckets = [...new Set(rows.map(d => bucketOf(d.date, monthly)))];
+    const bucketIdx = new Map(buckets.map((b, i) => [b, i]));
+    document.getElementById('run-count').textContent =
+        `${rows.length} runs · ${rows.length ? rows[0].date + ' → ' + rows[rows.length - 1].date : 'no data'}`;
+
+    // Appearances and mean threat per competitor
+    const nComp = TRENDS.competitors.length;
+    const appearances = new Array(nComp).fill(0);
+    const threatSum = new Array(nComp).fill(0);
+    for (const day of rows) {
+        for (const [c, threat] of day.c) {
+            appearances[c] += 1;
+            threatSum[c] += threat;
+        }
+    }
+    const top = [...appearances.keys()]
+        .filter(c => appearances[c] > 0)
+        .sort((a, b) => appearances[b] - appearances[a])
+        .slice(0, TRENDS_CONFIG.topCompetitors);
+
+    draw('appearanceChart', {
+        type: 'bar',
+        data: {
+            labels: top.map(c => TRENDS.competitors[c]),
+            datasets: [{
+                label: 'Share of runs (%)',
+                data: top.map(c => Math.round(100 * appearances[c] / Math.max(1, rows.length))),
+                backgroundColor: '#6366f1',
+                borderRadius: 8,
+            }]
+        },
+        options: { responsive: true, plugins: { legend: { display: false } }, scales: { y: { beginAtZero: true, max: 100 } } }
+    });
+
+    // Threat score over time (bucket mean) for the most frequent competitors
+    const threatSeries = top.slice(0, PALETTE.length).map((c, i) => {
+        const sum = new Array(buckets.length).fill(0);
+        const n = new Array(buckets.length).fill(0);
+        for (const day of rows) {
+            const b = bucketIdx.get(bucketOf(day.date, monthly));
+            for (const [cc, threat] of day.c) {
+                if (cc === c) { sum[b] += threat; n[b] += 1; }
+            }
+        }
+        return {
+            label: TRENDS.competitors[c],
+            data: sum.map((s, b) => n[b] ? +(s / n[b]).toFixed(1) : null),
+            borderColor: PALETTE[i],
+            backgroundColor: PALETTE[i],
+            spanGaps: true,
+            tension: 0.3,
+        };
+    });
+    draw('threatChart', {
+        type: 'line',
+        data: { labels: buckets, datasets: threatSeries },
+        options: { responsive: true, scales: { y: { beginAtZero: true, max: 10 } } }
+    });
+
+    // Sentiment mix over time
+    const sentimentCounts = TRENDS.sentiments.map(() => new Array(buckets.length).fill(0));
+    for (const day of rows) {
+        const b = bucketIdx.get(bucketOf(day.date, monthly));
+        for (const [, , s] of day.c) {
+            if (s >= 0) sentimentCounts[s][b] += 1;
+        }
+    }
+    draw('sentimentChart', {
+        type: 'bar',
+        data: {
+            labels: buckets,
+            datasets: TRENDS.sentiments.map((s, i) => ({
+                label: s,
+                data: sentimentCounts[i],
+                backgroundColor: TRENDS_CONFIG.sentimentColors[s] || TRENDS_CONFIG.defaultColor,
+            }))
+        },
+        options: { responsive: true, scales: { x: { stacked: true }, y: { stacked: true, beginAtZero: true } } }
+    });
+
+    // News volume by type
+    const newsCounts = TRENDS.news_types.map(() => new Array(buckets.length).fill(0));
+    for (const day of rows) {
+        const b = bucketIdx.get(bucketOf(day.date, monthly));
+        day.n.forEach((count, t) => { newsCounts[t][b] += count; });
+    }
+    draw('newsChart', {
+        type: 'bar',
+        data: {
+            labels: buckets,
+            datasets: TRENDS.news_types.map((t, i) => ({
+                label: t,
+                data: newsCounts[i],
+                backgroundColor: TRENDS_CONFIG.typeColors[t] || TRENDS_CONFIG.defaultColor,
+            }))
+        },
+        options: { responsive: true, scales: { x: { stacked: true }, y: { stacked: true, beginAtZero: true } } }
+    });
+}
+
+document.querySelectorAll('.range-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.range-btn').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+        render(parseInt(btn.dataset.days, 10) || 0);
+    });
+});
+
+fetch(TRENDS_CONFIG.dataUrl)
+    .then(resp => resp.json())
+    .then(data => {
+        TRENDS = data;
+        if (!TRENDS.days.length) {
+            document.getElementById('run-count').textContent = 'No runs recorded yet.';
+            return;
+        }
+        const active = document.querySelector('.range-btn.active');
+        render(active ? parseInt(active.dataset.days, 10) || 0 : 0);
+    });
@@ -0,0 +1,111 @@
+"""Minimal compiled HTML templates with a content-addressed fragment cache.
+
+Template syntax: ``{{ name }}`` inserts an HTML-escaped value and
+``{{{ name }}}`` inserts pre-rendered markup as-is. Each template is compiled
+once into a Python function that joins literal chunks and slot values, so
+rendering is a single ``"".join`` with no parsing.
+
+``fragment`` memoizes a render function by a hash of its arguments (Pydantic
+models hash by their JSON dump), so unchanged sections are reused across
+reports, backfills and products.
+"""
+
+import hashlib
+import html
+import re
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict
+
+from pydantic import BaseModel
+
+_SLOT_RE = re.compile(r"\{\{\{\s*(\w+)\s*\}\}\}|\{\{\s*(\w+)\s*\}\}")
+
+FRAGMENT_CACHE_SIZE = 4096
+
+
+def escape(value) -> str:
+    return html.escape(str(value))
+
+
+class Template:
+    """A template compiled to a function of keyword arguments."""
+
+    def __init__(self, source: str, name: str = "template"):
+        self.name = name
+        self.slots = []
+        exprs = []
+        pos = 0
+        for match in _SLOT_RE.finditer(source):
+            if match.start() > pos:
+                exprs.append(repr(source[pos:match.start()]))
+            raw_name, escaped_name = match.groups()
+            slot = raw_name or escaped_name
+            self.slots.append(slot)
+            exprs.append(f"str(ctx[{slot!r}])" if raw_name else f"_escape(ctx[{slot!r}])")
+            pos = match.end()
+        if pos < len(source) or not exprs:
+            exprs.append(repr(source[pos:]))
+
+        code = f"def render(ctx):\n    return ''.join(({', '.join(exprs)},))\n"
+        namespace = {"_escape": escape}
+        exec(compile(code, f"<template {name}>", "exec"), namespace)
+        self._render = namespace["render"]
+
+    def render(self, **ctx) -> str:
+        try:
+            return self._render(ctx)
+        except KeyError as e:
+            raise KeyError(f"Template {self.name!r} is missing slot {e.args[0]!r}") from None
+
+
+def _fingerprint(value, digest) -> None:
+    if isinstance(value, BaseModel):
+        digest.update(value.model_dump_json().encode("utf-8"))
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _fingerprint(item, digest)
+            digest.update(b",")
+        digest.update(b"]")
+    else:
+        digest.update(repr(value).encode("utf-8"))
+
+
+_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def fragment(fn: Callable[..., str]) -> Callable[..., str]:
+    """Memoize an HTML fragment renderer by the content hash of its arguments."""
+
+    @wraps(fn)
+    def wrapper(*args) -> str:
+        digest = hashlib.blake2b(fn.__qualname__.encode("utf-8"), digest_size=16)
+        for arg in args:
+            _fingerprint(arg, digest)
+        key = digest.digest()
+
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+
+        _stats["misses"] += 1
+        result = fn(*args)
+        _cache[key] = result
+        if len(_cache) > FRAGMENT_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+def fragment_cache_stats() -> Dict[str, int]:
+    return {**_stats, "size": len(_cache)}
+
+
+def clear_fragment_cache() -> None:
+    _cache.clear()
+    _stats.update(hits=0, misses=0)
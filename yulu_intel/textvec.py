@@ -0,0 +1,44 @@
+"""Offline hashed text embeddings (no model download, stable across runs)."""
+
+import re
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+N_FEATURES = 1 << 12
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or "
+    "over says that the their this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word unigrams and bigrams, stopwords removed."""
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_vectorize(texts: Iterable[str], n_features: int = N_FEATURES) -> np.ndarray:
+    """Signed feature hashing with sublinear tf; rows are L2-normalised.
+
+    Uses crc32 rather than ``hash()`` so vectors are identical across processes
+    and can be compared with ones built on earlier days.
+    """
+    rows = []
+    for text in texts:
+        vec = np.zeros(n_features, dtype=np.float32)
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            vec[h % n_features] += 1.0 if h & 0x80000000 else -1.0
+        rows.append(vec)
+    if not rows:
+        return np.zeros((0, n_features), dtype=np.float32)
+
+    matrix = np.vstack(rows)
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
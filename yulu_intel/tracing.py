@@ -0,0 +1,335 @@
+"""Per-run tracing: spans around pipeline phases and outbound calls.
+
+``run.py`` opens a trace with ``start_trace`` and wraps each phase in
+``span(name, kind="phase")``. Every ``@recorded`` boundary (Exa, OpenAI,
+Supabase, Slack) opens a ``call`` span automatically, with bytes sent and
+received (JSON size of arguments and result), retries and outcome; code
+inside a call can add detail with ``annotate``. When no trace is active
+nothing is measured, so library use and benchmarks pay nothing.
+
+At the end of a run the trace is written as JSON (``data/traces/<run>.json``)
+and as a Prometheus textfile snapshot for node_exporter's textfile collector,
+and ``critical_path_table`` summarizes where the wall time went.
+
+Usage:
+    python -m yulu_intel.tracing data/traces/2025-06-01T04-30-00.json
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from yulu_intel.config import DATA_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_DIR = DATA_DIR / "traces"
+DEFAULT_METRICS_FILE = DATA_DIR / "metrics" / "yulu_intel.prom"
+METRIC_PREFIX = "yulu_intel"
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # "run", "phase" or "call"
+    id: str
+    parent: Optional[str]
+    start: float  # seconds since the trace started
+    duration: float = 0.0
+    outcome: str = "ok"
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class Trace:
+    """Spans of one run. Safe to record into from worker threads."""
+
+    def __init__(self, name: str, **attrs: Any):
+        self.id = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%S") + "-" + uuid.uuid4().hex[:6]
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.root = self._new_span(name, "run", None, attrs)
+
+    def _new_span(self, name: str, kind: str, parent: Optional[str], attrs: Dict[str, Any]) -> Span:
+        span = Span(name, kind, uuid.uuid4().hex[:12], parent, time.perf_counter() - self.t0, attrs=dict(attrs))
+        with self.lock:
+            self.spans.append(span)
+        return span
+
+    def close(self, span: Span) -> None:
+        span.duration = time.perf_counter() - self.t0 - span.start
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "started_at": self.started_at,
+            "duration": round(self.root.duration, 4),
+            "spans": [
+                {**asdict(s), "start": round(s.start, 4), "duration": round(s.duration, 4)}
+                for s in self.spans
+            ],
+        }
+
+
+_trace: Optional[Trace] = None
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("yulu_span", default=None)
+
+
+def active() -> bool:
+    return _trace is not None
+
+
+def start_trace(name: str, **attrs: Any) -> Trace:
+    """Begin recording; spans opened anywhere in the process join this trace."""
+    global _trace
+    _trace = Trace(name, **attrs)
+    _current.set(_trace.root)
+    return _trace
+
+
+def finish_trace(outcome: str = "ok") -> Optional[Trace]:
+    global _trace
+    trace, _trace = _trace, None
+    if trace is not None:
+        trace.root.outcome = outcome
+        trace.close(trace.root)
+        _current.set(None)
+    return trace
+
+
+@contextmanager
+def span(name: str, kind: str = "phase", **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span. Yields None when tracing is off.
+
+    Worker threads that do not inherit the caller's context (plain
+    ``run_in_executor``, thread pools) attach their spans to the run itself.
+    """
+    trace = _trace
+    if trace is None:
+        yield None
+        return
+    parent = _current.get() or trace.root
+    s = trace._new_span(name, kind, parent.id, attrs)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.outcome = "error"
+        s.attrs.setdefault("error", f"{type(e).__name__}: {e}"[:300])
+        raise
+    finally:
+        _current.reset(token)
+        trace.close(s)
+
+
+def annotate(outcome: Optional[str] = None, **attrs: Any) -> None:
+    """Set attributes (``retries=2``, ``bytes_in=...``) on the innermost open span."""
+    s = _current.get()
+    if s is None or _trace is None:
+        return
+    if outcome:
+        s.outcome = outcome
+    s.attrs.update(attrs)
+
+
+def trace_dir() -> Path:
+    return Path(settings.trace_dir) if settings.trace_dir else DEFAULT_TRACE_DIR
+
+
+def metrics_file() -> Path:
+    return Path(settings.metrics_textfile) if settings.metrics_textfile else DEFAULT_METRICS_FILE
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(trace: Trace) -> str:
+    """Metrics snapshot of one run in the Prometheus text exposition format."""
+    p = METRIC_PREFIX
+    calls: Dict[Tuple[str, str], int] = {}
+    totals: Dict[str, Dict[str, float]] = {}
+    for s in trace.spans:
+        if s.kind != "call":
+            continue
+        calls[(s.name, s.outcome)] = calls.get((s.name, s.outcome), 0) + 1
+        t = totals.setdefault(s.name, {"seconds": 0.0, "count": 0, "bytes_in": 0, "bytes_out": 0, "retries": 0})
+        t["seconds"] += s.duration
+        t["count"] += 1
+        for key in ("bytes_in", "bytes_out", "retries"):
+            t[key] += s.attrs.get(key, 0)
+
+    lines = [
+        f"# HELP {p}_run_duration_seconds Wall time of the last run.",
+        f"# TYPE {p}_run_duration_seconds gauge",
+        f"{p}_run_duration_seconds {trace.root.duration:.4f}",
+        f"# HELP {p}_run_success Whether the last run finished without error.",
+        f"# TYPE {p}_run_success gauge",
+        f"{p}_run_success {int(trace.root.outcome == 'ok')}",
+        f"# HELP {p}_run_timestamp_seconds Start time of the last run.",
+        f"# TYPE {p}_run_timestamp_seconds gauge",
+        f"{p}_run_timestamp_seconds {datetime.fromisoformat(trace.started_at).timestamp():.0f}",
+        f"# HELP {p}_phase_duration_seconds Wall time per pipeline phase in the last run.",
+        f"# TYPE {p}_phase_duration_seconds gauge",
+    ]
+    for s in trace.spans:
+        if s.kind == "phase":
+            lines.append(f"{p}_phase_duration_seconds{_labels(phase=s.name)} {s.duration:.4f}")
+
+    lines += [
+        f"# HELP {p}_calls_total Outbound calls in the last run by boundary and outcome.",
+        f"# TYPE {p}_calls_total counter",
+    ]
+    for (name, outcome), n in sorted(calls.items()):
+        lines.append(f"{p}_calls_total{_labels(boundary=name, outcome=outcome)} {n}")
+
+    lines += [
+        f"# HELP {p}_call_duration_seconds Time spent in outbound calls in the last run.",
+        f"# TYPE {p}_call_duration_seconds summary",
+    ]
+    for name, t in sorted(totals.items()):
+        lines.append(f"{p}_call_duration_seconds_sum{_labels(boundary=name)} {t['seconds']:.4f}")
+        lines.append(f"{p}_call_duration_seconds_count{_labels(boundary=name)} {t['count']}")
+
+    for key, help_text in (
+        ("bytes_in", "Bytes received from outbound calls (JSON size)."),
+        ("bytes_out", "Bytes sent in outbound calls (JSON size)."),
+        ("retries", "Retries inside outbound calls."),
+    ):
+        lines += [f"# HELP {p}_call_{key}_total {help_text}", f"# TYPE {p}_call_{key}_total counter"]
+        for name, t in sorted(totals.items()):
+            lines.append(f"{p}_call_{key}_total{_labels(boundary=name)} {int(t[key])}")
+    return "\n".join(lines) + "\n"
+
+
+def export(trace: Trace) -> Tuple[Path, Path]:
+    """Write the JSON trace and the Prometheus textfile. Returns both paths."""
+    trace_path = trace_dir() / f"{trace.id}.json"
+    trace_path.parent.mkdir(parents=True, exist_ok=True)
+    trace_path.write_text(json.dumps(trace.to_dict(), indent=1), encoding="utf-8")
+
+    # node_exporter may read at any moment, so replace the file atomically
+    prom_path = metrics_file()
+    prom_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = prom_path.with_suffix(".prom.tmp")
+    tmp.write_text(prometheus_text(trace), encoding="utf-8")
+    os.replace(tmp, prom_path)
+    return trace_path, prom_path
+
+
+# ---------------------------------------------------------------------------
+# Critical path
+# ---------------------------------------------------------------------------
+
+
+def critical_path(spans: List[Span], root: Span) -> List[Tuple[int, Span]]:
+    """Spans that bound the run's wall time, as ``(depth, span)`` in time order.
+
+    Walking back from a span's end, the child that finishes last is on the
+    path, then the last child to finish before that one started, and so on;
+    concurrent siblings that finished earlier are off the path.
+    """
+    children: Dict[str, List[Span]] = {}
+    for s in spans:
+        if s.parent:
+            children.setdefault(s.parent, []).append(s)
+
+    path: List[Tuple[int, Span]] = []
+
+    def walk(s: Span, depth: int) -> None:
+        path.append((depth, s))
+        chain: List[Span] = []
+        cursor = s.end + 1e-6
+        for child in sorted(children.get(s.id, []), key=lambda c: c.end, reverse=True):
+            if child.end <= cursor:
+                chain.append(child)
+                cursor = child.start + 1e-6
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return path
+
+
+def critical_path_table(spans: List[Span], root: Span) -> str:
+    """Text table of the critical path; consecutive calls of one boundary are merged."""
+    rows: List[Tuple[int, str, int, float, int, int, int, str]] = []
+    for depth, s in critical_path(spans, root):
+        prev = rows[-1] if rows else None
+        if s.kind == "call" and prev and prev[0] == depth and prev[1] == s.name:
+            rows[-1] = (
+                depth, s.name, prev[2] + 1, prev[3] + s.duration,
+                prev[4] + s.attrs.get("bytes_out", 0), prev[5] + s.attrs.get("bytes_in", 0),
+                prev[6] + s.attrs.get("retries", 0), prev[7] if s.outcome == "ok" else s.outcome,
+            )
+            continue
+        rows.append((
+            depth, s.name, 1, s.duration,
+            s.attrs.get("bytes_out", 0), s.attrs.get("bytes_in", 0), s.attrs.get("retries", 0), s.outcome,
+        ))
+
+    total = root.duration or 1e-9
+    lines = [f"{'Span':<36}{'Calls':>6}{'Seconds':>10}{'Share':>8}{'Sent':>10}{'Recv':>10}{'Retry':>6}  Outcome"]
+    for depth, name, n, seconds, sent, recv, retries, outcome in rows:
+        label = ("  " * depth + name)[:35]
+        lines.append(
+            f"{label:<36}{n:>6}{seconds:>10.2f}{seconds / total:>8.1%}"
+            f"{_kb(sent):>10}{_kb(recv):>10}{retries:>6}  {outcome}"
+        )
+    return "\n".join(lines)
+
+
+def _kb(n: int) -> str:
+    if not n:
+        return "-"
+    return f"{n / 1024:.1f}K" if n >= 1024 else f"{n}B"
+
+
+def load(path: Path) -> Tuple[List[Span], Span]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    spans = [Span(**s) for s in data["spans"]]
+    root = next(s for s in spans if s.parent is None)
+    return spans, root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print the critical path of a stored run trace.")
+    parser.add_argument("trace", type=Path, nargs="?", help="trace JSON (default: the newest in the trace dir)")
+    args = parser.parse_args()
+
+    path = args.trace
+    if path is None:
+        traces = sorted(trace_dir().glob("*.json"))
+        if not traces:
+            raise SystemExit(f"No traces in {trace_dir()}")
+        path = traces[-1]
+    spans, root = load(path)
+    print(f"{path.name}: {root.duration:.2f}s, {sum(s.kind == 'call' for s in spans)} outbound calls")
+    print(critical_path_table(spans, root))
+
+
+if __name__ == "__main__":
+    main()
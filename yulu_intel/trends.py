@@ -0,0 +1,209 @@
+"""Precomputed trend aggregates and the historical trends page.
+
+``reports/trends.json`` holds one compact entry per run date: for each
+competitor that appeared, its index, threat score and sentiment code, plus
+news counts by type. ``append_run`` updates it after each run, so the trends
+page fetches one small file instead of parsing every stored report. Like the
+manifest, both files are mirrored to ``report_assets`` for fresh CI runners.
+
+Usage:
+    python -m yulu_intel.trends --rebuild
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Dict
+
+from yulu_intel.config import settings
+from yulu_intel.db import _normalize, get_report_asset, put_report_asset
+from yulu_intel.history import SENTIMENTS, RunHistory, build_history, load_history
+from yulu_intel.html_report import DEFAULT_COLOR, SENTIMENT_COLORS, TYPE_COLORS
+from yulu_intel.models import CompetitiveAnalysis
+from yulu_intel.report_assets import STATIC_DIR, build_bundle, minify_js
+from yulu_intel.templates import Template
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).resolve().parent.parent / "reports"
+TRENDS_NAME = "trends.json"
+PAGE_NAME = "trends.html"
+TOP_COMPETITORS = 12
+
+_TRENDS_PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>CompeteIQ Trends</title>
+<script src="{{ chart_src }}" defer></script>
+<style>
+*,*::before,*::after{box-sizing:border-box;margin:0;padding:0}
+body{font-family:'Inter',system-ui,sans-serif;background:#f8fafc;color:#1e293b;padding:40px 20px}
+.container{max-width:1100px;margin:0 auto}
+h1{font-size:1.8rem;font-weight:700;margin-bottom:8px}
+h2{font-size:1.05rem;font-weight:600;margin-bottom:12px}
+p.sub{color:#64748b;margin-bottom:24px}
+p.sub a{color:#4f46e5;text-decoration:none;font-weight:500}
+.ranges{display:flex;gap:8px;margin-bottom:24px}
+.range-btn{border:1px solid #c7d2fe;background:#fff;color:#4f46e5;border-radius:99px;padding:6px 16px;font-weight:500;cursor:pointer}
+.range-btn.active{background:#4f46e5;color:#fff}
+.grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(480px,1fr));gap:20px}
+.card{background:#fff;border-radius:12px;padding:20px 24px;box-shadow:0 1px 3px rgba(0,0,0,.08)}
+</style>
+</head>
+<body>
+<div class="container">
+<h1>CompeteIQ Trends</h1>
+<p class="sub">{{ product }} competitive landscape over time · <span id="run-count">Loading…</span> · <a href="/reports">All reports</a></p>
+<div class="ranges">
+<button class="range-btn" data-days="30">30 days</button>
+<button class="range-btn active" data-days="90">90 days</button>
+<button class="range-btn" data-days="365">1 year</button>
+<button class="range-btn" data-days="0">All</button>
+</div>
+<div class="grid">
+<div class="card"><h2>Competitor appearance frequency</h2><canvas id="appearanceChart"></canvas></div>
+<div class="card"><h2>Threat score over time</h2><canvas id="threatChart"></canvas></div>
+<div class="card"><h2>Competitor sentiment</h2><canvas id="sentimentChart"></canvas></div>
+<div class="card"><h2>News volume by type</h2><canvas id="newsChart"></canvas></div>
+</div>
+</div>
+<script id="trends-config" type="application/json">{{{ config }}}</script>
+<!-- Inline scripts ignore defer: wait for the deferred Chart.js above -->
+<script>document.addEventListener("DOMContentLoaded", function () {
+{{{ script }}}
+});</script>
+</body>
+</html>""", "trends_page")
+
+
+def empty_trends() -> Dict:
+    return {"version": 1, "sentiments": list(SENTIMENTS), "competitors": [], "news_types": [], "days": []}
+
+
+def load_trends(reports_dir: Path = REPORTS_DIR) -> Dict:
+    """The aggregate in Supabase, else the local copy (offline only; it may be behind)."""
+    try:
+        stored = get_report_asset(TRENDS_NAME)
+    except Exception as e:
+        logger.warning("Could not load the stored trends, using the local copy: %s", e)
+        stored = None
+    if stored:
+        return json.loads(stored)
+    path = reports_dir / TRENDS_NAME
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return empty_trends()
+
+
+def merge_history(trends: Dict, history: RunHistory) -> Dict:
+    """Fold runs into the aggregate; a later run replaces an earlier one on the same date."""
+    comp_index = {_normalize(name): i for i, name in enumerate(trends["competitors"])}
+    type_index = {t: i for i, t in enumerate(trends["news_types"])}
+
+    comp_map = []
+    for name in history.competitors:
+        key = _normalize(name)
+        if key not in comp_index:
+            comp_index[key] = len(trends["competitors"])
+            trends["competitors"].append(name)
+        comp_map.append(comp_index[key])
+    type_map = []
+    for t in history.news_types:
+        if t not in type_index:
+            type_index[t] = len(trends["news_types"])
+            trends["news_types"].append(t)
+        type_map.append(type_index[t])
+
+    threat = history.threat_scores()
+    days = {d["date"]: d for d in trends["days"]}
+    for run in range(history.n_runs):
+        apps = history.app_run == run
+        news = (history.news_run == run) & (history.news_type >= 0)
+        counts = [0] * len(trends["news_types"])
+        for t in history.news_type[news]:
+            counts[type_map[t]] += 1
+        run_date = str(history.run_dates[run])
+        days[run_date] = {
+            "date": run_date,
+            "c": [
+                [comp_map[c], int(s), int(sent)]
+                for c, s, sent in zip(history.app_comp[apps], threat[apps], history.app_sentiment[apps])
+            ],
+            "n": counts,
+        }
+
+    trends["days"] = [days[d] for d in sorted(days)]
+    return trends
+
+
+def render_page(product: str) -> str:
+    config = {
+        "dataUrl": "/" + TRENDS_NAME,
+        "topCompetitors": TOP_COMPETITORS,
+        "typeColors": TYPE_COLORS,
+        "sentimentColors": SENTIMENT_COLORS,
+        "defaultColor": DEFAULT_COLOR,
+    }
+    script = minify_js((STATIC_DIR / "trends.js").read_text(encoding="utf-8"))
+    return _TRENDS_PAGE.render(
+        product=product,
+        chart_src=build_bundle().chart_src,
+        config=json.dumps(config).replace("</", "<\\/"),
+        script=script,
+    )
+
+
+def save_trends(trends: Dict, product: str, reports_dir: Path = REPORTS_DIR, upload: bool = True) -> None:
+    files = {
+        TRENDS_NAME: json.dumps(trends, separators=(",", ":")),
+        PAGE_NAME: render_page(product),
+    }
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        (reports_dir / name).write_text(content, encoding="utf-8")
+    if upload:
+        for name, content in files.items():
+            put_report_asset(name, content)
+
+
+def append_run(
+    run_date: str,
+    analysis: CompetitiveAnalysis,
+    reports_dir: Path = REPORTS_DIR,
+) -> Dict:
+    """Add (or replace) one run's entry and rewrite the aggregate."""
+    history = build_history([{"run_date": run_date, "analysis_json": analysis.model_dump_json()}])
+    trends = merge_history(load_trends(reports_dir), history)
+    save_trends(trends, analysis.product_name, reports_dir)
+    return trends
+
+
+def rebuild_trends(reports_dir: Path = REPORTS_DIR, upload: bool = True) -> Dict:
+    """Rebuild the aggregate from every stored run (hot table and archive)."""
+    trends = merge_history(empty_trends(), load_history())
+    save_trends(trends, settings.PRODUCT_NAME, reports_dir, upload)
+    return trends
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Build the trends aggregate and page.")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild from all stored runs")
+    parser.add_argument("--no-upload", action="store_true", help="write local files only")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        trends = rebuild_trends(upload=not args.no_upload)
+    else:
+        trends = load_trends()
+        save_trends(trends, settings.PRODUCT_NAME, upload=not args.no_upload)
+    logger.info(
+        "Trends cover %d run(s) and %d competitor(s)", len(trends["days"]), len(trends["competitors"])
+    )
+
+
+if __name__ == "__main__":
+    main()
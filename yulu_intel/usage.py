@@ -0,0 +1,189 @@
+"""LLM token, latency and cost accounting with per-run budgets.
+
+Every OpenAI call reports its ``completion.usage`` to the run's ``UsageLedger``
+(prompt, cached and completion tokens, latency, estimated cost), tagged with
+the pipeline phase. Totals are stored with the ``analysis_runs`` row as
+``llm_usage``.
+
+``LLM_TOKEN_BUDGET`` and ``LLM_COST_BUDGET_USD`` cap a run. The analysis call
+is required, so its search data is trimmed to fit; per-competitor news
+extraction is optional, so competitors are processed in threat order and the
+rest are skipped once the next call would overspend.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from yulu_intel.config import settings
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output)
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+CHARS_PER_TOKEN = 4  # rough estimate for English prompt text
+BATCH_DISCOUNT = 0.5  # Batch API calls are billed at half price
+
+
+@dataclass
+class CallUsage:
+    phase: str
+    model: str
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+    latency: float
+    cost_usd: float
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def price(model: str) -> Optional[tuple]:
+    # Dated snapshots ("gpt-4o-mini-2024-07-18") are billed like their base model
+    for name in sorted(PRICES, key=len, reverse=True):
+        if model == name or model.startswith(name + "-"):
+            return PRICES[name]
+    return None
+
+
+def cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    rates = price(model)
+    if rates is None:
+        return 0.0
+    input_rate, cached_rate, output_rate = rates
+    uncached = prompt_tokens - cached_tokens
+    return (uncached * input_rate + cached_tokens * cached_rate + completion_tokens * output_rate) / 1_000_000
+
+
+class UsageLedger:
+    """Usage of one run. ``record`` is called from worker threads."""
+
+    def __init__(self, token_budget: int = 0, cost_budget: float = 0.0):
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.calls: List[CallUsage] = []
+        self.skipped: List[str] = []
+        self.lock = threading.Lock()
+
+    def record(self, phase: str, model: str, usage, latency: float, cost_factor: float = 1.0) -> CallUsage:
+        """Add one call from an OpenAI ``CompletionUsage`` (or None if the API omitted it).
+
+        ``cost_factor`` scales the list price (``BATCH_DISCOUNT`` for Batch API calls).
+        """
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        call = CallUsage(
+            phase, model, prompt, cached, completion, round(latency, 3),
+            cost(model, prompt, cached, completion) * cost_factor,
+        )
+        with self.lock:
+            self.calls.append(call)
+        if price(model) is None:
+            logger.warning("No price for model %s; cost not counted", model)
+        return call
+
+    def spent_tokens(self) -> int:
+        return sum(c.total_tokens for c in self.calls)
+
+    def spent_cost(self) -> float:
+        return sum(c.cost_usd for c in self.calls)
+
+    def remaining_tokens(self) -> Optional[int]:
+        """Tokens left under the budgets, or None when unlimited."""
+        limits = []
+        if self.token_budget:
+            limits.append(self.token_budget - self.spent_tokens())
+        if self.cost_budget:
+            rates = price(settings.openai_model)
+            if rates:
+                # Price the remaining money at the input rate, which dominates our calls
+                limits.append(int((self.cost_budget - self.spent_cost()) * 1_000_000 / rates[0]))
+        return max(0, min(limits)) if limits else None
+
+    def allows(self, estimated_tokens: int) -> bool:
+        remaining = self.remaining_tokens()
+        return remaining is None or estimated_tokens <= remaining
+
+    def max_chars(self, reserve_tokens: int) -> Optional[int]:
+        """Prompt data (chars) a call can still carry after ``reserve_tokens``, or None when unlimited."""
+        remaining = self.remaining_tokens()
+        if remaining is None:
+            return None
+        return max(0, (remaining - reserve_tokens) * CHARS_PER_TOKEN)
+
+    def fit(self, text: str, reserve_tokens: int) -> str:
+        """Trim ``text`` so a call using it, plus ``reserve_tokens``, stays within budget."""
+        max_chars = self.max_chars(reserve_tokens)
+        if max_chars is not None and len(text) > max_chars:
+            logger.warning("Token budget: trimming prompt data from %d to %d chars", len(text), max_chars)
+            return text[:max_chars]
+        return text
+
+    def skip(self, what: str) -> None:
+        with self.lock:
+            self.skipped.append(what)
+
+    def _sum(self, calls: List[CallUsage]) -> Dict:
+        return {
+            "calls": len(calls),
+            "prompt_tokens": sum(c.prompt_tokens for c in calls),
+            "cached_tokens": sum(c.cached_tokens for c in calls),
+            "completion_tokens": sum(c.completion_tokens for c in calls),
+            "latency": round(sum(c.latency for c in calls), 3),
+            "cost_usd": round(sum(c.cost_usd for c in calls), 6),
+        }
+
+    def totals(self) -> Dict:
+        """Run totals, per-phase breakdown and budget state, as stored in ``llm_usage``."""
+        with self.lock:
+            calls = list(self.calls)
+        phases: Dict[str, List[CallUsage]] = {}
+        for c in calls:
+            phases.setdefault(c.phase, []).append(c)
+        return {
+            **self._sum(calls),
+            "model": settings.openai_model,
+            "by_phase": {phase: self._sum(group) for phase, group in phases.items()},
+            "token_budget": self.token_budget or None,
+            "cost_budget_usd": self.cost_budget or None,
+            "skipped": list(self.skipped),
+        }
+
+    def log_summary(self) -> None:
+        t = self.totals()
+        logger.info(
+            "  LLM usage: %d call(s), %d prompt (%d cached) + %d completion tokens, $%.4f",
+            t["calls"], t["prompt_tokens"], t["cached_tokens"], t["completion_tokens"], t["cost_usd"],
+        )
+        for phase, p in t["by_phase"].items():
+            logger.info(
+                "    %-14s %3d call(s) %8d tokens %7.1fs  $%.4f",
+                phase, p["calls"], p["prompt_tokens"] + p["completion_tokens"], p["latency"], p["cost_usd"],
+            )
+        if self.skipped:
+            logger.warning("  Skipped to stay within budget: %s", ", ".join(self.skipped))
+
+
+ledger = UsageLedger()
+
+
+def start_run() -> UsageLedger:
+    """Fresh ledger for a run, with the configured budgets."""
+    global ledger
+    ledger = UsageLedger(settings.llm_token_budget, settings.llm_cost_budget_usd)
+    return ledger
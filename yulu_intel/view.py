@@ -0,0 +1,135 @@
+"""Render-ready view of one run, shared by every output channel.
+
+``build_view`` walks a ``CompetitiveAnalysis`` once and derives everything the
+renderers used to recompute separately: which competitors get a NEW badge,
+threat scores, linked news, KPI counts and the summary headline lines. The
+Slack, HTML, Markdown and JSON renderers all take a ``ReportView``, so they
+agree with each other and a new channel only adds formatting.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+from yulu_intel.models import (
+    CompetitiveAnalysis,
+    Competitor,
+    GigWorkerPulseItem,
+    MonthlyAction,
+    NewsDigestItem,
+)
+
+SUMMARY_CLIP = 200
+
+
+def clip(text: str, limit: int = SUMMARY_CLIP) -> str:
+    """Truncate to limit chars for punchy summary lines."""
+    return text[:limit - 1] + "…" if len(text) > limit else text
+
+
+def threat_score(comp: Competitor) -> int:
+    """Rough heuristic for the report chart; ``RunHistory.threat_scores`` is the vectorized twin."""
+    positive = 1 if comp.sentiment and comp.sentiment.net_sentiment == "positive" else 0
+    return min(10, len(comp.strengths) * 2 + positive)
+
+
+def news_note(item: NewsDigestItem) -> str:
+    """Dedup annotations shown under a news item ("also Rapido · first reported 2026-01-02")."""
+    parts = []
+    if item.also_competitors:
+        parts.append("also " + ", ".join(item.also_competitors))
+    if item.first_reported:
+        parts.append(f"first reported {item.first_reported}")
+    return " · ".join(parts)
+
+
+@dataclass
+class CompetitorView:
+    competitor: Competitor
+    is_new: bool  # newly tracked and worth a badge (never on the first run)
+    threat_score: int
+
+    @property
+    def name(self) -> str:
+        return self.competitor.name
+
+
+@dataclass
+class ReportView:
+    analysis: CompetitiveAnalysis
+    report_date: date
+    is_first_run: bool
+    new_competitors: List[str]
+    returning_competitors: List[str]
+    competitors: List[CompetitorView]
+    news: List[NewsDigestItem]
+    linked_news: List[NewsDigestItem]
+    threats: List[str]
+    gaps: List[str]
+    opportunities: List[str]
+    action_plan: List[MonthlyAction]
+    pulse: List[GigWorkerPulseItem]
+    kpis: Dict[str, int]
+    top_threat: str
+    top_insight: str
+    top_opportunity: str
+    first_action: str
+    report_url: Optional[str] = None
+    swot_counts: List[int] = field(default_factory=list)
+
+    @property
+    def product(self) -> str:
+        return self.analysis.product_name
+
+
+def build_view(
+    analysis: CompetitiveAnalysis,
+    new_competitors: Optional[List[str]] = None,
+    returning_competitors: Optional[List[str]] = None,
+    is_first_run: bool = False,
+    report_date: Optional[date] = None,
+    report_url: Optional[str] = None,
+) -> ReportView:
+    new_competitors = new_competitors or []
+    new_set = set(new_competitors)
+    competitors = [
+        CompetitorView(c, c.name in new_set and not is_first_run, threat_score(c))
+        for c in analysis.competitors
+    ]
+    news = analysis.news_digest or []
+    threats = analysis.biggest_threats or []
+    opportunities = analysis.urgent_opportunities or []
+    plan = analysis.action_plan_90day or []
+    swot = analysis.swot
+
+    first_action = "Review competitive report"
+    if plan and plan[0].actions:
+        first_action = clip(plan[0].actions[0])
+
+    return ReportView(
+        analysis=analysis,
+        report_date=report_date or date.today(),
+        is_first_run=is_first_run,
+        new_competitors=new_competitors,
+        returning_competitors=returning_competitors or [],
+        competitors=competitors,
+        news=news,
+        linked_news=[item for item in news if item.url],
+        threats=threats,
+        gaps=analysis.market_gaps or [],
+        opportunities=opportunities,
+        action_plan=plan,
+        pulse=analysis.gig_worker_pulse or [],
+        kpis={
+            "competitors": len(competitors),
+            "threats": len(threats),
+            "opportunities": len(opportunities),
+            "news": len(news),
+        },
+        top_threat=clip(threats[0]) if threats else "No major threats today",
+        top_insight=clip(analysis.key_insights[0]) if analysis.key_insights else "No new insights",
+        top_opportunity=clip(opportunities[0]) if opportunities else "No urgent opportunities",
+        first_action=first_action,
+        report_url=report_url,
+        swot_counts=[len(swot.strengths), len(swot.weaknesses), len(swot.opportunities), len(swot.threats)],
+    )